@@ -0,0 +1,64 @@
+"""
+Microbenchmarks of decoding responses: the per-call overhead of parametrized generic models, and full validation
+against the trusted decoding mode.
+
+Usage: python benchmarks/decoders.py [--number N]
+"""
+
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from fake_trac import FakeTrac
+
+from trac_rpc.decoders import decode_result, get_response_model, get_ticket_properties_type
+from trac_rpc.models import TracResponse, TracTicket, TracTicketAttachments, TracTicketChangelog, TracTicketProperties
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures"
+
+
+def decode_uncached(text: str) -> TracTicketProperties[TracTicket]:
+    return TracResponse[TracTicketProperties[TracTicket]].model_validate_json(text).result.root
+
+
+def decode_cached(text: str) -> TracTicketProperties[TracTicket]:
+    return get_response_model(get_ticket_properties_type(TracTicket)).model_validate_json(text).result.root
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    text = (FIXTURES / "trac-get-ticket-response.json").read_text()
+
+    for name, parametrize in (
+        ("uncached", lambda: TracResponse[TracTicketProperties[TracTicket]]),
+        ("cached", lambda: get_response_model(get_ticket_properties_type(TracTicket))),
+    ):
+        seconds = timeit.timeit(parametrize, number=args.number)
+        print(f"parametrize {name:>10}: {seconds / args.number * 1e6:8.3f} us/call")
+
+    for name, decode in (("uncached", decode_uncached), ("cached", decode_cached)):
+        seconds = timeit.timeit(lambda decode=decode: decode(text), number=args.number)
+        print(f"decode      {name:>10}: {seconds / args.number * 1e6:8.3f} us/call")
+
+    trac = FakeTrac(changes_per_ticket=100, attachments_per_ticket=10)
+    for name, klass, result in (
+        ("ticket", TracTicketProperties[TracTicket], trac.get_ticket(1)),
+        ("changelog", TracTicketChangelog, trac.get_changelog(1)),
+        ("attachments", TracTicketAttachments, trac.list_attachments(1)),
+    ):
+        content = json.dumps({"result": result, "error": None, "id": None}).encode()
+        for mode, decode in (
+            ("validate", lambda content=content, klass=klass: get_response_model(klass).model_validate_json(content)),
+            ("trusted", lambda content=content, klass=klass: decode_result(json.loads(content), klass, trusted=True)),
+        ):
+            number = max(1, args.number // 10)
+            seconds = timeit.timeit(decode, number=number)
+            print(f"{name:<11} {mode:>10}: {seconds / number * 1e6:8.3f} us/call")
+
+
+if __name__ == "__main__":
+    main()
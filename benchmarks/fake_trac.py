@@ -0,0 +1,314 @@
+"""
+Local stand-in for a Trac JSON-RPC server serving synthetic tickets, changelogs, attachments and wiki pages.
+
+Usage: python benchmarks/fake_trac.py [--port PORT] [--tickets N] [--latency SECONDS]
+"""
+
+import argparse
+import base64
+import contextlib
+import html
+import json
+import random
+import threading
+import time
+from collections.abc import Callable, Iterator
+from datetime import UTC, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+EPOCH = datetime(2020, 1, 1, tzinfo=UTC)
+
+AUTHORS = [f"user{i}" for i in range(20)]
+COMPONENTS = [f"component{i}" for i in range(10)]
+MILESTONES = [f"milestone{i}" for i in range(5)]
+PRIORITIES = ["blocker", "critical", "major", "minor", "trivial"]
+RESOLUTIONS = ["fixed", "invalid", "wontfix", "duplicate", "worksforme"]
+SEVERITIES = ["blocker", "critical", "major", "normal", "minor"]
+STATUSES = ["new", "assigned", "accepted", "reopened", "closed"]
+TYPES = ["defect", "enhancement", "task"]
+VERSIONS = ["1.0", "2.0"]
+
+
+class RpcError(Exception):
+    def __init__(self, message: str, code: int = -32603, name: str = "InternalError"):
+        super().__init__(message)
+        self.code = code
+        self.name = name
+
+
+def encode_datetime(value: datetime) -> dict[str, Any]:
+    return {"__jsonclass__": ["datetime", value.astimezone(UTC).replace(tzinfo=None).isoformat()]}
+
+
+def decode_datetime(value: dict[str, Any]) -> datetime:
+    return datetime.fromisoformat(value["__jsonclass__"][1]).replace(tzinfo=UTC)
+
+
+class FakeTrac:
+    """
+    Deterministic synthetic Trac data set. Tickets, changelogs, attachments and wiki pages are generated on the fly
+    from their IDs, so that arbitrarily large data sets do not need to be kept in memory.
+    """
+
+    def __init__(
+        self,
+        *,
+        tickets: int = 1000,
+        changes_per_ticket: int = 20,
+        attachments_per_ticket: int = 2,
+        attachment_size: int = 4096,
+        wiki_pages: int = 100,
+        seed: int = 0,
+    ):
+        self.tickets = tickets
+        self.changes_per_ticket = changes_per_ticket
+        self.attachments_per_ticket = attachments_per_ticket
+        self.attachment_size = attachment_size
+        self.wiki_pages = wiki_pages
+        self.seed = seed
+
+        self.methods: dict[str, Callable[..., Any]] = {
+            "system.getAPIVersion": lambda: [1, 2, 0],
+            "system.multicall": self.multicall,
+            "ticket.component.getAll": lambda: COMPONENTS,
+            "ticket.component.get": lambda name: {"name": name, "owner": AUTHORS[0], "description": ""},
+            "ticket.milestone.getAll": lambda: MILESTONES,
+            "ticket.milestone.get": lambda name: {"name": name, "due": 0, "completed": 0, "description": ""},
+            "ticket.priority.getAll": lambda: PRIORITIES,
+            "ticket.resolution.getAll": lambda: RESOLUTIONS,
+            "ticket.severity.getAll": lambda: SEVERITIES,
+            "ticket.status.getAll": lambda: STATUSES,
+            "ticket.type.getAll": lambda: TYPES,
+            "ticket.version.getAll": lambda: VERSIONS,
+            "ticket.version.get": lambda name: {"name": name, "time": 0, "description": ""},
+            "ticket.query": self.query,
+            "ticket.get": self.get_ticket,
+            "ticket.changeLog": self.get_changelog,
+            "ticket.listAttachments": self.list_attachments,
+            "ticket.getAttachment": self.get_attachment,
+            "ticket.getRecentChanges": self.get_recent_changes,
+            "wiki.getAllPages": lambda: [self._page_name(page_id) for page_id in range(self.wiki_pages)],
+            "wiki.getPage": self.get_wiki_page,
+            "wiki.getPageInfo": self.get_wiki_page_info,
+            "wiki.getRecentChanges": self.get_recent_wiki_changes,
+            "wiki.wikiToHtml": lambda text: f"<p>\n{html.escape(text)}\n</p>\n",
+        }
+
+    def _random(self, *key: Any) -> random.Random:
+        return random.Random(":".join(map(str, (self.seed, *key))))
+
+    def _check_ticket(self, ticket_id: int):
+        if not 1 <= ticket_id <= self.tickets:
+            raise RpcError(f"Ticket {ticket_id} does not exist.", code=404, name="ResourceNotFound")
+
+    def _time_created(self, ticket_id: int) -> datetime:
+        return EPOCH + timedelta(minutes=ticket_id)
+
+    def _time_changed(self, ticket_id: int) -> datetime:
+        return self._time_created(ticket_id) + timedelta(hours=self.changes_per_ticket)
+
+    def handle(self, method: str, params: list[Any]) -> Any:
+        if method not in self.methods:
+            raise RpcError(f'RPC method "{method}" not found', code=-32601, name="JSONRPCError")
+        return self.methods[method](*params)
+
+    def multicall(self, *signatures: dict[str, Any]) -> list[dict[str, Any]]:
+        results = []
+        for signature in signatures:
+            try:
+                results.append(
+                    {"result": self.handle(signature["method"], signature["params"]), "error": None, "id": None}
+                )
+            except RpcError as e:
+                results.append(
+                    {"result": None, "error": {"message": str(e), "code": e.code, "name": e.name}, "id": None}
+                )
+        return results
+
+    def query(self, query: str) -> list[int]:
+        arguments = dict(piece.partition("=")[::2] for piece in query.split("&"))
+        per_page, page_number = int(arguments.get("max", 100)), int(arguments.get("page", 1))
+        if per_page == 0:
+            return list(range(1, self.tickets + 1))
+        if page_number > 1 and (page_number - 1) * per_page >= self.tickets:
+            raise RpcError(f"Page {page_number} is beyond the number of pages in the query")
+        return list(range((page_number - 1) * per_page + 1, min(page_number * per_page, self.tickets) + 1))
+
+    def get_ticket(self, ticket_id: int) -> list[Any]:
+        self._check_ticket(ticket_id)
+        rng = self._random("ticket", ticket_id)
+        time_created, time_changed = self._time_created(ticket_id), self._time_changed(ticket_id)
+        return [
+            ticket_id,
+            encode_datetime(time_created),
+            encode_datetime(time_changed),
+            {
+                "summary": f"Ticket {ticket_id} summary",
+                "reporter": rng.choice(AUTHORS),
+                "owner": rng.choice(AUTHORS),
+                "description": f"Description of ticket {ticket_id}\r\n\r\n" + "Lorem ipsum dolor sit amet. " * 10,
+                "type": rng.choice(TYPES),
+                "status": rng.choice(STATUSES),
+                "priority": rng.choice(PRIORITIES),
+                "milestone": rng.choice(["", *MILESTONES]),
+                "component": rng.choice(COMPONENTS),
+                "version": rng.choice(["", *VERSIONS]),
+                "resolution": rng.choice(["", *RESOLUTIONS]),
+                "keywords": " ".join(rng.sample(["perf", "ui", "api", "docs", "regression"], 2)),
+                "cc": " ".join(rng.sample(AUTHORS, 2)),
+                "time": encode_datetime(time_created),
+                "changetime": encode_datetime(time_changed),
+                "_ts": str(int(time_changed.timestamp() * 1_000_000)),
+            },
+        ]
+
+    def get_changelog(self, ticket_id: int) -> list[list[Any]]:
+        self._check_ticket(ticket_id)
+        rng = self._random("changelog", ticket_id)
+        changelog = []
+        for change in range(self.changes_per_ticket):
+            timestamp = encode_datetime(self._time_created(ticket_id) + timedelta(hours=change + 1))
+            author = rng.choice(AUTHORS)
+            match rng.choice(["comment", "status", "owner", "priority"]):
+                case "comment":
+                    changelog.append([timestamp, author, "comment", str(change + 1), f"Comment {change + 1}", 1])
+                case "status":
+                    changelog.append([timestamp, author, "status", *rng.sample(STATUSES, 2), 1])
+                case "owner":
+                    changelog.append([timestamp, author, "owner", *rng.sample(AUTHORS, 2), 1])
+                case "priority":
+                    changelog.append([timestamp, author, "priority", *rng.sample(PRIORITIES, 2), 1])
+        return changelog
+
+    def _attachment_content(self, ticket_id: int, filename: str) -> bytes:
+        return self._random("attachment", ticket_id, filename).randbytes(self.attachment_size)
+
+    def list_attachments(self, ticket_id: int) -> list[list[Any]]:
+        self._check_ticket(ticket_id)
+        return [
+            [
+                f"attachment{attachment}.bin",
+                f"Attachment {attachment}",
+                self.attachment_size,
+                encode_datetime(self._time_created(ticket_id) + timedelta(minutes=attachment)),
+                AUTHORS[attachment % len(AUTHORS)],
+            ]
+            for attachment in range(self.attachments_per_ticket)
+        ]
+
+    def get_attachment(self, ticket_id: int, filename: str) -> dict[str, Any]:
+        self._check_ticket(ticket_id)
+        content = base64.b64encode(self._attachment_content(ticket_id, filename)).decode()
+        return {"__jsonclass__": ["binary", content]}
+
+    def get_recent_changes(self, since: dict[str, Any]) -> list[int]:
+        since = decode_datetime(since)
+        return [ticket_id for ticket_id in range(1, self.tickets + 1) if self._time_changed(ticket_id) >= since]
+
+    @staticmethod
+    def _page_name(page_id: int) -> str:
+        return f"Page{page_id}"
+
+    def _page_id(self, name: str) -> int:
+        if not name.startswith("Page") or not 0 <= (page_id := int(name.removeprefix("Page"))) < self.wiki_pages:
+            raise RpcError(f"Wiki page '{name}' does not exist.", code=404, name="ResourceNotFound")
+        return page_id
+
+    def get_wiki_page(self, name: str, version: int | None = None) -> str:
+        return f"= {name} =\n\n" + f"Text of {name}. " * (10 + self._page_id(name) % 50)
+
+    def get_wiki_page_info(self, name: str, version: int | None = None) -> dict[str, Any]:
+        page_id = self._page_id(name)
+        return {
+            "name": name,
+            "author": AUTHORS[page_id % len(AUTHORS)],
+            "version": 1 + page_id % 3,
+            "lastModified": encode_datetime(EPOCH + timedelta(hours=page_id)),
+            "comment": "",
+        }
+
+    def get_recent_wiki_changes(self, since: dict[str, Any]) -> list[dict[str, Any]]:
+        since = decode_datetime(since)
+        return [
+            self.get_wiki_page_info(self._page_name(page_id))
+            for page_id in range(self.wiki_pages)
+            if EPOCH + timedelta(hours=page_id) >= since
+        ]
+
+
+class FakeTracRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    server: "FakeTracServer"
+
+    def log_message(self, format: str, *args: Any):
+        pass
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        try:
+            response = {
+                "result": self.server.trac.handle(request["method"], request.get("params") or []),
+                "error": None,
+                "id": request.get("id"),
+            }
+        except RpcError as e:
+            response = {"result": None, "error": {"message": str(e), "code": e.code, "name": e.name}, "id": None}
+
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeTracServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, trac: FakeTrac, *, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        super().__init__((host, port), FakeTracRequestHandler)
+        self.trac = trac
+        self.latency = latency
+
+    @property
+    def rpc_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/rpc"
+
+
+@contextlib.contextmanager
+def serve(trac: FakeTrac, *, latency: float = 0.0) -> Iterator[str]:
+    """Serve `trac` on a random local port in a background thread and yield the RPC URL"""
+    server = FakeTracServer(trac, latency=latency)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.rpc_url
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--tickets", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeTracServer(FakeTrac(tickets=args.tickets), port=args.port, latency=args.latency)
+    print(f"Serving fake Trac JSON-RPC API on {server.rpc_url}")
+    with contextlib.suppress(KeyboardInterrupt):
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark of the memory retained by tickets and changelogs fetched with `iter_tickets` from a local stand-in Trac
+JSON-RPC server, with and without an `InternPool` shared across the calls.
+
+Usage: python benchmarks/interning.py [--tickets N] [--changes-per-ticket N]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from fake_trac import FakeTrac, serve
+
+from trac_rpc.client import ApiClient
+from trac_rpc.validators import InternPool
+
+
+def measure(rpc_url: str, ticket_ids: range, intern_pool: InternPool | None) -> int:
+    api_client = ApiClient(rpc_url=rpc_url, intern_pool=intern_pool)
+
+    gc.collect()
+    tracemalloc.start()
+    tickets = list(api_client.iter_tickets(ticket_ids, with_changelog=True))
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del tickets
+    return retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=20000)
+    parser.add_argument("--changes-per-ticket", type=int, default=20)
+    args = parser.parse_args()
+
+    trac = FakeTrac(tickets=args.tickets, changes_per_ticket=args.changes_per_ticket)
+    ticket_ids = range(1, trac.tickets + 1)
+
+    with serve(trac) as rpc_url:
+        baseline = measure(rpc_url, ticket_ids, None)
+        interned = measure(rpc_url, ticket_ids, InternPool())
+
+    print(f"without pool: {baseline / 2**20:8.1f} MiB")
+    print(f"with pool:    {interned / 2**20:8.1f} MiB ({interned / baseline:.0%})")
+
+
+if __name__ == "__main__":
+    main()
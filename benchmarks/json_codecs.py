@@ -0,0 +1,75 @@
+"""
+Microbenchmarks of the JSON codecs available to `ApiClient`: encoding requests (with and without reused templates)
+and parsing multicall responses of tickets and changelogs, for every codec that is installed.
+
+Usage: python benchmarks/json_codecs.py [--number N]
+"""
+
+import argparse
+import importlib.util
+import json
+import timeit
+
+from fake_trac import FakeTrac
+
+from trac_rpc.client import _build_multicall_request
+from trac_rpc.codecs import CODECS, RequestEncoder, get_codec
+from trac_rpc.decoders import get_response_model
+from trac_rpc.models import TracRequest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=1000)
+    args = parser.parse_args()
+
+    trac = FakeTrac()
+    parameterless = TracRequest(method="ticket.component.getAll")
+    multicall = _build_multicall_request(
+        tuple((TracRequest(method="ticket.get", params=[ticket_id]), object) for ticket_id in range(1, 101))
+    )
+    responses = {
+        name: json.dumps({"id": None, "error": None, "result": trac.handle("system.multicall", signatures)}).encode()
+        for name, signatures in (
+            ("tickets", [{"method": "ticket.get", "params": [ticket_id]} for ticket_id in range(1, 101)]),
+            ("changelogs", [{"method": "ticket.changeLog", "params": [ticket_id]} for ticket_id in range(1, 101)]),
+        )
+    }
+
+    def report(label: str, seconds: float):
+        print(f"{label:<40} {seconds / args.number * 1e6:10.2f} us/call")
+
+    report(
+        "encode parameterless model_dump+stdlib",
+        timeit.timeit(lambda: json.dumps(parameterless.model_dump()), number=args.number),
+    )
+    report(
+        "encode multicall model_dump+stdlib",
+        timeit.timeit(lambda: json.dumps(multicall.model_dump()), number=args.number),
+    )
+    for name, data in responses.items():
+        report(
+            f"parse {name} pydantic",
+            timeit.timeit(lambda data=data: get_response_model(list).model_validate_json(data), number=args.number),
+        )
+
+    for codec_name in CODECS:
+        if codec_name != "stdlib" and importlib.util.find_spec(codec_name) is None:
+            print(f"{codec_name}: not installed")
+            continue
+
+        encoder = RequestEncoder(get_codec(codec_name))
+        report(
+            f"encode parameterless {codec_name}",
+            timeit.timeit(lambda: encoder.encode(parameterless), number=args.number),
+        )
+        report(f"encode multicall {codec_name}", timeit.timeit(lambda: encoder.encode(multicall), number=args.number))
+        for name, data in responses.items():
+            report(
+                f"parse {name} {codec_name}",
+                timeit.timeit(lambda data=data: encoder.codec.decode(data), number=args.number),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark of the throughput of `get_ticket` calls made from a thread pool with different `HttpClient` profiles against
+a local stand-in Trac JSON-RPC server.
+
+Usage: python benchmarks/profiles.py [--calls N] [--latency SECONDS] [--workers N ...] [PROFILE ...]
+"""
+
+import argparse
+import importlib.util
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fake_trac import FakeTrac, serve
+
+from trac_rpc.client import HTTP_CLIENT_PROFILES, ApiClient, HttpClient
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("profiles", nargs="*", metavar="PROFILE", help=f"one of {', '.join(HTTP_CLIENT_PROFILES)}")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.005, help="latency injected by the server per request")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    profiles = args.profiles or ["default", *HTTP_CLIENT_PROFILES]
+    if importlib.util.find_spec("h2") is None:
+        profiles = [
+            name for name in profiles if name not in HTTP_CLIENT_PROFILES or not HTTP_CLIENT_PROFILES[name].http2
+        ]
+
+    trac = FakeTrac(tickets=1000)
+    with serve(trac, latency=args.latency) as rpc_url:
+        for profile in profiles:
+            for workers in args.workers:
+                with HttpClient(profile=None if profile == "default" else profile) as http_client:
+                    api_client = ApiClient(rpc_url=rpc_url, http_client=http_client)
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        started = time.perf_counter()
+                        for _ in executor.map(api_client.get_ticket, (i % trac.tickets + 1 for i in range(args.calls))):
+                            pass
+                        elapsed = time.perf_counter() - started
+                print(f"{profile:>16} {workers:>4} workers: {args.calls / elapsed:10.1f} calls/s")
+
+
+if __name__ == "__main__":
+    main()
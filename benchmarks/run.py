@@ -0,0 +1,139 @@
+"""
+Benchmark suite running API client calls against a local stand-in Trac JSON-RPC server.
+
+For each scenario, reports calls per second, p50/p99 latency, memory allocated by the calls (as traced by
+`tracemalloc`) and the peak RSS of the process. Results are written as JSON to track regressions across releases.
+
+Usage: python benchmarks/run.py [--calls N] [--tickets N] [--latency SECONDS] [--output results.json] [SCENARIO ...]
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from fake_trac import FakeTrac, serve
+
+from trac_rpc.__about__ import VERSION
+from trac_rpc.client import ApiClient
+
+type Scenario = Callable[[ApiClient, FakeTrac], Callable[[], Any]]
+
+
+def scenario_get_ticket(api_client: ApiClient, trac: FakeTrac) -> Callable[[], Any]:
+    ticket_ids = itertools.cycle(range(1, trac.tickets + 1))
+    return lambda: api_client.get_ticket(next(ticket_ids))
+
+
+def scenario_query_tickets(api_client: ApiClient, trac: FakeTrac) -> Callable[[], Any]:
+    return lambda: api_client.query_tickets()
+
+
+def scenario_get_ticket_changelog(api_client: ApiClient, trac: FakeTrac) -> Callable[[], Any]:
+    ticket_ids = itertools.cycle(range(1, trac.tickets + 1))
+    return lambda: api_client.get_ticket_changelog(next(ticket_ids))
+
+
+def scenario_wiki_to_html(api_client: ApiClient, trac: FakeTrac) -> Callable[[], Any]:
+    texts = itertools.cycle(f"'''Bold''' text of snippet {i}, ''italic'' and `monospaced`" for i in range(100))
+    return lambda: api_client.wiki_to_html(next(texts))
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "get_ticket": scenario_get_ticket,
+    "query_tickets": scenario_query_tickets,
+    "get_ticket_changelog": scenario_get_ticket_changelog,
+    "wiki_to_html": scenario_wiki_to_html,
+}
+
+
+def get_peak_rss() -> int:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def measure(call: Callable[[], Any], calls: int, warmup: int) -> dict[str, Any]:
+    for _ in range(warmup):
+        call()
+
+    gc.collect()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(calls):
+        call_started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    for _ in range(max(1, calls // 10)):
+        call()
+    allocated_current, allocated_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "calls": calls,
+        "calls_per_second": calls / elapsed,
+        "latency_p50_seconds": percentiles[49],
+        "latency_p99_seconds": percentiles[98],
+        "traced_memory_peak_bytes": allocated_peak,
+        "traced_memory_retained_bytes": allocated_current,
+        "peak_rss_bytes": get_peak_rss(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO", help=f"one of {', '.join(SCENARIOS)}")
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--tickets", type=int, default=1000)
+    parser.add_argument("--changes-per-ticket", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="latency injected by the server per request")
+    parser.add_argument("--decode-mode", choices=["validate", "trusted"], default="validate")
+    parser.add_argument("--output", type=Path, help="write results to this file instead of stdout")
+    args = parser.parse_args()
+
+    if unknown := set(args.scenarios) - set(SCENARIOS):
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    trac = FakeTrac(tickets=args.tickets, changes_per_ticket=args.changes_per_ticket)
+    results = {}
+
+    with serve(trac, latency=args.latency) as rpc_url:
+        for name in args.scenarios or SCENARIOS:
+            api_client = ApiClient(rpc_url=rpc_url, decode_mode=args.decode_mode)
+            results[name] = measure(SCENARIOS[name](api_client, trac), args.calls, args.warmup)
+
+    report = json.dumps(
+        {
+            "version": VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(UTC).isoformat(),
+            "parameters": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+            "results": results,
+        },
+        indent=2,
+    )
+
+    if args.output is not None:
+        args.output.write_text(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
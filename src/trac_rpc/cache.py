@@ -0,0 +1,338 @@
+import contextlib
+import copy
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple, Self
+
+from trac_rpc.concurrency import SingleFlight
+
+if TYPE_CHECKING:
+    from trac_rpc.client import ApiClient
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    version REAL,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0
+
+
+class SqliteCache:
+    """
+    Persistent key-value store in a local SQLite database with least recently used eviction.
+
+    Entries are stored by namespace and key, optionally along with a version, which is used by subclasses to detect
+    stale entries. If `max_size` is set, least recently accessed entries are evicted once the total size of the stored
+    data exceeds `max_size` bytes. Instances can be shared between threads.
+    """
+
+    def __init__(self, path: Path | str, *, max_size: int | None = None):
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.executescript(SCHEMA)
+        (self._size,) = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        self._hits = self._misses = self._evictions = 0
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, namespace: str, key: str, version: float | None = None) -> bytes | None:
+        """Get the data stored under `key`, if any (and if it matches `version`, when given)"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data, version FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if row is None or (version is not None and row[1] != version):
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._connection.execute(
+                "UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?", (time.time(), namespace, key)
+            )
+            return row[0]
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> dict[str, bytes]:
+        """Same as `get` for many keys at once, in a single transaction; only the keys found are returned"""
+        with self._transaction():
+            found = {}
+            for key in keys:
+                row = self._connection.execute(
+                    "SELECT data FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                if row is None:
+                    self._misses += 1
+                    continue
+                self._hits += 1
+                found[key] = row[0]
+
+            accessed = time.time()
+            self._connection.executemany(
+                "UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?",
+                ((accessed, namespace, key) for key in found),
+            )
+            return found
+
+    def put(self, namespace: str, key: str, data: bytes, version: float | None = None):
+        with self._transaction():
+            self._insert(namespace, key, data, version)
+            self._evict()
+
+    def put_many(self, namespace: str, entries: Mapping[str, bytes]):
+        """Same as `put` for many entries at once, in a single transaction"""
+        with self._transaction():
+            for key, data in entries.items():
+                self._insert(namespace, key, data)
+            self._evict()
+
+    def delete(self, namespace: str, key: str):
+        with self._transaction():
+            self._delete(namespace, key)
+
+    def clear(self):
+        with self._transaction():
+            self._connection.execute("DELETE FROM entries")
+            self._size = 0
+
+    def get_metadata(self, key: str) -> str | None:
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+            return row[0] if row is not None else None
+
+    def set_metadata(self, key: str, value: str):
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", (key, value))
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            (entries,) = self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=entries,
+                size=self._size,
+            )
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                yield
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                (self._size,) = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+                raise
+            else:
+                self._connection.execute("COMMIT")
+
+    def _insert(self, namespace: str, key: str, data: bytes, version: float | None = None):
+        self._delete(namespace, key)
+        self._connection.execute(
+            "INSERT INTO entries (namespace, key, version, data, size, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+            (namespace, key, version, data, len(data), time.time()),
+        )
+        self._size += len(data)
+
+    def _delete(self, namespace: str, key: str):
+        row = self._connection.execute(
+            "DELETE FROM entries WHERE namespace = ? AND key = ? RETURNING size", (namespace, key)
+        ).fetchone()
+        if row is not None:
+            self._size -= row[0]
+
+    def _evict(self):
+        if self._max_size is None:
+            return
+
+        while self._size > self._max_size:
+            row = self._connection.execute(
+                "DELETE FROM entries WHERE rowid = (SELECT rowid FROM entries ORDER BY accessed LIMIT 1) RETURNING size"
+            ).fetchone()
+            if row is None:
+                break
+            self._size -= row[0]
+            self._evictions += 1
+
+
+class TicketCache(SqliteCache):
+    """
+    Persistent cache for tickets, changelogs and attachment lists.
+
+    Raw results are stored by ticket ID along with the time the ticket was last changed. Fetching a ticket with a
+    different change time invalidates its cached changelog and attachments. Tickets changed on the server since the
+    last refresh are invalidated in bulk with a single `ticket.getRecentChanges` call by `refresh`.
+    """
+
+    TICKET = "ticket"
+    CHANGELOG = "changelog"
+    ATTACHMENTS = "attachments"
+
+    LAST_REFRESH = "last_refresh"
+
+    def __init__(self, path: Path | str, *, max_size: int | None = None, clock_skew: timedelta = timedelta(minutes=5)):
+        super().__init__(path, max_size=max_size)
+        self._clock_skew = clock_skew
+        if self.get_metadata(self.LAST_REFRESH) is None:
+            self.set_metadata(self.LAST_REFRESH, datetime.now(UTC).isoformat())
+
+    @property
+    def last_refresh(self) -> datetime:
+        return datetime.fromisoformat(self.get_metadata(self.LAST_REFRESH))
+
+    def get_result(self, namespace: str, ticket_id: int) -> Any | None:
+        data = self.get(namespace, str(ticket_id), self._get_changetime(ticket_id))
+        return json.loads(data) if data is not None else None
+
+    def put_result(self, namespace: str, ticket_id: int, result: Any, changetime: float | None = None):
+        if namespace == self.TICKET:
+            if changetime != self._get_changetime(ticket_id):
+                self.invalidate(ticket_id)
+        else:
+            changetime = self._get_changetime(ticket_id)
+        self.put(namespace, str(ticket_id), json.dumps(result).encode(), changetime)
+
+    def invalidate(self, ticket_id: int):
+        for namespace in (self.TICKET, self.CHANGELOG, self.ATTACHMENTS):
+            self.delete(namespace, str(ticket_id))
+
+    def refresh(self, api_client: "ApiClient") -> list[int]:
+        """Invalidate all tickets changed on the server since the last refresh and return their IDs"""
+        started = datetime.now(UTC)
+        ticket_ids = api_client.get_recent_ticket_changes(self.last_refresh - self._clock_skew)
+        for ticket_id in ticket_ids:
+            self.invalidate(ticket_id)
+        self.set_metadata(self.LAST_REFRESH, started.isoformat())
+        return ticket_ids
+
+    def _get_changetime(self, ticket_id: int) -> float | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT version FROM entries WHERE namespace = ? AND key = ?", (self.TICKET, str(ticket_id))
+            ).fetchone()
+            return row[0] if row is not None else None
+
+
+class WikiHtmlCache(SqliteCache):
+    """
+    Persistent cache for Wiki text rendered as HTML, addressed by the SHA-256 hash of the text, so that identical texts
+    (such as boilerplate in ticket descriptions and comments) are only rendered once, across runs.
+
+    The HTML depends on the server it is rendered by (e.g. links to tickets and pages that exist, or plugins), so a
+    cache should only be used with a single server, and cleared after upgrades or configuration changes.
+    """
+
+    HTML = "wiki_html"
+
+    @staticmethod
+    def get_key(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get_html(self, text: str) -> str | None:
+        data = self.get(self.HTML, self.get_key(text))
+        return data.decode() if data is not None else None
+
+    def get_html_many(self, texts: Iterable[str]) -> dict[str, str]:
+        """Get the cached HTML of many texts at once, by text; only the texts found are returned"""
+        keys = {self.get_key(text): text for text in texts}
+        return {keys[key]: data.decode() for key, data in self.get_many(self.HTML, keys).items()}
+
+    def put_html(self, text: str, html: str):
+        self.put(self.HTML, self.get_key(text), html.encode())
+
+    def put_html_many(self, rendered: Mapping[str, str]):
+        """Store the HTML of many texts at once, by text"""
+        self.put_many(self.HTML, {self.get_key(text): html.encode() for text, html in rendered.items()})
+
+
+class LookupCache:
+    """
+    In-process memoization for lookups that rarely change, such as the names of components or milestones.
+
+    Values expire after `ttl` seconds, which can be overridden per RPC method with `ttls`. Once more than
+    `max_entries` values are stored, the least recently used ones are evicted. Concurrent lookups of the same value
+    are coalesced into a single call. Instances can be shared between threads.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 300.0,
+        ttls: Mapping[str, float] | None = None,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._ttl = ttl
+        self._ttls = dict(ttls or {})
+        self._max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._single_flight: SingleFlight[tuple, Any] = SingleFlight()
+
+    def get_or_fetch[T](self, key: tuple, fetch: Callable[[], T]) -> T:
+        """Get the value stored under `key`, whose first element is the RPC method name, or fetch and store it"""
+        with self._lock:
+            if (entry := self._entries.get(key)) is not None:
+                expires, value = entry
+                if expires > self._clock():
+                    self._entries.move_to_end(key)
+                    return copy.copy(value)
+                del self._entries[key]
+
+        value = self._single_flight.do(key, functools.partial(self._fetch, key, fetch))
+        return copy.copy(value)
+
+    def invalidate(self, method: str | None = None):
+        """Invalidate all values fetched by a given RPC method, or all values if no method is given"""
+        with self._lock:
+            for key in [key for key in self._entries if method is None or key[0] == method]:
+                del self._entries[key]
+
+    def _fetch[T](self, key: tuple, fetch: Callable[[], T]) -> T:
+        value = fetch()
+        with self._lock:
+            self._entries[key] = (self._clock() + self._ttls.get(key[0], self._ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return value
@@ -0,0 +1,97 @@
+import bisect
+import operator
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timedelta
+
+from trac_rpc.models import TracTicketChangelog, TracTicketChangelogEntry
+
+_timestamp = operator.attrgetter("timestamp")
+
+
+class ChangelogIndex:
+    """
+    Index of ticket changelogs for answering field history queries across many tickets without scanning changelogs.
+
+    Changes are stored by ticket and field, as well as by ticket, field and new value, in lists sorted by timestamp,
+    so that each query takes a dictionary lookup and a binary search. Changelogs can be added incrementally as new
+    changes arrive; changes that are already indexed are skipped.
+    """
+
+    def __init__(self, changelogs: Mapping[int, TracTicketChangelog] | None = None):
+        self._changes: dict[tuple[int, str], list[TracTicketChangelogEntry]] = {}
+        self._changes_to: dict[tuple[int, str, str], list[TracTicketChangelogEntry]] = {}
+        for ticket_id, changelog in (changelogs or {}).items():
+            self.add(ticket_id, changelog)
+
+    def __len__(self) -> int:
+        return sum(map(len, self._changes.values()))
+
+    def add(self, ticket_id: int, changes: Iterable[TracTicketChangelogEntry]):
+        """Add changes of a ticket to the index, in any order"""
+        for change in changes:
+            entries = self._changes.setdefault((ticket_id, change.field), [])
+            index = bisect.bisect_left(entries, change.timestamp, key=_timestamp)
+            if change in entries[index : bisect.bisect_right(entries, change.timestamp, key=_timestamp, lo=index)]:
+                continue
+            bisect.insort(entries, change, key=_timestamp)
+            bisect.insort(
+                self._changes_to.setdefault((ticket_id, change.field, change.new_value), []), change, key=_timestamp
+            )
+
+    def get_changes(self, ticket_id: int, field_name: str) -> list[TracTicketChangelogEntry]:
+        """Return all changes of a ticket field, oldest first"""
+        return list(self._changes.get((ticket_id, field_name), ()))
+
+    def last_change(
+        self, ticket_id: int, field_name: str, new_value: str | None = None
+    ) -> TracTicketChangelogEntry | None:
+        """Return the last change of a ticket field (to `new_value`, if given), same as `find_last_field_change`"""
+        entries = self._get_entries(ticket_id, field_name, new_value)
+        return entries[-1] if entries else None
+
+    def first_change(
+        self, ticket_id: int, field_name: str, new_value: str | None = None
+    ) -> TracTicketChangelogEntry | None:
+        """Return the first change of a ticket field (to `new_value`, if given), e.g. when a ticket entered a state"""
+        entries = self._get_entries(ticket_id, field_name, new_value)
+        return entries[0] if entries else None
+
+    def value_at(self, ticket_id: int, field_name: str, timestamp: datetime) -> str | None:
+        """
+        Return the value of a ticket field at `timestamp`, as set by the last change made at or before it, or the
+        value before the first change otherwise. If the field has never changed, None is returned, and the current
+        value of the field applies.
+        """
+        entries = self._changes.get((ticket_id, field_name))
+        if not entries:
+            return None
+        if (index := bisect.bisect_right(entries, timestamp, key=_timestamp)) == 0:
+            return entries[0].old_value
+        return entries[index - 1].new_value
+
+    def time_in_state(self, ticket_id: int, field_name: str, value: str, start: datetime, end: datetime) -> timedelta:
+        """
+        Return how long a ticket field had `value` between `start` (e.g. when the ticket was created) and `end`. If the
+        field has never changed, this is assumed not to be its value; check the current value of the field instead.
+
+        Only the changes made within the interval are visited after a binary search for its start.
+        """
+        entries = self._changes.get((ticket_id, field_name), ())
+        index = bisect.bisect_right(entries, start, key=_timestamp)
+        entered = start if self.value_at(ticket_id, field_name, start) == value else None
+
+        total = timedelta()
+        for entry in entries[index : bisect.bisect_right(entries, end, key=_timestamp, lo=index)]:
+            if entered is not None and entry.new_value != value:
+                total += entry.timestamp - entered
+                entered = None
+            elif entered is None and entry.new_value == value:
+                entered = entry.timestamp
+        if entered is not None:
+            total += end - entered
+        return total
+
+    def _get_entries(self, ticket_id: int, field_name: str, new_value: str | None) -> list[TracTicketChangelogEntry]:
+        if new_value is None:
+            return self._changes.get((ticket_id, field_name), [])
+        return self._changes_to.get((ticket_id, field_name, new_value), [])
@@ -1,66 +1,355 @@
+import contextlib
+import copy
+import functools
+import itertools
+import json
 import logging
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Literal
 
-import httpx
-
-from trac_rpc.exceptions import TracRpcError
+from trac_rpc import concurrency
+from trac_rpc.cache import LookupCache, TicketCache, WikiHtmlCache
+from trac_rpc.codecs import JSON_HEADERS, CodecName, JsonCodec, RequestEncoder, get_codec
+from trac_rpc.columnar import ChangelogColumns, TicketColumns
+from trac_rpc.decoders import (
+    TRUSTED_DECODERS,
+    decode_result,
+    get_response_model,
+    get_ticket_properties_type,
+    get_type_adapter,
+    unwrap_response,
+)
+from trac_rpc.exceptions import TracRpcError, get_error, is_not_found
+from trac_rpc.files import atomic_write
+from trac_rpc.metrics import MetricsSink, TracCallMetrics
 from trac_rpc.models import (
     TracApiVersion,
+    TracAttachment,
     TracComponent,
     TracMilestone,
     TracRequest,
-    TracResponse,
+    TracRpcErrorResponse,
     TracTicket,
     TracTicketAttachments,
     TracTicketChangelog,
     TracTicketChangelogEntry,
+    TracTicketDetails,
     TracTicketProperties,
     TracVersion,
+    TracWikiPageInfo,
 )
+from trac_rpc.streaming import BinaryResultStream, JsonResultStream
+from trac_rpc.validators import InternPool, interning, serialize_datetime
+
+if TYPE_CHECKING:
+    import httpx
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MULTICALL_CHUNK_SIZE = 100
+DEFAULT_QUERY_PAGE_SIZE = 1000
+DEFAULT_MAX_BYTES_IN_FLIGHT = 64 * 1024 * 1024
 
-class HttpClient(httpx.Client):
-    @staticmethod
-    def log_trac_rpc_request(request: httpx.Request):
-        logger.debug(f"Trac API Request: {request.method} {request.url} {request.content.decode()}")
+# Trac refuses to return pages past the end of the result set (see `trac.ticket.query.Query.execute`) with a
+# `TracError`, which the RPC plugin reports with this code and a message in the language of the server
+INTERNAL_ERROR_CODE = -32603
+
+
+def find_last_field_change(
+    changelog: TracTicketChangelog, field_name: str, new_value: str | None = None
+) -> TracTicketChangelogEntry | None:
+    entry, *_ = [
+        change
+        for change in reversed(changelog)
+        if change.field == field_name and (change.new_value == new_value if new_value is not None else True)
+    ] + [None]
+    return entry
+
+
+def _get_request_key(request: TracRequest, klass: type) -> tuple:
+    return request.method, json.dumps(request.params, sort_keys=True), klass
+
+
+def _build_query_request(query: str, per_page: int, page_number: int | None) -> TracRequest:
+    pieces = (
+        *((query,) if query != "" else ()),
+        *((f"page={page_number}",) if page_number is not None else ()),
+        f"max={per_page}",
+    )
+    return TracRequest(method="ticket.query", params=["&".join(pieces)])
+
+
+def _build_multicall_request(calls: tuple[tuple[TracRequest, type], ...]) -> TracRequest:
+    # Trac passes `params` to the target method as `*args`, so parameterless calls need an empty list here
+    signatures = [request.model_dump() | {"params": request.params or []} for request, _ in calls]
+    return TracRequest(method="system.multicall", params=signatures)
+
+
+def _build_wiki_page_request(method: str, page_name: str, version: int | None) -> TracRequest:
+    return TracRequest(method=method, params=[page_name] if version is None else [page_name, version])
+
+
+def _check_ticket_results[R: tuple](results: Iterable[R], skip_missing: bool) -> list[R]:
+    # Each item holds the results of the calls for one ticket
+    checked = []
+    for ticket_results in results:
+        if (error := get_error(ticket_results)) is None:
+            checked.append(ticket_results)
+        elif not (skip_missing and is_not_found(error)):
+            raise error
+    return checked
+
+
+def _decode_multicall_results(
+    calls: tuple[tuple[TracRequest, type], ...], results: list[dict], trusted: bool = False
+) -> Iterator[Any]:
+    for (request, klass), result in zip(calls, results, strict=True):
+        try:
+            yield decode_result(result, klass, trusted=trusted)
+        except TracRpcError as e:
+            yield e
+        except ValueError as e:
+            # A result that fails validation is reported like an error response, so as not to fail the whole batch
+            error = TracRpcError(f"Invalid result of {request.method}: {e}")
+            error.__cause__ = e
+            yield error
+
+
+type DecodeMode = Literal["validate", "trusted"]
+
+# Request extensions used to pass information from `ApiClient` to the logging hooks
+EXTENSION_RPC_METHOD = "trac_rpc_method"
+EXTENSION_STARTED = "trac_rpc_started"
+EXTENSION_STREAM = "trac_rpc_stream"
+
+# The HTTP clients are defined in `trac_rpc.transport` and only imported when needed, as importing httpx (and asyncio)
+# takes longer than importing the rest of the package
+_TRANSPORT_NAMES = frozenset(
+    ("AsyncHttpClient", "HTTP_CLIENT_PROFILES", "HttpClient", "HttpClientProfile", "LogFormat")
+)
 
-    @staticmethod
-    def log_trac_rpc_response(response: httpx.Response):
-        request = response.request
-        response.read()
-        logger.debug(f"Trac API Response: {request.method} {request.url} {response.status_code} {response.text}")
-
-    def __init__(self, *, event_hooks=None, **kwargs):
-        super().__init__(
-            event_hooks=(
-                event_hooks
-                if event_hooks is not None
-                else {
-                    "request": [HttpClient.log_trac_rpc_request],
-                    "response": [HttpClient.log_trac_rpc_response, httpx.Response.raise_for_status],
-                }
-            ),
-            **kwargs,
-        )
+
+def __getattr__(name: str) -> Any:
+    if name in _TRANSPORT_NAMES:
+        from trac_rpc import transport
+
+        return getattr(transport, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class ApiClient:
-    def __init__(self, rpc_url: str, *, http_client: httpx.Client | None = None):
+    def __init__(
+        self,
+        rpc_url: str,
+        *,
+        http_client: "httpx.Client | None" = None,
+        ticket_cache: TicketCache | None = None,
+        lookup_cache: LookupCache | None = None,
+        wiki_html_cache: WikiHtmlCache | None = None,
+        metrics_sink: MetricsSink | None = None,
+        decode_mode: DecodeMode = "validate",
+        coalesce: bool = False,
+        limiter: concurrency.AdaptiveLimiter | None = None,
+        intern_pool: InternPool | None = None,
+        json_codec: CodecName | JsonCodec = "auto",
+    ):
+        """
+        With `decode_mode="trusted"`, responses for tickets, changelogs and attachments decoded into the default models
+        are converted by hand-written decoders instead of being validated by pydantic field by field. This is faster,
+        but assumes that the responses are well-formed, so it should only be used with trusted servers.
+
+        With `coalesce=True`, identical calls made concurrently from different threads share a single request and its
+        decoded result.
+
+        With a `limiter`, the number of calls in flight is adapted to the server's capacity and calls failing with 5xx
+        responses or timeouts are retried, which suits bulk and parallel usage such as `map` and `iter_tickets`.
+
+        With an `intern_pool`, equal strings of decoded tickets, changelogs and attachments share a single object
+        across all calls made with this client (and any other client sharing the pool), which saves memory when many
+        objects are kept around. Responses decoded by the hand-written decoders of `decode_mode="trusted"` are not
+        interned.
+
+        Requests are encoded, and responses parsed in trusted mode, with `json_codec`: by default the fastest of orjson,
+        msgspec and the standard library that is installed.
+
+        With a `wiki_html_cache`, Wiki text rendered by `wiki_to_html` and `wiki_to_html_many` is only rendered once.
+        """
         self._rpc_url = rpc_url
-        self._http_client = http_client if http_client is not None else HttpClient()
+        if http_client is None:
+            from trac_rpc.transport import HttpClient
+
+            http_client = HttpClient()
+        self._http_client = http_client
+        self._ticket_cache = ticket_cache
+        self._lookup_cache = lookup_cache
+        self._wiki_html_cache = wiki_html_cache
+        self._metrics_sink = metrics_sink
+        self._trusted = decode_mode == "trusted"
+        self._single_flight = concurrency.SingleFlight() if coalesce else None
+        self._limiter = limiter
+        self._intern_pool = intern_pool
+        self._encoder = RequestEncoder(get_codec(json_codec))
+
+    def _interning(self) -> contextlib.AbstractContextManager:
+        return interning(self._intern_pool) if self._intern_pool is not None else contextlib.nullcontext()
 
     def _request[T](self, request: TracRequest, klass: type[T]) -> T:
-        http_response = self._http_client.post(self._rpc_url, json=request.model_dump())
-        trac_response = TracResponse[klass].model_validate_json(http_response.text)
+        with self._interning():
+            return self._request_coalesced(request, klass)
+
+    def _request_coalesced[T](self, request: TracRequest, klass: type[T]) -> T:
+        if self._single_flight is not None:
+            # Results are shallow-copied, so that callers do not share mutable lists
+            return copy.copy(
+                self._single_flight.do(
+                    _get_request_key(request, klass),
+                    functools.partial(self._send_request, request, klass),
+                )
+            )
+        return self._send_request(request, klass)
 
-        if trac_response.error is not None:
-            raise TracRpcError(trac_response.error.message, error=trac_response.error)
+    def _send_request[T](self, request: TracRequest, klass: type[T]) -> T:
+        if self._limiter is not None:
+            return self._limiter.call(functools.partial(self._send_request_unlimited, request, klass))
+        return self._send_request_unlimited(request, klass)
 
-        return trac_response.result.root
+    def _send_request_unlimited[T](self, request: TracRequest, klass: type[T]) -> T:
+        if self._metrics_sink is not None:
+            return self._request_instrumented(request, klass)
+
+        http_response = self._http_client.post(
+            self._rpc_url,
+            content=self._encoder.encode(request),
+            headers=JSON_HEADERS,
+            extensions={EXTENSION_RPC_METHOD: request.method},
+        )
+
+        if self._trusted and klass in TRUSTED_DECODERS:
+            return decode_result(self._encoder.codec.decode(http_response.content), klass, trusted=True)
+
+        return unwrap_response(get_response_model(klass).model_validate_json(http_response.content))
+
+    def _request_instrumented[T](self, request: TracRequest, klass: type[T]) -> T:
+        # Same as `_request`, but with every phase done separately, so that it can be timed on its own
+        started = time.perf_counter()
+        http_request = self._http_client.build_request(
+            "POST",
+            self._rpc_url,
+            content=self._encoder.encode(request),
+            headers=JSON_HEADERS,
+            extensions={EXTENSION_RPC_METHOD: request.method},
+        )
+        encoded = time.perf_counter()
+
+        http_response = self._http_client.send(http_request, stream=True)
+        try:
+            responded = time.perf_counter()
+            content = http_response.read()
+        finally:
+            http_response.close()
+        read = time.perf_counter()
+
+        data = self._encoder.codec.decode(content)
+        parsed = time.perf_counter()
+
+        try:
+            return decode_result(data, klass, trusted=self._trusted)
+        finally:
+            self._metrics_sink.record(
+                TracCallMetrics(
+                    method=request.method,
+                    encode=encoded - started,
+                    round_trip=responded - encoded,
+                    read=read - responded,
+                    parse=parsed - read,
+                    validate=time.perf_counter() - parsed,
+                    request_size=len(http_request.content),
+                    response_size=len(content),
+                )
+            )
 
     def _request_list_pod[T: str | int](self, function: str, klass: type[T]) -> list[T]:
-        return self._request(TracRequest(method=function), list[klass])
+        return self._request_lookup(TracRequest(method=function), list[klass])
+
+    def _request_lookup[T](self, request: TracRequest, klass: type[T]) -> T:
+        if self._lookup_cache is None:
+            return self._request(request, klass)
+
+        return self._lookup_cache.get_or_fetch(
+            (request.method, *(request.params or ()), klass),
+            functools.partial(self._request, request, klass),
+        )
+
+    def _request_ticket_data[T](self, namespace: str, ticket_id: int, request: TracRequest, klass: type[T]) -> T:
+        if self._ticket_cache is None:
+            return self._request(request, klass)
+
+        adapter = get_type_adapter(klass)
+        if (result := self._ticket_cache.get_result(namespace, ticket_id)) is not None:
+            with self._interning():
+                return adapter.validate_python(result)
+
+        result = self._request(request, Any)
+        with self._interning():
+            value = adapter.validate_python(result)
+        self._ticket_cache.put_result(
+            namespace,
+            ticket_id,
+            result,
+            value.time_changed.timestamp() if namespace == TicketCache.TICKET else None,
+        )
+        return value
+
+    def _request_stream[T](self, request: TracRequest, item_klass: type[T]) -> Iterator[T]:
+        adapter = get_type_adapter(item_klass)
+        stream = JsonResultStream()
+
+        with self._http_client.stream(
+            "POST",
+            self._rpc_url,
+            content=self._encoder.encode(request),
+            headers=JSON_HEADERS,
+            extensions={EXTENSION_RPC_METHOD: request.method, EXTENSION_STREAM: True},
+        ) as http_response:
+            for chunk in http_response.iter_bytes():
+                for item in stream.feed(chunk):
+                    with self._interning():
+                        value = adapter.validate_json(item)
+                    yield value
+
+        if (error := stream.close().get("error")) is not None:
+            error = TracRpcErrorResponse.model_validate(error)
+            raise TracRpcError(error.message, error=error)
+
+    def _request_binary(self, request: TracRequest, file: BinaryIO) -> int:
+        stream = BinaryResultStream()
+        size = 0
+
+        with self._http_client.stream(
+            "POST",
+            self._rpc_url,
+            content=self._encoder.encode(request),
+            headers=JSON_HEADERS,
+            extensions={EXTENSION_RPC_METHOD: request.method, EXTENSION_STREAM: True},
+        ) as http_response:
+            for chunk in http_response.iter_bytes():
+                if data := stream.feed(chunk):
+                    file.write(data)
+                    size += len(data)
+
+        if (error := stream.close().get("error")) is not None:
+            error = TracRpcErrorResponse.model_validate(error)
+            raise TracRpcError(error.message, error=error)
+        return size
+
+    def _multicall(self, calls: tuple[tuple[TracRequest, type], ...]) -> list[Any]:
+        results = self._request(_build_multicall_request(calls), list[dict[str, Any]])
+        with self._interning():
+            return list(_decode_multicall_results(calls, results, self._trusted))
 
     # system - Core of the RPC system
     def get_api_version(self) -> TracApiVersion:
@@ -71,6 +360,52 @@ class ApiClient:
         """
         return self._request(TracRequest(method="system.getAPIVersion"), TracApiVersion)
 
+    def iter_multicall(
+        self,
+        calls: Iterable[tuple[TracRequest, type]],
+        *,
+        chunk_size: int = DEFAULT_MULTICALL_CHUNK_SIZE,
+    ) -> Iterator[Any]:
+        """
+        Execute `(request, klass)` pairs in batches of `chunk_size` calls per round-trip via `system.multicall` and
+        yield decoded results in order. Failed calls, and results that fail validation, are yielded as `TracRpcError`
+        instances instead of being raised, so that a single error does not fail the whole batch.
+        """
+        for chunk in itertools.batched(calls, chunk_size):
+            yield from self._multicall(chunk)
+
+    def multicall(
+        self,
+        calls: Iterable[tuple[TracRequest, type]],
+        *,
+        chunk_size: int = DEFAULT_MULTICALL_CHUNK_SIZE,
+    ) -> list[Any]:
+        """Same as `iter_multicall`, but returns all results at once"""
+        return list(self.iter_multicall(calls, chunk_size=chunk_size))
+
+    def map[A, T](
+        self,
+        method: str | Callable[[A], T],
+        items: Iterable[A],
+        *,
+        max_workers: int | None = None,
+        ordered: bool = True,
+        cancel: threading.Event | None = None,
+    ) -> Iterator[concurrency.MapResult[A, T]]:
+        """
+        Call a method of this client (given by name, or any callable such as a `functools.partial` of one) on each item
+        in parallel over up to `max_workers` threads sharing this client, which is safe to use from multiple threads.
+        By default, there are as many threads as the maximum limit of the client's limiter, if any.
+
+        A `MapResult` is yielded per item, holding either its result or the exception raised for it, in the order of
+        the items or in completion order if `ordered` is false. Pending calls are cancelled when `cancel` is set or the
+        iteration is stopped early.
+        """
+        function = getattr(self, method) if isinstance(method, str) else method
+        if max_workers is None:
+            max_workers = self._limiter.maximum if self._limiter is not None else concurrency.DEFAULT_MAX_WORKERS
+        return concurrency.parallel_map(function, items, max_workers, ordered=ordered, cancel=cancel)
+
     # ticket.component - Interface to ticket component objects
     # ticket.milestone - Interface to ticket milestone objects
     # ticket.priority - Interface to ticket priority
@@ -114,15 +449,15 @@ class ApiClient:
 
     def get_component[T: TracComponent](self, component_name: str, klass: type[T] = TracComponent) -> T:
         """Get a ticket component"""
-        return self._request(TracRequest(method="ticket.component.get", params=[component_name]), klass)
+        return self._request_lookup(TracRequest(method="ticket.component.get", params=[component_name]), klass)
 
     def get_milestone[T: TracMilestone](self, milestone_name: str, klass: type[T] = TracMilestone) -> T:
         """Get a ticket milestone"""
-        return self._request(TracRequest(method="ticket.milestone.get", params=[milestone_name]), klass)
+        return self._request_lookup(TracRequest(method="ticket.milestone.get", params=[milestone_name]), klass)
 
     def get_version[T: TracVersion](self, version_name: str, klass: type[T] = TracVersion) -> T:
         """Get a ticket priority"""
-        return self._request(TracRequest(method="ticket.version.get", params=[version_name]), klass)
+        return self._request_lookup(TracRequest(method="ticket.version.get", params=[version_name]), klass)
 
     # The following objects are just strings and do not need custom getters:
     #
@@ -140,18 +475,82 @@ class ApiClient:
         number of results per page and paging options. Use max=n to define number of results to receive,
         and use page=n to page through larger result sets. Using max=0 will turn off paging and return all results.
         """
-        pieces = (
-            *((query,) if query != "" else ()),
-            *((f"page={page_number}",) if page_number is not None else ()),
-            f"max={per_page}",
-        )
-        return self._request(TracRequest(method="ticket.query", params=["&".join(pieces)]), list[int])
+        return self._request(_build_query_request(query, per_page, page_number), list[int])
 
     def get_ticket_attachments(self, ticket_id: int) -> TracTicketAttachments:
         """
         Lists attachments for a given ticket. Returns (filename, description, size, time, author) for each attachment
         """
-        return self._request(TracRequest(method="ticket.listAttachments", params=[ticket_id]), TracTicketAttachments)
+        return self._request_ticket_data(
+            TicketCache.ATTACHMENTS,
+            ticket_id,
+            TracRequest(method="ticket.listAttachments", params=[ticket_id]),
+            TracTicketAttachments,
+        )
+
+    def download_ticket_attachment(
+        self, ticket_id: int, attachment: TracAttachment | str, destination: Path | str | BinaryIO
+    ) -> int:
+        """
+        Download the content of an attachment of a ticket, given by `TracAttachment` (see `get_ticket_attachments`) or
+        file name, into `destination`: either a path or a binary file object. Returns the number of bytes written.
+
+        The response is decoded incrementally and written as it is received, so that memory usage does not depend on
+        the size of the attachment. If a `TracAttachment` is given, the number of bytes received is checked against
+        its size. A file at `destination` path is only replaced once the download is complete and checked.
+        """
+        filename = attachment.filename if isinstance(attachment, TracAttachment) else attachment
+        request = TracRequest(method="ticket.getAttachment", params=[ticket_id, filename])
+
+        if not isinstance(destination, Path | str):
+            size = self._request_binary(request, destination)
+            self._check_attachment_size(attachment, size)
+            return size
+
+        with atomic_write(destination) as file:
+            size = self._request_binary(request, file)
+            self._check_attachment_size(attachment, size)
+        return size
+
+    @staticmethod
+    def _check_attachment_size(attachment: TracAttachment | str, size: int):
+        if isinstance(attachment, TracAttachment) and size != attachment.size:
+            raise ValueError(f"attachment {attachment.filename!r} has {size} bytes, expected {attachment.size}")
+
+    def download_ticket_attachments(
+        self,
+        attachments: Iterable[tuple[int, TracAttachment]],
+        directory: Path | str,
+        *,
+        max_workers: int | None = None,
+        max_bytes_in_flight: int = DEFAULT_MAX_BYTES_IN_FLIGHT,
+        ordered: bool = True,
+    ) -> Iterator[concurrency.MapResult[tuple[int, TracAttachment], int]]:
+        """
+        Download many `(ticket ID, attachment)` pairs in parallel with `map`, each into `<ticket ID>/<file name>`
+        within `directory`, and yield a `MapResult` with the number of bytes written (or the error raised) for each.
+
+        Downloads only start once the total size of the attachments being downloaded fits within
+        `max_bytes_in_flight`, to bound the load on the server and the local disk; an attachment larger than that is
+        downloaded on its own. Downloads are not subject to the client's limiter, as a partially written download
+        cannot be retried, so there are `concurrency.DEFAULT_MAX_WORKERS` threads by default.
+        """
+        directory = Path(directory)
+        budget = concurrency.ByteBudget(max_bytes_in_flight)
+
+        def download(item: tuple[int, TracAttachment]) -> int:
+            ticket_id, attachment = item
+            # Trac does not allow path separators in file names, but the names come from the server all the same
+            if attachment.filename in ("", ".", "..") or "/" in attachment.filename or "\\" in attachment.filename:
+                raise ValueError(f"invalid attachment file name {attachment.filename!r}")
+            path = directory / str(ticket_id) / attachment.filename
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with budget.reserve(attachment.size):
+                return self.download_ticket_attachment(ticket_id, attachment, path)
+
+        if max_workers is None:
+            max_workers = concurrency.DEFAULT_MAX_WORKERS
+        return self.map(download, attachments, max_workers=max_workers, ordered=ordered)
 
     def get_ticket_changelog(self, ticket_id: int) -> TracTicketChangelog:
         """
@@ -159,16 +558,238 @@ class ApiClient:
         While the other tuple elements are quite self-explanatory, the permanent flag is used to distinguish
         collateral changes that are not yet immutable (like attachments, currently)
         """
-        return self._request(TracRequest(method="ticket.changeLog", params=[ticket_id]), TracTicketChangelog)
+        return self._request_ticket_data(
+            TicketCache.CHANGELOG,
+            ticket_id,
+            TracRequest(method="ticket.changeLog", params=[ticket_id]),
+            TracTicketChangelog,
+        )
 
     def get_ticket[T: TracTicket](self, ticket_id: int, klass: type[T] = TracTicket) -> TracTicketProperties[T]:
         """Fetch a ticket. Returns [id, time_created, time_changed, attributes]"""
-        return self._request(TracRequest(method="ticket.get", params=[ticket_id]), TracTicketProperties[klass])
+        return self._request_ticket_data(
+            TicketCache.TICKET,
+            ticket_id,
+            TracRequest(method="ticket.get", params=[ticket_id]),
+            get_ticket_properties_type(klass),
+        )
+
+    def get_recent_ticket_changes(self, since: datetime) -> list[int]:
+        """Returns a list of IDs of tickets that have changed since timestamp"""
+        return self._request(
+            TracRequest(method="ticket.getRecentChanges", params=[serialize_datetime(since)]), list[int]
+        )
+
+    def _query_tickets_page(self, query: str, page_size: int, page_number: int) -> list[int]:
+        try:
+            return self.query_tickets(query, per_page=page_size, page_number=page_number)
+        except TracRpcError as e:
+            # A page past the first one is only requested after a full page, so the error means that it is out of range
+            if page_number > 1 and e.error is not None and e.error.code == INTERNAL_ERROR_CODE:
+                return []
+            raise
+
+    def iter_query_tickets(self, query: str = "", page_size: int = DEFAULT_QUERY_PAGE_SIZE) -> Iterator[int]:
+        """
+        Perform a ticket query page by page, yielding ticket ID's lazily. The next page is fetched in the background
+        while the current one is being consumed. Iteration stops after the last page, i.e. the first short or empty
+        one, or when Trac reports that the requested page is out of range.
+        """
+        if page_size <= 0:
+            raise ValueError(f"page size must be positive, got {page_size}")
+
+        last_page = threading.Event()
+
+        def fetch_page(page_number: int) -> list[int]:
+            page = self._query_tickets_page(query, page_size, page_number)
+            if len(page) < page_size:
+                last_page.set()
+            return page
+
+        # With a window of one page, page N has been received by the time the request for page N + 1 is made, so no
+        # request is made past the last page
+        pages = concurrency.prefetch(
+            (
+                functools.partial(fetch_page, page_number)
+                for page_number in itertools.takewhile(lambda _: not last_page.is_set(), itertools.count(1))
+            ),
+            window=1,
+        )
+        with contextlib.closing(pages):
+            for page in pages:
+                yield from page
+                if len(page) < page_size:
+                    break
+
+    def stream_query_tickets(self, query: str = "", per_page: int = 0, page_number: int | None = None) -> Iterator[int]:
+        """
+        Same as `query_tickets`, but the response is decoded incrementally and ticket IDs are yielded one at a time
+        """
+        return self._request_stream(_build_query_request(query, per_page, page_number), int)
+
+    def stream_ticket_attachments(self, ticket_id: int) -> Iterator[TracAttachment]:
+        """
+        Same as `get_ticket_attachments`, but the response is decoded incrementally and attachments are yielded one
+        at a time
+        """
+        return self._request_stream(TracRequest(method="ticket.listAttachments", params=[ticket_id]), TracAttachment)
+
+    def stream_ticket_changelog(self, ticket_id: int) -> Iterator[TracTicketChangelogEntry]:
+        """
+        Same as `get_ticket_changelog`, but the response is decoded incrementally and changelog entries are yielded
+        one at a time
+        """
+        return self._request_stream(
+            TracRequest(method="ticket.changeLog", params=[ticket_id]), TracTicketChangelogEntry
+        )
+
+    def _fetch_tickets[T: TracTicket](
+        self,
+        ticket_ids: tuple[int, ...],
+        klass: type[T],
+        with_changelog: bool,
+        with_attachments: bool,
+        skip_missing: bool,
+    ) -> list[TracTicketProperties[T] | TracTicketDetails[T]]:
+        methods = (
+            ("ticket.get", get_ticket_properties_type(klass)),
+            *((("ticket.changeLog", TracTicketChangelog),) if with_changelog else ()),
+            *((("ticket.listAttachments", TracTicketAttachments),) if with_attachments else ()),
+        )
+        results = list(
+            self._multicall(
+                tuple(
+                    (TracRequest(method=method, params=[ticket_id]), result_klass)
+                    for ticket_id in ticket_ids
+                    for method, result_klass in methods
+                )
+            )
+        )
+
+        results = _check_ticket_results(itertools.batched(results, len(methods)), skip_missing)
+
+        if len(methods) == 1:
+            return [properties for (properties,) in results]
+
+        details = []
+        for properties, *extras in results:
+            extras = iter(extras)
+            details.append(
+                TracTicketDetails(
+                    properties=properties,
+                    changelog=next(extras) if with_changelog else None,
+                    attachments=next(extras) if with_attachments else None,
+                )
+            )
+        return details
+
+    def iter_tickets[T: TracTicket](
+        self,
+        ticket_ids: Iterable[int],
+        klass: type[T] = TracTicket,
+        *,
+        with_changelog: bool = False,
+        with_attachments: bool = False,
+        chunk_size: int = DEFAULT_MULTICALL_CHUNK_SIZE,
+        prefetch: int = concurrency.DEFAULT_PREFETCH,
+        skip_missing: bool = False,
+    ) -> Iterator[TracTicketProperties[T] | TracTicketDetails[T]]:
+        """
+        Fetch tickets in batches of `chunk_size` via `system.multicall` and yield them in order as soon as they are
+        decoded. Up to `prefetch` batches are requested in the background ahead of the consumer, so that memory usage
+        stays bounded regardless of the number of tickets.
+
+        If `with_changelog` or `with_attachments` is set, `TracTicketDetails` are yielded instead, which additionally
+        contain the changelog and/or attachments of each ticket fetched in the same batches.
+
+        A ticket that fails to be fetched raises its `TracRpcError`, which ends the iteration. With `skip_missing`,
+        tickets that do not exist (e.g. deleted ones, when iterating over a range of IDs) are skipped instead.
+        """
+        fetch = functools.partial(
+            self._fetch_tickets,
+            klass=klass,
+            with_changelog=with_changelog,
+            with_attachments=with_attachments,
+            skip_missing=skip_missing,
+        )
+        for tickets in concurrency.prefetch(
+            (functools.partial(fetch, chunk) for chunk in itertools.batched(ticket_ids, chunk_size)),
+            prefetch,
+        ):
+            yield from tickets
+
+    def _fetch_raw_results(self, method: str, ticket_ids: tuple[int, ...], skip_missing: bool) -> list[tuple[int, Any]]:
+        results = self._multicall(
+            tuple((TracRequest(method=method, params=[ticket_id]), Any) for ticket_id in ticket_ids)
+        )
+        return _check_ticket_results(zip(ticket_ids, results, strict=True), skip_missing)
+
+    def _iter_raw_results(
+        self, method: str, ticket_ids: Iterable[int], chunk_size: int, prefetch: int, skip_missing: bool
+    ) -> Iterator[tuple[int, Any]]:
+        for results in concurrency.prefetch(
+            (
+                functools.partial(self._fetch_raw_results, method, chunk, skip_missing)
+                for chunk in itertools.batched(ticket_ids, chunk_size)
+            ),
+            prefetch,
+        ):
+            yield from results
+
+    def get_ticket_columns(
+        self,
+        ticket_ids: Iterable[int],
+        *,
+        chunk_size: int = DEFAULT_MULTICALL_CHUNK_SIZE,
+        prefetch: int = concurrency.DEFAULT_PREFETCH,
+        skip_missing: bool = False,
+    ) -> TicketColumns:
+        """
+        Same as `iter_tickets`, but the tickets are stored into memory-compact `TicketColumns` as they are received,
+        instead of being decoded into models
+        """
+        columns = TicketColumns()
+        for _, ticket in self._iter_raw_results("ticket.get", ticket_ids, chunk_size, prefetch, skip_missing):
+            columns.append(ticket)
+        return columns
+
+    def get_changelog_columns(
+        self,
+        ticket_ids: Iterable[int],
+        *,
+        chunk_size: int = DEFAULT_MULTICALL_CHUNK_SIZE,
+        prefetch: int = concurrency.DEFAULT_PREFETCH,
+        skip_missing: bool = False,
+    ) -> ChangelogColumns:
+        """
+        Fetch the changelogs of many tickets in batches like `iter_tickets` and store them into memory-compact
+        `ChangelogColumns` as they are received, instead of decoding them into models
+        """
+        columns = ChangelogColumns()
+        for ticket_id, changelog in self._iter_raw_results(
+            "ticket.changeLog", ticket_ids, chunk_size, prefetch, skip_missing
+        ):
+            columns.append(ticket_id, changelog)
+        return columns
 
     # wiki - Superset of the WikiRPC API
     def get_all_wiki_pages(self) -> list[str]:
         """Returns a list of all pages. The result is an array of utf8 page names"""
-        return self._request_list_pod("wiki.getAllPages", str)
+        return self._request(TracRequest(method="wiki.getAllPages"), list[str])
+
+    def get_recent_wiki_changes(self, since: datetime) -> list[TracWikiPageInfo]:
+        """Get list of changed pages since timestamp"""
+        return self._request(
+            TracRequest(method="wiki.getRecentChanges", params=[serialize_datetime(since)]), list[TracWikiPageInfo]
+        )
+
+    def get_wiki_page(self, page_name: str, version: int | None = None) -> str:
+        """Get the raw Wiki text of page, latest version unless `version` is given"""
+        return self._request(_build_wiki_page_request("wiki.getPage", page_name, version), str)
+
+    def get_wiki_page_info(self, page_name: str, version: int | None = None) -> TracWikiPageInfo:
+        """Returns information about the given page, latest version unless `version` is given"""
+        return self._request(_build_wiki_page_request("wiki.getPageInfo", page_name, version), TracWikiPageInfo)
 
     def wiki_to_html(self, text: str) -> str:
         """
@@ -176,16 +797,242 @@ class ApiClient:
 
         For some migrations, the RPC server may need to be patched to force `escape_newlines=True`.
         """
-        return self._request(TracRequest(method="wiki.wikiToHtml", params=[text]), str)
+        if self._wiki_html_cache is not None and (html := self._wiki_html_cache.get_html(text)) is not None:
+            return html
+
+        html = self._request(TracRequest(method="wiki.wikiToHtml", params=[text]), str)
+        if self._wiki_html_cache is not None:
+            self._wiki_html_cache.put_html(text, html)
+        return html
+
+    def _render_wiki_texts(self, texts: tuple[str, ...]) -> dict[str, str | TracRpcError]:
+        results = self._multicall(tuple((TracRequest(method="wiki.wikiToHtml", params=[text]), str) for text in texts))
+        rendered = dict(zip(texts, results, strict=True))
+        if self._wiki_html_cache is not None:
+            self._wiki_html_cache.put_html_many(
+                {text: html for text, html in rendered.items() if isinstance(html, str)}
+            )
+        return rendered
+
+    def wiki_to_html_many(
+        self,
+        texts: Iterable[str],
+        *,
+        chunk_size: int = DEFAULT_MULTICALL_CHUNK_SIZE,
+        prefetch: int = concurrency.DEFAULT_PREFETCH,
+    ) -> list[str | TracRpcError]:
+        """
+        Render many Wiki texts as HTML, such as ticket descriptions and comments during a migration.
+
+        Each distinct text is only rendered once: texts found in the client's `wiki_html_cache` are not rendered again,
+        and the others are rendered in batches of `chunk_size` per `system.multicall` round-trip, with up to `prefetch`
+        batches in flight, and stored into the cache as the batches complete. Results are returned in the order of
+        `texts`; texts that failed to render are returned as `TracRpcError` instances, as by `multicall`.
+        """
+        texts = list(texts)
+        rendered: dict[str, str | TracRpcError | None] = dict.fromkeys(texts)
+        if self._wiki_html_cache is not None:
+            rendered.update(self._wiki_html_cache.get_html_many(rendered))
+
+        missing = [text for text, html in rendered.items() if html is None]
+        for results in concurrency.prefetch(
+            (functools.partial(self._render_wiki_texts, chunk) for chunk in itertools.batched(missing, chunk_size)),
+            prefetch,
+        ):
+            rendered.update(results)
+        return [rendered[text] for text in texts]
 
     # Utilities
     def get_ticket_last_field_change(
         self, ticket_id: int, field_name: str, new_value: str | None = None
     ) -> TracTicketChangelogEntry | None:
         """Get the changelog entry that represents the last time a given field was set to a particular value"""
-        entry, *_ = [
-            change
-            for change in reversed(self.get_ticket_changelog(ticket_id))
-            if change.field == field_name and (change.new_value == new_value if new_value is not None else True)
-        ] + [None]
-        return entry
+        return find_last_field_change(self.get_ticket_changelog(ticket_id), field_name, new_value)
+
+
+class AsyncApiClient:
+    """
+    Asynchronous counterpart of `ApiClient` with the same methods.
+
+    The number of requests in flight at the same time can be bounded by `max_concurrency` to avoid overloading the
+    Trac server when running many calls concurrently, e.g. with `asyncio.gather`. With `coalesce=True`, identical calls
+    made concurrently from different tasks share a single request and its decoded result.
+    """
+
+    def __init__(
+        self,
+        rpc_url: str,
+        *,
+        http_client: "httpx.AsyncClient | None" = None,
+        max_concurrency: int | None = None,
+        coalesce: bool = False,
+        json_codec: CodecName | JsonCodec = "auto",
+    ):
+        self._rpc_url = rpc_url
+        import asyncio
+
+        if http_client is None:
+            from trac_rpc.transport import AsyncHttpClient
+
+            http_client = AsyncHttpClient()
+        self._http_client = http_client
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency is not None else None
+        self._single_flight = concurrency.AsyncSingleFlight() if coalesce else None
+        self._encoder = RequestEncoder(get_codec(json_codec))
+
+    async def _request[T](self, request: TracRequest, klass: type[T]) -> T:
+        if self._single_flight is not None:
+            return copy.copy(
+                await self._single_flight.do(
+                    _get_request_key(request, klass),
+                    functools.partial(self._send_request, request, klass),
+                )
+            )
+        return await self._send_request(request, klass)
+
+    async def _send_request[T](self, request: TracRequest, klass: type[T]) -> T:
+        async with self._semaphore if self._semaphore is not None else contextlib.nullcontext():
+            http_response = await self._http_client.post(
+                self._rpc_url,
+                content=self._encoder.encode(request),
+                headers=JSON_HEADERS,
+                extensions={EXTENSION_RPC_METHOD: request.method},
+            )
+        return unwrap_response(get_response_model(klass).model_validate_json(http_response.content))
+
+    async def _request_list_pod[T: str | int](self, function: str, klass: type[T]) -> list[T]:
+        return await self._request(TracRequest(method=function), list[klass])
+
+    async def _multicall(self, calls: tuple[tuple[TracRequest, type], ...]) -> list[Any]:
+        results = await self._request(_build_multicall_request(calls), list[dict[str, Any]])
+        return list(_decode_multicall_results(calls, results))
+
+    # system - Core of the RPC system
+    async def get_api_version(self) -> TracApiVersion:
+        """See `ApiClient.get_api_version`"""
+        return await self._request(TracRequest(method="system.getAPIVersion"), TracApiVersion)
+
+    async def multicall(
+        self,
+        calls: Iterable[tuple[TracRequest, type]],
+        *,
+        chunk_size: int = DEFAULT_MULTICALL_CHUNK_SIZE,
+        prefetch: int = concurrency.DEFAULT_PREFETCH,
+    ) -> list[Any]:
+        """
+        See `ApiClient.multicall`; up to `prefetch` chunks are sent concurrently (within the limits of
+        `max_concurrency`), so that large batches do not exhaust the connection pool
+        """
+        import asyncio
+
+        semaphore = asyncio.Semaphore(prefetch)
+
+        async def request_chunk(chunk: tuple[tuple[TracRequest, type], ...]) -> list[Any]:
+            async with semaphore:
+                return await self._multicall(chunk)
+
+        chunks = await asyncio.gather(*(request_chunk(chunk) for chunk in itertools.batched(calls, chunk_size)))
+        return [result for chunk in chunks for result in chunk]
+
+    # ticket.component, ticket.milestone, ticket.priority, ticket.resolution, ticket.severity, ticket.status,
+    # ticket.type, ticket.version
+    async def get_all_components(self) -> list[str]:
+        """Get a list of all ticket component names"""
+        return await self._request_list_pod("ticket.component.getAll", str)
+
+    async def get_all_milestones(self) -> list[str]:
+        """Get a list of all ticket milestone names"""
+        return await self._request_list_pod("ticket.milestone.getAll", str)
+
+    async def get_all_priorities(self) -> list[str]:
+        """Get a list of all ticket priority names"""
+        return await self._request_list_pod("ticket.priority.getAll", str)
+
+    async def get_all_resolutions(self) -> list[str]:
+        """Get a list of all ticket resolution names"""
+        return await self._request_list_pod("ticket.resolution.getAll", str)
+
+    async def get_all_severities(self) -> list[str]:
+        """Get a list of all ticket severity names"""
+        return await self._request_list_pod("ticket.severity.getAll", str)
+
+    async def get_all_statuses(self) -> list[str]:
+        """Returns all ticket states described by active workflow"""
+        return await self._request_list_pod("ticket.status.getAll", str)
+
+    async def get_all_types(self) -> list[str]:
+        """Get a list of all ticket type names"""
+        return await self._request_list_pod("ticket.type.getAll", str)
+
+    async def get_all_versions(self) -> list[str]:
+        """Get a list of all ticket version names"""
+        return await self._request_list_pod("ticket.version.getAll", str)
+
+    async def get_component[T: TracComponent](self, component_name: str, klass: type[T] = TracComponent) -> T:
+        """Get a ticket component"""
+        return await self._request(TracRequest(method="ticket.component.get", params=[component_name]), klass)
+
+    async def get_milestone[T: TracMilestone](self, milestone_name: str, klass: type[T] = TracMilestone) -> T:
+        """Get a ticket milestone"""
+        return await self._request(TracRequest(method="ticket.milestone.get", params=[milestone_name]), klass)
+
+    async def get_version[T: TracVersion](self, version_name: str, klass: type[T] = TracVersion) -> T:
+        """Get a ticket version"""
+        return await self._request(TracRequest(method="ticket.version.get", params=[version_name]), klass)
+
+    # ticket - An interface to Trac's ticketing system
+    async def query_tickets(self, query: str = "", per_page: int = 0, page_number: int | None = None) -> list[int]:
+        """See `ApiClient.query_tickets`"""
+        return await self._request(_build_query_request(query, per_page, page_number), list[int])
+
+    async def get_ticket_attachments(self, ticket_id: int) -> TracTicketAttachments:
+        """See `ApiClient.get_ticket_attachments`"""
+        return await self._request(
+            TracRequest(method="ticket.listAttachments", params=[ticket_id]), TracTicketAttachments
+        )
+
+    async def get_ticket_changelog(self, ticket_id: int) -> TracTicketChangelog:
+        """See `ApiClient.get_ticket_changelog`"""
+        return await self._request(TracRequest(method="ticket.changeLog", params=[ticket_id]), TracTicketChangelog)
+
+    async def get_ticket[T: TracTicket](self, ticket_id: int, klass: type[T] = TracTicket) -> TracTicketProperties[T]:
+        """Fetch a ticket. Returns [id, time_created, time_changed, attributes]"""
+        return await self._request(
+            TracRequest(method="ticket.get", params=[ticket_id]), get_ticket_properties_type(klass)
+        )
+
+    async def get_recent_ticket_changes(self, since: datetime) -> list[int]:
+        """Returns a list of IDs of tickets that have changed since timestamp"""
+        return await self._request(
+            TracRequest(method="ticket.getRecentChanges", params=[serialize_datetime(since)]), list[int]
+        )
+
+    # wiki - Superset of the WikiRPC API
+    async def get_all_wiki_pages(self) -> list[str]:
+        """Returns a list of all pages. The result is an array of utf8 page names"""
+        return await self._request_list_pod("wiki.getAllPages", str)
+
+    async def get_recent_wiki_changes(self, since: datetime) -> list[TracWikiPageInfo]:
+        """See `ApiClient.get_recent_wiki_changes`"""
+        return await self._request(
+            TracRequest(method="wiki.getRecentChanges", params=[serialize_datetime(since)]), list[TracWikiPageInfo]
+        )
+
+    async def get_wiki_page(self, page_name: str, version: int | None = None) -> str:
+        """See `ApiClient.get_wiki_page`"""
+        return await self._request(_build_wiki_page_request("wiki.getPage", page_name, version), str)
+
+    async def get_wiki_page_info(self, page_name: str, version: int | None = None) -> TracWikiPageInfo:
+        """See `ApiClient.get_wiki_page_info`"""
+        return await self._request(_build_wiki_page_request("wiki.getPageInfo", page_name, version), TracWikiPageInfo)
+
+    async def wiki_to_html(self, text: str) -> str:
+        """See `ApiClient.wiki_to_html`"""
+        return await self._request(TracRequest(method="wiki.wikiToHtml", params=[text]), str)
+
+    # Utilities
+    async def get_ticket_last_field_change(
+        self, ticket_id: int, field_name: str, new_value: str | None = None
+    ) -> TracTicketChangelogEntry | None:
+        """Get the changelog entry that represents the last time a given field was set to a particular value"""
+        return find_last_field_change(await self.get_ticket_changelog(ticket_id), field_name, new_value)
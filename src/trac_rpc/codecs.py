@@ -0,0 +1,87 @@
+import functools
+import importlib.util
+import json
+from typing import Any, Literal, Protocol
+
+from trac_rpc.models import TracRequest
+
+type CodecName = Literal["auto", "orjson", "msgspec", "stdlib"]
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class JsonCodec(Protocol):
+    name: str
+
+    def encode(self, value: Any) -> bytes: ...
+
+    def decode(self, data: bytes) -> Any: ...
+
+
+class StdlibCodec:
+    name = "stdlib"
+
+    def encode(self, value: Any) -> bytes:
+        # Same output as the `json=` argument of httpx
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode()
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self.encode = orjson.dumps
+        self.decode = orjson.loads
+
+
+class MsgspecCodec:
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        self.encode = msgspec.json.Encoder().encode
+        self.decode = msgspec.json.Decoder().decode
+
+
+CODECS: dict[str, type[JsonCodec]] = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "stdlib": StdlibCodec,
+}
+
+
+def get_codec(codec: CodecName | JsonCodec = "auto") -> JsonCodec:
+    """
+    Get a JSON codec by name, or the fastest one installed for "auto": orjson, msgspec or the standard library, in
+    this order. Codec instances are passed through.
+    """
+    if not isinstance(codec, str):
+        return codec
+    if codec == "auto":
+        codec = next(name for name in CODECS if name == "stdlib" or importlib.util.find_spec(name) is not None)
+    return CODECS[codec]()
+
+
+class RequestEncoder:
+    """
+    Encode requests into JSON-RPC request bodies with a `JsonCodec`. The bodies of requests without parameters, such
+    as `get_all_components`, are only encoded once and reused afterwards.
+    """
+
+    def __init__(self, codec: JsonCodec):
+        self.codec = codec
+        self._templates = functools.lru_cache(maxsize=None)(self._encode_template)
+
+    def encode(self, request: TracRequest) -> bytes:
+        if request.params is None and request.id is None:
+            return self._templates(request.method)
+        return self.codec.encode({"id": request.id, "method": request.method, "params": request.params})
+
+    def _encode_template(self, method: str) -> bytes:
+        return self.codec.encode({"id": None, "method": method, "params": None})
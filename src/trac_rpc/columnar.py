@@ -0,0 +1,193 @@
+from array import array
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from trac_rpc.decoders import construct_model, decode_optional, decode_space_separated
+from trac_rpc.models import (
+    TracTicket,
+    TracTicketChangelog,
+    TracTicketChangelogEntry,
+    TracTicketProperties,
+)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _encode_datetime(value: dict[str, Any]) -> int:
+    # Same as `_decode_datetime`, but as microseconds since the epoch
+    return (datetime.fromisoformat(value["__jsonclass__"][1]).replace(tzinfo=UTC) - EPOCH) // MICROSECOND
+
+
+def _decode_timestamp(value: int) -> datetime:
+    return EPOCH + value * MICROSECOND
+
+
+class StringDictionary:
+    """Dictionary encoding of repeated strings into integer codes; code 0 stands for None"""
+
+    def __init__(self):
+        self._values: list[str | None] = [None]
+        self._codes: dict[str | None, int] = {None: 0}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def encode(self, value: str | None) -> int:
+        if (code := self._codes.get(value)) is None:
+            code = self._codes[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def decode(self, code: int) -> str | None:
+        return self._values[code]
+
+
+class ChangelogColumns:
+    """
+    Columnar storage of the changelog entries of many tickets. Timestamps are stored as microseconds since the epoch
+    and strings are dictionary-encoded into arrays of integer codes. Entries are only materialized into
+    `TracTicketChangelogEntry` instances on access.
+
+    Columns are appended to directly from raw `ticket.changeLog` results, which are normalized the same way as by the
+    validators of the models, but otherwise assumed to be well-formed (see trusted mode of `ApiClient`).
+    """
+
+    def __init__(self):
+        self.strings = StringDictionary()
+        self.ticket_ids = array("q")
+        self.timestamps = array("q")
+        self.authors = array("i")
+        self.fields = array("i")
+        self.old_values = array("i")
+        self.new_values = array("i")
+        self.permanent = array("b")
+        self._ranges: dict[int, range] = {}
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index: int) -> TracTicketChangelogEntry:
+        decode = self.strings.decode
+        return TracTicketChangelogEntry(
+            _decode_timestamp(self.timestamps[index]),
+            decode(self.authors[index]),
+            decode(self.fields[index]),
+            decode(self.old_values[index]),
+            decode(self.new_values[index]),
+            bool(self.permanent[index]),
+        )
+
+    def __iter__(self) -> Iterator[TracTicketChangelogEntry]:
+        return map(self.__getitem__, range(len(self)))
+
+    def append(self, ticket_id: int, changelog: Iterable[list[Any]]):
+        """
+        Append the raw result of `ticket.changeLog` for a ticket. If a ticket is appended again, `get_changelog`
+        returns the rows appended last.
+        """
+        start = len(self)
+        encode = self.strings.encode
+        for timestamp, author, field, old_value, new_value, permanent in changelog:
+            self.ticket_ids.append(ticket_id)
+            self.timestamps.append(_encode_datetime(timestamp))
+            self.authors.append(encode(author.strip() or None if author is not None else None))
+            self.fields.append(encode(field.strip()))
+            self.old_values.append(encode(old_value.strip()))
+            self.new_values.append(encode(new_value.strip()))
+            self.permanent.append(bool(permanent))
+        self._ranges[ticket_id] = range(start, len(self))
+
+    def get_changelog(self, ticket_id: int) -> TracTicketChangelog:
+        """Materialize the changelog of a ticket"""
+        return [self[index] for index in self._ranges.get(ticket_id, ())]
+
+
+class TicketColumns:
+    """
+    Columnar storage of the properties of many tickets, decoded into the default `TracTicket` model on access. Times
+    are stored as microseconds since the epoch; strings that repeat across tickets, such as status, component or
+    owner, are dictionary-encoded into arrays of integer codes, while summaries and descriptions are kept as is.
+
+    Columns are appended to directly from raw `ticket.get` results, the same way as `ChangelogColumns`.
+    """
+
+    ENCODED_FIELDS = (
+        "reporter",
+        "owner",
+        "type",
+        "status",
+        "priority",
+        "milestone",
+        "component",
+        "version",
+        "resolution",
+        "keywords",
+        "cc",
+    )
+    OPTIONAL_FIELDS = frozenset(("owner", "milestone", "version", "resolution"))
+
+    def __init__(self):
+        self.strings = StringDictionary()
+        self.ids = array("q")
+        self.time_created = array("q")
+        self.time_changed = array("q")
+        self.summaries: list[str] = []
+        self.descriptions: list[str] = []
+        self.columns = {field: array("i") for field in self.ENCODED_FIELDS}
+        self._rows: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> TracTicketProperties[TracTicket]:
+        decode, columns = self.strings.decode, self.columns
+        # Trac reports the same times in the properties and the attributes of a ticket, so they are only stored once
+        time_created = _decode_timestamp(self.time_created[index])
+        time_changed = _decode_timestamp(self.time_changed[index])
+        return TracTicketProperties(
+            self.ids[index],
+            time_created,
+            time_changed,
+            construct_model(
+                TracTicket,
+                {
+                    "summary": self.summaries[index],
+                    "reporter": decode(columns["reporter"][index]),
+                    "owner": decode(columns["owner"][index]),
+                    "description": self.descriptions[index],
+                    "type": decode(columns["type"][index]),
+                    "status": decode(columns["status"][index]),
+                    "priority": decode(columns["priority"][index]),
+                    "milestone": decode(columns["milestone"][index]),
+                    "component": decode(columns["component"][index]),
+                    "version": decode(columns["version"][index]),
+                    "resolution": decode(columns["resolution"][index]),
+                    "keywords": decode_space_separated(decode(columns["keywords"][index])),
+                    "cc": decode_space_separated(decode(columns["cc"][index])),
+                    "time": time_created,
+                    "changetime": time_changed,
+                },
+            ),
+        )
+
+    def __iter__(self) -> Iterator[TracTicketProperties[TracTicket]]:
+        return map(self.__getitem__, range(len(self)))
+
+    def append(self, ticket: list[Any]):
+        """Append the raw result of `ticket.get`"""
+        ticket_id, time_created, time_changed, attributes = ticket
+        self._rows[ticket_id] = len(self)
+        self.ids.append(ticket_id)
+        self.time_created.append(_encode_datetime(time_created))
+        self.time_changed.append(_encode_datetime(time_changed))
+        self.summaries.append(attributes["summary"])
+        self.descriptions.append(attributes["description"])
+        for field, codes in self.columns.items():
+            value = attributes[field]
+            codes.append(self.strings.encode(decode_optional(value) if field in self.OPTIONAL_FIELDS else value))
+
+    def get_ticket(self, ticket_id: int) -> TracTicketProperties[TracTicket] | None:
+        """Materialize the last properties appended for a ticket, if any"""
+        return self[row] if (row := self._rows.get(ticket_id)) is not None else None
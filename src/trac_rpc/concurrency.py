@@ -0,0 +1,322 @@
+import contextlib
+import functools
+import itertools
+import math
+import random
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+if TYPE_CHECKING:
+    import asyncio
+
+DEFAULT_PREFETCH = 2
+DEFAULT_MAX_WORKERS = 8
+
+
+def prefetch[T](tasks: Iterable[Callable[[], T]], window: int = DEFAULT_PREFETCH) -> Iterator[T]:
+    """
+    Run tasks in a thread pool ahead of the consumer and yield their results in order. At most `window` tasks are
+    pending at any time, so that memory usage does not depend on the number of tasks. Tasks are only pulled from the
+    iterable as the window frees up, and pending tasks are cancelled if the consumer stops iterating early.
+    """
+    tasks = iter(tasks)
+    pending: deque[Future[T]] = deque()
+
+    with ThreadPoolExecutor(max_workers=window) as executor:
+        try:
+            pending.extend(executor.submit(task) for task in itertools.islice(tasks, window))
+            while pending:
+                result = pending.popleft().result()
+                pending.extend(executor.submit(task) for task in itertools.islice(tasks, 1))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class MapResult[A, T](NamedTuple):
+    """Outcome of a call made by `parallel_map`: either `result` or `error` is set"""
+
+    item: A
+    result: T | None = None
+    error: Exception | None = None
+
+    def get(self) -> T:
+        """Return the result of the call, or raise its error"""
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def parallel_map[A, T](
+    function: Callable[[A], T],
+    items: Iterable[A],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    *,
+    ordered: bool = True,
+    cancel: threading.Event | None = None,
+) -> Iterator[MapResult[A, T]]:
+    """
+    Call `function` on each item in a thread pool and yield a `MapResult` per item, so that an error does not abort
+    the other calls. Results are yielded in the order of the items, or as soon as they complete if `ordered` is false.
+    At most `2 * max_workers` calls are pending at any time. Calls that have not started are cancelled, and nothing
+    else is yielded, once `cancel` is set or the consumer stops iterating early.
+    """
+    items = iter(items)
+    pending: dict[Future[T], A] = {}  # insertion-ordered, so the first pending call is the next one in order
+
+    def submit(count: int):
+        for item in itertools.islice(items, count):
+            pending[executor.submit(function, item)] = item
+
+    def complete(future: Future[T]) -> MapResult[A, T]:
+        item = pending.pop(future)
+        if (error := future.exception()) is not None:
+            return MapResult(item, error=error)
+        return MapResult(item, future.result())
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            submit(2 * max_workers)
+            while pending and not (cancel is not None and cancel.is_set()):
+                if ordered:
+                    done = [next(iter(pending))]
+                    wait(done)
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                results = [complete(future) for future in done]
+                submit(len(done))
+                yield from results
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def is_overload(error: Exception) -> bool:
+    """Whether an error suggests that the server is overloaded: a 5xx response or a timeout"""
+    # Errors of httpx cannot have been raised unless it has been imported already
+    if (httpx := sys.modules.get("httpx")) is None:
+        return False
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.is_server_error
+    return isinstance(error, httpx.TimeoutException)
+
+
+class LimiterStats(NamedTuple):
+    limit: int
+    in_flight: int
+    completed: int
+    overloaded: int
+    retried: int
+    throughput: float  # calls completed per second over the last `window` seconds
+
+
+class AdaptiveLimiter:
+    """
+    Limit the number of concurrent calls with additive increase / multiplicative decrease (AIMD). While the limit is
+    saturated and calls complete within `tolerance` times the lowest latency observed, it grows by `increase` per
+    limit's worth of calls. When a call fails with an error for which `is_overload` returns true, the limit is
+    multiplied by `decrease` (at most once per round of calls in flight) and the call is retried up to `retries` times
+    after a random delay of up to `backoff * 2**attempt` seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        tolerance: float = 2.0,
+        retries: int = 3,
+        backoff: float = 0.1,
+        is_overload: Callable[[Exception], bool] = is_overload,
+        window: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self._increase = increase
+        self._decrease = decrease
+        self._tolerance = tolerance
+        self._retries = retries
+        self._backoff = backoff
+        self._is_overload = is_overload
+        self._window = window
+        self._clock = clock
+        self._sleep = sleep
+
+        self._condition = threading.Condition()
+        self._limit = float(min(max(initial, minimum), maximum))
+        self._in_flight = 0
+        self._min_latency = math.inf
+        self._last_decrease = -math.inf
+        self._completions: deque[float] = deque()
+        self._completed = self._overloaded = self._retried = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def call[T](self, function: Callable[[], T]) -> T:
+        """Call `function` once the number of calls in flight is below the limit, retrying it on overload errors"""
+        attempt = 0
+        while True:
+            started = self._acquire()
+            outcome: Literal["success", "overload", "error"] = "error"
+            try:
+                result = function()
+                outcome = "success"
+                return result
+            except Exception as e:
+                if not self._is_overload(e):
+                    raise
+                outcome = "overload"
+                if attempt >= self._retries:
+                    raise
+            finally:
+                self._release(started, outcome)
+
+            with self._condition:
+                self._retried += 1
+            self._sleep(random.uniform(0, self._backoff * 2**attempt))
+            attempt += 1
+
+    def stats(self) -> LimiterStats:
+        with self._condition:
+            self._expire_completions(self._clock())
+            return LimiterStats(
+                limit=self.limit,
+                in_flight=self._in_flight,
+                completed=self._completed,
+                overloaded=self._overloaded,
+                retried=self._retried,
+                throughput=len(self._completions) / self._window,
+            )
+
+    def _acquire(self) -> float:
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        return self._clock()
+
+    def _release(self, started: float, outcome: Literal["success", "overload", "error"]):
+        now = self._clock()
+        with self._condition:
+            saturated = self._in_flight >= self.limit
+            self._in_flight -= 1
+
+            if outcome == "success":
+                latency = now - started
+                self._min_latency = min(self._min_latency, latency)
+                self._completed += 1
+                self._completions.append(now)
+                self._expire_completions(now)
+                if saturated and latency <= self._tolerance * self._min_latency:
+                    self._limit = min(self.maximum, self._limit + self._increase / self._limit)
+            elif outcome == "overload":
+                self._overloaded += 1
+                # Calls that were already in flight when the limit was decreased must not decrease it again
+                if started > self._last_decrease:
+                    self._limit = max(self.minimum, self._limit * self._decrease)
+                    self._last_decrease = now
+
+            self._condition.notify_all()
+
+    def _expire_completions(self, now: float):
+        while self._completions and self._completions[0] <= now - self._window:
+            self._completions.popleft()
+
+
+class ByteBudget:
+    """
+    Bound the total size of the transfers in progress across threads: `reserve` waits until `size` bytes fit within
+    `limit` bytes along with the transfers already in progress. A transfer larger than `limit` proceeds once no other
+    transfer is in progress, so that it does not wait forever.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @contextlib.contextmanager
+    def reserve(self, size: int) -> Iterator[None]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_flight == 0 or self._in_flight + size <= self.limit)
+            self._in_flight += size
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= size
+                self._condition.notify_all()
+
+
+class SingleFlight[K, V]:
+    """
+    Deduplicate concurrent calls: while a call for a given key is in flight, other threads calling `do` with the same
+    key wait for it to complete and share its result (or exception) instead of making their own call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[K, Future[V]] = {}
+
+    def do(self, key: K, function: Callable[[], V]) -> V:
+        with self._lock:
+            future = self._calls.get(key)
+            if leader := future is None:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = function()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight[K, V]:
+    """
+    Same as `SingleFlight`, but for coroutines running concurrently in the same event loop.
+
+    The call runs in a task of its own that all callers wait for, so that cancelling one of them (e.g. on a timeout)
+    does not cancel the call for the others.
+    """
+
+    def __init__(self):
+        self._calls: dict[K, asyncio.Task[V]] = {}
+
+    async def do(self, key: K, function: Callable[[], Awaitable[V]]) -> V:
+        import asyncio
+
+        if (task := self._calls.get(key)) is None:
+            task = self._calls[key] = asyncio.ensure_future(function())
+            task.add_done_callback(functools.partial(self._done, key))
+        return await asyncio.shield(task)
+
+    def _done(self, key: K, task: "asyncio.Task[V]"):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark as retrieved in case all callers have been cancelled
@@ -0,0 +1,149 @@
+import functools
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from pydantic import BaseModel, TypeAdapter
+
+from trac_rpc.exceptions import TracRpcError
+from trac_rpc.models import (
+    TracAttachment,
+    TracResponse,
+    TracRpcErrorResponse,
+    TracTicket,
+    TracTicketAttachments,
+    TracTicketChangelog,
+    TracTicketChangelogEntry,
+    TracTicketProperties,
+)
+
+# Bounds the registry in case custom ticket classes are created dynamically
+DECODER_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=DECODER_CACHE_SIZE)
+def get_response_model[T](klass: type[T]) -> type[TracResponse[T]]:
+    """Get the `TracResponse` model specialized for `klass`, which is only parametrized once per `klass`"""
+    return TracResponse[klass]
+
+
+@functools.lru_cache(maxsize=DECODER_CACHE_SIZE)
+def get_ticket_properties_type[T: TracTicket](klass: type[T]) -> type[TracTicketProperties[T]]:
+    """Get the `TracTicketProperties` type specialized for `klass`, which is only parametrized once per `klass`"""
+    return TracTicketProperties[klass]
+
+
+@functools.lru_cache(maxsize=DECODER_CACHE_SIZE)
+def get_type_adapter[T](klass: type[T]) -> TypeAdapter[T]:
+    """Get a `TypeAdapter` for `klass`, which is only built once per `klass`"""
+    return TypeAdapter(klass)
+
+
+# Hand-written decoders for the default models, which produce the same values as validation with pydantic, but
+# assume well-formed input from a trusted server and skip the individual validators
+def _decode_datetime(value: dict[str, Any]) -> datetime:
+    return datetime.fromisoformat(value["__jsonclass__"][1]).replace(tzinfo=UTC)
+
+
+def decode_optional(value: str | None) -> str | None:
+    """Decode an optional string field, where Trac reports missing values as empty strings"""
+    return value if value is not None and value.strip() else None
+
+
+def decode_space_separated(value: str) -> list[str]:
+    """Decode a space-separated list field, such as keywords or CC"""
+    value = value.strip()
+    return [item.strip() for item in value.split(" ") if item] if value else []
+
+
+def construct_model[T: BaseModel](klass: type[T], fields: dict[str, Any]) -> T:
+    """
+    Build an instance of `klass` from already validated `fields`. Equivalent to `klass.model_construct(**fields)` for
+    models without defaults or private attributes, but faster.
+    """
+    instance = klass.__new__(klass)
+    object.__setattr__(instance, "__dict__", fields)
+    object.__setattr__(instance, "__pydantic_fields_set__", set(fields))
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+    return instance
+
+
+def _decode_ticket(value: dict[str, Any]) -> TracTicket:
+    return construct_model(
+        TracTicket,
+        {
+            "summary": value["summary"],
+            "reporter": value["reporter"],
+            "owner": decode_optional(value["owner"]),
+            "description": value["description"],
+            "type": value["type"],
+            "status": value["status"],
+            "priority": value["priority"],
+            "milestone": decode_optional(value["milestone"]),
+            "component": value["component"],
+            "version": decode_optional(value["version"]),
+            "resolution": decode_optional(value["resolution"]),
+            "keywords": decode_space_separated(value["keywords"]),
+            "cc": decode_space_separated(value["cc"]),
+            "time": _decode_datetime(value["time"]),
+            "changetime": _decode_datetime(value["changetime"]),
+        },
+    )
+
+
+def _decode_ticket_properties(value: list[Any]) -> TracTicketProperties[TracTicket]:
+    ticket_id, time_created, time_changed, attributes = value
+    return TracTicketProperties(
+        ticket_id,
+        _decode_datetime(time_created),
+        _decode_datetime(time_changed),
+        _decode_ticket(attributes),
+    )
+
+
+def _decode_changelog_entry(value: list[Any]) -> TracTicketChangelogEntry:
+    timestamp, author, field, old_value, new_value, permanent = value
+    return TracTicketChangelogEntry(
+        _decode_datetime(timestamp),
+        author.strip() or None if author is not None else None,
+        field.strip(),
+        old_value.strip(),
+        new_value.strip(),
+        bool(permanent),
+    )
+
+
+def _decode_attachment(value: list[Any]) -> TracAttachment:
+    filename, description, size, timestamp, author = value
+    return TracAttachment(filename.strip(), description.strip(), size, _decode_datetime(timestamp), author.strip())
+
+
+TRUSTED_DECODERS: dict[Any, Callable[[Any], Any]] = {
+    TracTicketProperties[TracTicket]: _decode_ticket_properties,
+    TracTicketChangelogEntry: _decode_changelog_entry,
+    TracTicketChangelog: lambda value: [_decode_changelog_entry(entry) for entry in value],
+    TracAttachment: _decode_attachment,
+    TracTicketAttachments: lambda value: [_decode_attachment(attachment) for attachment in value],
+}
+
+
+def decode_result[T](data: Any, klass: type[T], *, trusted: bool = False) -> T:
+    """
+    Decode a parsed JSON-RPC response into `klass`, raising `TracRpcError` if it is an error response. If `trusted` is
+    set and a hand-written decoder is available for `klass`, validation with pydantic is skipped.
+    """
+    if trusted and (decoder := TRUSTED_DECODERS.get(klass)) is not None:
+        if data["error"] is not None:
+            error = TracRpcErrorResponse.model_validate(data["error"])
+            raise TracRpcError(error.message, error=error)
+        return decoder(data["result"])
+
+    return unwrap_response(get_response_model(klass).model_validate(data))
+
+
+def unwrap_response[T](trac_response: TracResponse[T]) -> T:
+    if trac_response.error is not None:
+        raise TracRpcError(trac_response.error.message, error=trac_response.error)
+
+    return trac_response.result.root
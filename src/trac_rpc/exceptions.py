@@ -1,5 +1,11 @@
+from collections.abc import Iterable
+from typing import Any
+
 from trac_rpc.models import TracRpcErrorResponse
 
+# Error code of the responses of the XML-RPC plugin for missing tickets, wiki pages, etc.
+NOT_FOUND_CODE = 404
+
 
 class TracRpcError(Exception):
     def __init__(self, message: str, *, error: TracRpcErrorResponse = None):
@@ -9,3 +15,17 @@ class TracRpcError(Exception):
     @property
     def error(self) -> TracRpcErrorResponse:
         return self._error
+
+
+def is_not_found(error: TracRpcError) -> bool:
+    """Return whether `error` reports a missing resource, e.g. a deleted ticket or wiki page"""
+    return error.error is not None and error.error.code == NOT_FOUND_CODE
+
+
+def get_error(results: Iterable[Any]) -> TracRpcError | None:
+    """
+    Return the error among the results of the calls fetching a resource, if any. A not-found error takes precedence, as
+    some methods (e.g. `wiki.getPageInfo`) return null for missing resources.
+    """
+    errors = [result for result in results if isinstance(result, TracRpcError)]
+    return next((error for error in errors if is_not_found(error)), errors[0] if errors else None)
@@ -0,0 +1,36 @@
+import contextlib
+import secrets
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+TEMPORARY_NAME_ATTEMPTS = 100
+
+
+def _create_temporary_file(path: Path) -> tuple[Path, BinaryIO]:
+    # Unlike with `tempfile`, which only lets the current user read the files it creates, the file gets the permissions
+    # of any new file, as set by the umask
+    for _ in range(TEMPORARY_NAME_ATTEMPTS):
+        temporary_path = path.with_name(f".{path.name}.{secrets.token_hex(4)}")
+        try:
+            return temporary_path, temporary_path.open("xb")
+        except FileExistsError:
+            pass
+    raise FileExistsError(f"no temporary file name available for {path}")
+
+
+@contextlib.contextmanager
+def atomic_write(path: Path | str) -> Iterator[BinaryIO]:
+    """
+    Yield a binary file to write the content of `path` into, which replaces `path` once the block exits without error,
+    so that `path` is never left partially written. The file is created next to `path` and is removed on error.
+    """
+    path = Path(path)
+    temporary_path, file = _create_temporary_file(path)
+    try:
+        with file:
+            yield file
+    except BaseException:
+        temporary_path.unlink(missing_ok=True)
+        raise
+    temporary_path.replace(path)
@@ -0,0 +1,100 @@
+import math
+import threading
+from collections import Counter, defaultdict
+from typing import NamedTuple, Protocol
+
+
+class TracCallMetrics(NamedTuple):
+    """Timings (in seconds) of the phases of a single RPC call along with the payload sizes (in bytes)"""
+
+    method: str
+    encode: float
+    round_trip: float
+    read: float
+    parse: float
+    validate: float
+    request_size: int
+    response_size: int
+
+
+PHASES = ("encode", "round_trip", "read", "parse", "validate", "request_size", "response_size")
+
+
+class MetricsSink(Protocol):
+    def record(self, metrics: TracCallMetrics) -> None: ...
+
+
+class Histogram:
+    """
+    Histogram with logarithmic buckets, so that quantiles are estimated with a bounded relative error (controlled by
+    `growth`) over many orders of magnitude in constant memory.
+    """
+
+    def __init__(self, *, minimum: float = 1e-7, growth: float = 2 ** (1 / 8)):
+        self._minimum = minimum
+        self._log_growth = math.log(growth)
+        self._buckets: Counter[int] = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self._buckets[max(0, math.ceil(math.log(max(value, self._minimum) / self._minimum) / self._log_growth))] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    def quantile(self, q: float) -> float:
+        """Estimate the `q`-th quantile as the upper bound of the bucket it falls into"""
+        if not self.count:
+            return math.nan
+
+        rank, seen = q * self.count, 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                return min(self._minimum * math.exp(bucket * self._log_growth), self.max)
+        return self.max
+
+
+class HistogramSink:
+    """Metrics sink aggregating the timings and sizes of each phase into a histogram per RPC method"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: defaultdict[str, dict[str, Histogram]] = defaultdict(
+            lambda: {phase: Histogram(minimum=1 if phase.endswith("_size") else 1e-7) for phase in PHASES}
+        )
+
+    def record(self, metrics: TracCallMetrics):
+        with self._lock:
+            histograms = self._histograms[metrics.method]
+            for phase in PHASES:
+                histograms[phase].add(getattr(metrics, phase))
+
+    def histograms(self) -> dict[str, dict[str, Histogram]]:
+        with self._lock:
+            return dict(self._histograms)
+
+    def summary(self) -> dict[str, dict[str, dict[str, float]]]:
+        """Count, mean, median, 99th percentile and maximum of each phase per RPC method"""
+        with self._lock:
+            return {
+                method: {
+                    phase: {
+                        "count": histogram.count,
+                        "mean": histogram.mean,
+                        "p50": histogram.quantile(0.5),
+                        "p99": histogram.quantile(0.99),
+                        "max": histogram.max,
+                    }
+                    for phase, histogram in histograms.items()
+                }
+                for method, histograms in self._histograms.items()
+            }
@@ -0,0 +1,387 @@
+import argparse
+import contextlib
+import itertools
+import logging
+import sqlite3
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple, Self
+
+from trac_rpc.client import DEFAULT_MULTICALL_CHUNK_SIZE, ApiClient
+from trac_rpc.decoders import get_ticket_properties_type
+from trac_rpc.exceptions import TracRpcError, get_error, is_not_found
+from trac_rpc.models import (
+    TracRequest,
+    TracTicket,
+    TracTicketAttachments,
+    TracTicketChangelog,
+    TracTicketProperties,
+)
+from trac_rpc.sync import WikiPage, add_connection_arguments, connect, fetch_wiki_pages
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    id INTEGER PRIMARY KEY,
+    time_created TEXT NOT NULL,
+    time_changed TEXT NOT NULL,
+    attributes TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changelog (
+    ticket_id INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    author TEXT,
+    field TEXT NOT NULL,
+    old_value TEXT NOT NULL,
+    new_value TEXT NOT NULL,
+    permanent INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS changelog_ticket_id ON changelog (ticket_id);
+CREATE INDEX IF NOT EXISTS changelog_field ON changelog (field, timestamp);
+CREATE TABLE IF NOT EXISTS attachments (
+    ticket_id INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    description TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    author TEXT NOT NULL,
+    PRIMARY KEY (ticket_id, filename)
+);
+CREATE TABLE IF NOT EXISTS enumerations (
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (kind, name)
+);
+CREATE TABLE IF NOT EXISTS wiki_pages (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    author TEXT NOT NULL,
+    last_modified TEXT NOT NULL,
+    comment TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pending (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE TABLE IF NOT EXISTS failures (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    message TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+DEFAULT_BATCH_SIZE = 500
+
+# Enumerations are stored by kind along with their position, since some of them (e.g. priorities) are ordered
+ENUMERATIONS = {
+    "component": ApiClient.get_all_components,
+    "milestone": ApiClient.get_all_milestones,
+    "priority": ApiClient.get_all_priorities,
+    "resolution": ApiClient.get_all_resolutions,
+    "severity": ApiClient.get_all_severities,
+    "status": ApiClient.get_all_statuses,
+    "type": ApiClient.get_all_types,
+    "version": ApiClient.get_all_versions,
+}
+
+
+class SyncStats(NamedTuple):
+    full: bool
+    tickets: int
+    wiki_pages: int
+    deleted: int
+    failed: int = 0
+
+
+class TracMirror:
+    """
+    Local copy of tickets, changelogs, attachment metadata, enumerations and wiki pages in a SQLite database.
+
+    The first `sync` loads everything, and later ones only fetch tickets and wiki pages changed on the server since
+    the previous sync. Tickets and pages to fetch are recorded in the database before fetching them in batches of
+    `batch_size`, each written in a single transaction, so that a sync interrupted by a crash resumes where it stopped.
+    Tickets and pages that cannot be fetched (other than deleted ones) are logged and recorded in the `failures` table
+    instead of stopping the sync, and are fetched again by the next sync.
+    Ticket attributes are stored as JSON objects, which can be queried with SQLite's JSON functions.
+    """
+
+    TICKET = "ticket"
+    WIKI_PAGE = "wiki_page"
+
+    LAST_SYNC = "last_sync"
+    SYNC_STARTED = "sync_started"
+
+    def __init__(
+        self,
+        path: Path | str,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        chunk_size: int = DEFAULT_MULTICALL_CHUNK_SIZE,
+        clock_skew: timedelta = timedelta(minutes=5),
+    ):
+        self._batch_size = batch_size
+        self._chunk_size = chunk_size
+        self._clock_skew = clock_skew
+        self._connection = sqlite3.connect(path, isolation_level=None)
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def last_sync(self) -> datetime | None:
+        value = self._get_metadata(self.LAST_SYNC)
+        return datetime.fromisoformat(value) if value is not None else None
+
+    def sync(self, api_client: ApiClient, *, full: bool = False, klass: type[TracTicket] = TracTicket) -> SyncStats:
+        """
+        Bring the mirror up to date and return the number of tickets and wiki pages fetched. Everything is fetched
+        again if `full` is set or if the mirror has never been synced. Tickets are decoded into `klass`, which should
+        be set to a subclass of `TracTicket` to keep custom fields.
+        """
+        full = full or self.last_sync is None
+        if (value := self._get_metadata(self.SYNC_STARTED)) is not None:
+            started = datetime.fromisoformat(value)
+            logger.info("Resuming sync started at %s", started)
+        else:
+            started = datetime.now(UTC)
+            if full:
+                ticket_ids = api_client.iter_query_tickets()
+                page_names = api_client.get_all_wiki_pages()
+            else:
+                since = self.last_sync - self._clock_skew
+                ticket_ids = api_client.get_recent_ticket_changes(since)
+                page_names = [page_info.name for page_info in api_client.get_recent_wiki_changes(since)]
+
+            with self._transaction():
+                self._add_pending(self.TICKET, map(str, ticket_ids))
+                self._add_pending(self.WIKI_PAGE, page_names)
+                self._connection.execute("INSERT OR IGNORE INTO pending (kind, key) SELECT kind, key FROM failures")
+                self._set_metadata(self.SYNC_STARTED, started.isoformat())
+
+        self._sync_enumerations(api_client)
+        tickets, deleted_tickets, failed_tickets = self._sync_tickets(api_client, klass)
+        wiki_pages, deleted_pages, failed_pages = self._sync_wiki_pages(api_client)
+
+        with self._transaction():
+            self._set_metadata(self.LAST_SYNC, started.isoformat())
+            self._connection.execute("DELETE FROM metadata WHERE key = ?", (self.SYNC_STARTED,))
+
+        return SyncStats(
+            full=full,
+            tickets=tickets,
+            wiki_pages=wiki_pages,
+            deleted=deleted_tickets + deleted_pages,
+            failed=failed_tickets + failed_pages,
+        )
+
+    def get_failures(self, kind: str) -> dict[str, str]:
+        """Return the error messages of the tickets or wiki pages (given by `kind`) that could not be fetched, by key"""
+        rows = self._connection.execute("SELECT key, message FROM failures WHERE kind = ? ORDER BY key", (kind,))
+        return dict(rows.fetchall())
+
+    def _sync_enumerations(self, api_client: ApiClient):
+        values = {kind: get_all(api_client) for kind, get_all in ENUMERATIONS.items()}
+        with self._transaction():
+            self._connection.execute("DELETE FROM enumerations")
+            self._connection.executemany(
+                "INSERT INTO enumerations (kind, position, name) VALUES (?, ?, ?)",
+                ((kind, position, name) for kind, names in values.items() for position, name in enumerate(names)),
+            )
+
+    def _sync_tickets(self, api_client: ApiClient, klass: type[TracTicket]) -> tuple[int, int, int]:
+        methods = (
+            ("ticket.get", get_ticket_properties_type(klass)),
+            ("ticket.changeLog", TracTicketChangelog),
+            ("ticket.listAttachments", TracTicketAttachments),
+        )
+        fetched = deleted = failed = 0
+        while ticket_ids := [int(key) for key in self._get_pending(self.TICKET)]:
+            results = api_client.multicall(
+                [
+                    (TracRequest(method=method, params=[ticket_id]), result_klass)
+                    for ticket_id in ticket_ids
+                    for method, result_klass in methods
+                ],
+                chunk_size=self._chunk_size,
+            )
+
+            with self._transaction():
+                for ticket_id, ticket_results in zip(ticket_ids, itertools.batched(results, len(methods)), strict=True):
+                    if (error := get_error(ticket_results)) is None:
+                        self._delete_ticket(ticket_id)
+                        self._insert_ticket(*ticket_results)
+                        fetched += 1
+                    elif is_not_found(error):
+                        self._delete_ticket(ticket_id)
+                        deleted += 1
+                    else:
+                        self._add_failure(self.TICKET, str(ticket_id), error)
+                        failed += 1
+                        continue
+                    self._delete_failure(self.TICKET, str(ticket_id))
+                self._delete_pending(self.TICKET, map(str, ticket_ids))
+
+            logger.info("Synced %d tickets", fetched + deleted + failed)
+        return fetched, deleted, failed
+
+    def _sync_wiki_pages(self, api_client: ApiClient) -> tuple[int, int, int]:
+        fetched = deleted = failed = 0
+        while page_names := self._get_pending(self.WIKI_PAGE):
+            results = fetch_wiki_pages(api_client, page_names, chunk_size=self._chunk_size)
+
+            with self._transaction():
+                for page_name, page in results:
+                    if isinstance(page, WikiPage):
+                        self._connection.execute(
+                            "INSERT OR REPLACE INTO wiki_pages (name, version, author, last_modified, comment, text) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (
+                                page.info.name,
+                                page.info.version,
+                                page.info.author,
+                                page.info.last_modified.isoformat(),
+                                page.info.comment,
+                                page.text,
+                            ),
+                        )
+                        fetched += 1
+                    elif is_not_found(page):
+                        self._connection.execute("DELETE FROM wiki_pages WHERE name = ?", (page_name,))
+                        deleted += 1
+                    else:
+                        self._add_failure(self.WIKI_PAGE, page_name, page)
+                        failed += 1
+                        continue
+                    self._delete_failure(self.WIKI_PAGE, page_name)
+                self._delete_pending(self.WIKI_PAGE, page_names)
+
+            logger.info("Synced %d wiki pages", fetched + deleted + failed)
+        return fetched, deleted, failed
+
+    def _insert_ticket(
+        self, properties: TracTicketProperties, changelog: TracTicketChangelog, attachments: TracTicketAttachments
+    ):
+        self._connection.execute(
+            "INSERT INTO tickets (id, time_created, time_changed, attributes) VALUES (?, ?, ?, ?)",
+            (
+                properties.id,
+                properties.time_created.isoformat(),
+                properties.time_changed.isoformat(),
+                properties.attributes.model_dump_json(),
+            ),
+        )
+        self._connection.executemany(
+            "INSERT INTO changelog (ticket_id, timestamp, author, field, old_value, new_value, permanent) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((properties.id, entry.timestamp.isoformat(), *entry[1:]) for entry in changelog),
+        )
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO attachments (ticket_id, filename, description, size, timestamp, author) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    properties.id,
+                    attachment.filename,
+                    attachment.description,
+                    attachment.size,
+                    attachment.timestamp.isoformat(),
+                    attachment.author,
+                )
+                for attachment in attachments
+            ),
+        )
+
+    def _delete_ticket(self, ticket_id: int):
+        for table, column in (("tickets", "id"), ("changelog", "ticket_id"), ("attachments", "ticket_id")):
+            self._connection.execute(f"DELETE FROM {table} WHERE {column} = ?", (ticket_id,))
+
+    def _add_pending(self, kind: str, keys: Iterable[str]):
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO pending (kind, key) VALUES (?, ?)", ((kind, key) for key in keys)
+        )
+
+    def _get_pending(self, kind: str) -> list[str]:
+        rows = self._connection.execute(
+            "SELECT key FROM pending WHERE kind = ? ORDER BY key LIMIT ?", (kind, self._batch_size)
+        ).fetchall()
+        return [key for (key,) in rows]
+
+    def _delete_pending(self, kind: str, keys: Iterable[str]):
+        self._connection.executemany("DELETE FROM pending WHERE kind = ? AND key = ?", ((kind, key) for key in keys))
+
+    def _add_failure(self, kind: str, key: str, error: TracRpcError):
+        # The previously synced copy, if any, is kept until the next sync fetches it successfully
+        logger.warning("Failed to sync %s %s: %s", kind, key, error)
+        self._connection.execute(
+            "INSERT OR REPLACE INTO failures (kind, key, message) VALUES (?, ?, ?)", (kind, key, str(error))
+        )
+
+    def _delete_failure(self, kind: str, key: str):
+        self._connection.execute("DELETE FROM failures WHERE kind = ? AND key = ?", (kind, key))
+
+    def _get_metadata(self, key: str) -> str | None:
+        row = self._connection.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def _set_metadata(self, key: str, value: str):
+        self._connection.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", (key, value))
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        self._connection.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        else:
+            self._connection.execute("COMMIT")
+
+
+def sync(
+    api_client: ApiClient, path: Path | str, *, full: bool = False, klass: type[TracTicket] = TracTicket
+) -> SyncStats:
+    """Bring the mirror of the Trac instance behind `api_client` in the SQLite database at `path` up to date"""
+    with TracMirror(path) as mirror:
+        return mirror.sync(api_client, full=full, klass=klass)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Mirror a Trac instance into a local SQLite database")
+    add_connection_arguments(parser)
+    parser.add_argument("database", type=Path, help="path to the SQLite database, created if it does not exist")
+    parser.add_argument("--full", action="store_true", help="fetch everything again instead of recent changes only")
+    args = parser.parse_args(argv)
+
+    with connect(args) as api_client:
+        stats = sync(api_client, args.database, full=args.full)
+
+    logger.info(
+        "%s sync done: %d tickets, %d wiki pages, %d deleted, %d failed",
+        "Full" if stats.full else "Incremental",
+        stats.tickets,
+        stats.wiki_pages,
+        stats.deleted,
+        stats.failed,
+    )
+
+
+if __name__ == "__main__":
+    main()
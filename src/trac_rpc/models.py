@@ -7,6 +7,7 @@ from pydantic import (
     ConfigDict,
     Field,
     RootModel,
+    field_validator,
     model_validator,
 )
 
@@ -16,6 +17,7 @@ from trac_rpc.validators import (
     TracOptionalField,
     TracSpaceSeparated,
     TracStrippedStr,
+    intern_string,
 )
 
 DEFAULT_CONFIG = ConfigDict(
@@ -23,6 +25,7 @@ DEFAULT_CONFIG = ConfigDict(
     validate_default=True,
     validate_assignment=True,
     frozen=True,
+    defer_build=True,
 )
 
 
@@ -99,6 +102,11 @@ class TracTicket[StringType: str](BaseModel):
     time: TracDatetime
     changetime: TracDatetime
 
+    @field_validator("reporter", "type", "status", "priority", "component")
+    @classmethod
+    def intern_repeated_values(cls, value: Any) -> Any:
+        return intern_string(value)
+
 
 class TracTicketProperties[CustomTicketT: TracTicket](NamedTuple):
     id: int
@@ -128,3 +136,17 @@ class TracAttachment(NamedTuple):
 
 
 TracTicketAttachments = list[TracAttachment]
+
+
+class TracTicketDetails[CustomTicketT: TracTicket](NamedTuple):
+    properties: TracTicketProperties[CustomTicketT]
+    changelog: TracTicketChangelog | None
+    attachments: TracTicketAttachments | None
+
+
+class TracWikiPageInfo(BaseModel):
+    name: str
+    author: str
+    version: int
+    last_modified: TracDatetime = Field(alias="lastModified")
+    comment: str = ""
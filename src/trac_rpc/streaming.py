@@ -0,0 +1,244 @@
+import binascii
+import codecs
+import enum
+import json
+import re
+from collections.abc import Iterator
+from typing import Any
+
+_NON_WHITESPACE = re.compile(r"\S")
+_STRUCTURE = re.compile(r'["{}\[\]]')
+_STRING_END = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r"[\s,\]}]")
+_BINARY_START = re.compile(rb'"__jsonclass__"\s*:\s*\[\s*"binary"\s*,\s*"')
+_BINARY_ESCAPE = re.compile(rb"\\(.)|\s")
+# Escapes that may be found in base64 text encoded as JSON string, mapped to the bytes they stand for (if any)
+_BINARY_ESCAPES = {b"/": b"/", b"n": b"", b"r": b"", b"t": b""}
+
+
+class _State(enum.Enum):
+    OBJECT_START = enum.auto()
+    KEY = enum.auto()
+    COLON = enum.auto()
+    VALUE = enum.auto()
+    AFTER_VALUE = enum.auto()
+    ITEM = enum.auto()
+    AFTER_ITEM = enum.auto()
+    END = enum.auto()
+
+
+class JsonResultStream:
+    """
+    Incremental parser for JSON-RPC responses of the form `{"result": [...], "error": ..., "id": ...}`.
+
+    Chunks of the response body are passed to `feed`, which yields the JSON text of each complete item of the `result`
+    array as soon as it has been received. Only the current item is kept in memory, so that the memory usage does not
+    depend on the size of the response. All other top-level fields are collected in `fields` once `close` is called.
+    """
+
+    def __init__(self, array_field: str = "result"):
+        self._array_field = array_field
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _State.OBJECT_START
+        self._key: str | None = None
+        self._scan: tuple[int, int, int, bool] | None = None  # (start, position, depth, in string)
+        self.fields: dict[str, Any] = {}
+
+    def feed(self, chunk: bytes) -> Iterator[str]:
+        self._compact(self._decoder.decode(chunk))
+        yield from self._parse()
+
+    def close(self) -> dict[str, Any]:
+        self._compact(self._decoder.decode(b"", final=True))
+        for _ in self._parse():
+            pass
+
+        if self._state is not _State.END:
+            raise ValueError("incomplete JSON-RPC response")
+
+        return self.fields
+
+    def _compact(self, text: str):
+        offset = self._pos
+        self._buffer = self._buffer[offset:] + text
+        self._pos = 0
+        if self._scan is not None:
+            start, position, depth, in_string = self._scan
+            self._scan = (start - offset, position - offset, depth, in_string)
+
+    def _skip_whitespace(self) -> str | None:
+        if (match := _NON_WHITESPACE.search(self._buffer, self._pos)) is None:
+            self._pos = len(self._buffer)
+            return None
+        self._pos = match.start()
+        return self._buffer[self._pos]
+
+    def _expect(self, char: str, expected: str):
+        if char not in expected:
+            raise ValueError(f"unexpected character {char!r} at position {self._pos}, expected one of {expected!r}")
+
+    def _scan_value(self) -> str | None:
+        """Scan a complete JSON value starting at the current position, resuming a previous scan if needed"""
+        buffer = self._buffer
+
+        if self._scan is None:
+            start = self._pos
+            match buffer[start]:
+                case '"':
+                    self._scan = (start, start + 1, 0, True)
+                case "{" | "[":
+                    self._scan = (start, start + 1, 1, False)
+                case _:
+                    if (match := _SCALAR_END.search(buffer, start)) is None:
+                        return None
+                    self._pos = match.start()
+                    return buffer[start : self._pos]
+
+        start, position, depth, in_string = self._scan
+
+        while True:
+            if in_string:
+                if (match := _STRING_END.search(buffer, position)) is None:
+                    self._scan = (start, len(buffer), depth, in_string)
+                    return None
+                if match.group() == "\\":
+                    if match.end() >= len(buffer):
+                        self._scan = (start, match.start(), depth, in_string)
+                        return None
+                    position = match.end() + 1
+                    continue
+                in_string, position = False, match.end()
+            else:
+                if (match := _STRUCTURE.search(buffer, position)) is None:
+                    self._scan = (start, len(buffer), depth, in_string)
+                    return None
+                position = match.end()
+                match match.group():
+                    case '"':
+                        in_string = True
+                        continue
+                    case "{" | "[":
+                        depth += 1
+                        continue
+                    case _:
+                        depth -= 1
+
+            if depth == 0:
+                self._scan = None
+                self._pos = position
+                return buffer[start:position]
+
+    def _parse(self) -> Iterator[str]:
+        while (char := self._skip_whitespace()) is not None:
+            match self._state:
+                case _State.OBJECT_START:
+                    self._expect(char, "{")
+                    self._pos += 1
+                    self._state = _State.KEY
+                case _State.KEY:
+                    if char == "}":
+                        self._pos += 1
+                        self._state = _State.END
+                        continue
+                    self._expect(char, '"')
+                    if (key := self._scan_value()) is None:
+                        return
+                    self._key = json.loads(key)
+                    self._state = _State.COLON
+                case _State.COLON:
+                    self._expect(char, ":")
+                    self._pos += 1
+                    self._state = _State.VALUE
+                case _State.VALUE:
+                    if self._key == self._array_field and char == "[":
+                        self._pos += 1
+                        self._state = _State.ITEM
+                        continue
+                    if (value := self._scan_value()) is None:
+                        return
+                    self.fields[self._key] = json.loads(value)
+                    self._state = _State.AFTER_VALUE
+                case _State.AFTER_VALUE:
+                    self._expect(char, ",}")
+                    self._pos += 1
+                    self._state = _State.KEY if char == "," else _State.END
+                case _State.ITEM:
+                    if char == "]" and self._scan is None:
+                        self._pos += 1
+                        self._state = _State.AFTER_VALUE
+                        continue
+                    if (item := self._scan_value()) is None:
+                        return
+                    self._state = _State.AFTER_ITEM
+                    yield item
+                case _State.AFTER_ITEM:
+                    self._expect(char, ",]")
+                    self._pos += 1
+                    self._state = _State.ITEM if char == "," else _State.AFTER_VALUE
+                case _State.END:
+                    raise ValueError(f"unexpected data after the end of the response at position {self._pos}")
+
+
+class BinaryResultStream:
+    """
+    Incremental decoder for JSON-RPC responses with binary data as result, i.e. of the form
+    `{"result": {"__jsonclass__": ["binary", "<base64>"]}, "error": ..., "id": ...}` (see `ticket.getAttachment`).
+
+    Chunks of the response body are passed to `feed`, which returns the bytes decoded from the base64 text received so
+    far, so that only a few bytes of the data are kept in memory at any time. Line breaks and escaped slashes (`\\/`)
+    within the base64 text are accepted. All other top-level fields are returned by `close`.
+    """
+
+    def __init__(self):
+        self._head = b""  # response up to the start of the base64 text (or whole response if there is none)
+        self._tail: bytes | None = None  # response from the end of the base64 text, once received
+        self._pending = b""  # base64 text received but not decoded yet
+        self._in_data = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        if self._tail is not None:
+            self._tail += chunk
+            return b""
+
+        if not self._in_data:
+            self._head += chunk
+            if (match := _BINARY_START.search(self._head)) is None:
+                return b""
+            chunk = self._head[match.end() :]
+            self._head = self._head[: match.end()]
+            self._in_data = True
+
+        data = self._pending + chunk
+        if (end := data.find(b'"')) != -1:
+            data, self._tail = data[:end], data[end:]
+        return self._decode(data, final=self._tail is not None)
+
+    def close(self) -> dict[str, Any]:
+        if self._in_data and self._tail is None:
+            raise ValueError("incomplete JSON-RPC response")
+
+        # The base64 text is left out, which makes the result an empty string
+        fields = json.loads(self._head + (self._tail or b""))
+        if self._tail is not None:
+            del fields["result"]
+        return fields
+
+    def _decode(self, data: bytes, final: bool) -> bytes:
+        # An escape sequence may be split between chunks
+        held = b"\\" if data.endswith(b"\\") and not final else b""
+        text = _BINARY_ESCAPE.sub(self._unescape, data[: len(data) - len(held)])
+
+        # Base64 text is decoded by groups of 4 characters
+        size = len(text) if final else len(text) - len(text) % 4
+        self._pending = text[size:] + held
+        return binascii.a2b_base64(text[:size], strict_mode=True)
+
+    @staticmethod
+    def _unescape(match: re.Match[bytes]) -> bytes:
+        if (char := match.group(1)) is None:
+            return b""
+        if (value := _BINARY_ESCAPES.get(char)) is None:
+            raise ValueError(f"unexpected escape sequence {match.group()!r} in base64 data")
+        return value
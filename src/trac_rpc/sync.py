@@ -0,0 +1,60 @@
+import argparse
+import contextlib
+import itertools
+import logging
+import os
+from collections.abc import Iterator, Sequence
+from typing import NamedTuple
+
+from trac_rpc.client import DEFAULT_MULTICALL_CHUNK_SIZE, ApiClient
+from trac_rpc.exceptions import TracRpcError, get_error
+from trac_rpc.models import TracRequest, TracWikiPageInfo
+from trac_rpc.transport import HttpClient
+
+PASSWORD_VARIABLE = "TRAC_RPC_PASSWORD"
+
+
+class WikiPage(NamedTuple):
+    info: TracWikiPageInfo
+    text: str
+
+
+def fetch_wiki_pages(
+    api_client: ApiClient, page_names: Sequence[str], *, chunk_size: int = DEFAULT_MULTICALL_CHUNK_SIZE
+) -> list[tuple[str, WikiPage | TracRpcError]]:
+    """
+    Fetch the metadata and text of wiki pages via `system.multicall`, with `chunk_size` calls per round-trip, and return
+    each page name along with its page or the error that prevented fetching it
+    """
+    results = api_client.multicall(
+        [
+            (TracRequest(method=method, params=[page_name]), result_klass)
+            for page_name in page_names
+            for method, result_klass in (("wiki.getPageInfo", TracWikiPageInfo), ("wiki.getPage", str))
+        ],
+        chunk_size=chunk_size,
+    )
+    return [
+        (page_name, get_error(page_results) or WikiPage(*page_results))
+        for page_name, page_results in zip(page_names, itertools.batched(results, 2), strict=True)
+    ]
+
+
+def add_connection_arguments(parser: argparse.ArgumentParser):
+    """Add the arguments read by `connect` to the command line parser of a tool"""
+    parser.add_argument("rpc_url", help="URL of the JSON-RPC endpoint, e.g. https://trac.example.com/login/rpc")
+    parser.add_argument("--user", help=f"user name; the password is read from the {PASSWORD_VARIABLE} variable")
+
+
+@contextlib.contextmanager
+def connect(args: argparse.Namespace) -> Iterator[ApiClient]:
+    """
+    Set up logging for a command line tool and yield a client for the Trac instance given by the arguments added by
+    `add_connection_arguments`, using the HTTP client profile for bulk synchronization
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    auth = (args.user, os.environ.get(PASSWORD_VARIABLE, "")) if args.user is not None else None
+    with HttpClient(auth=auth, profile="bulk-sync") as http_client:
+        yield ApiClient(args.rpc_url, http_client=http_client)
@@ -0,0 +1,252 @@
+import logging
+import time
+from typing import Any, Literal, NamedTuple
+
+import httpx
+
+from trac_rpc.client import EXTENSION_RPC_METHOD, EXTENSION_STARTED, EXTENSION_STREAM
+
+# Records are logged under the name of the module that used to define the HTTP clients, so that logging configurations
+# keep working
+logger = logging.getLogger("trac_rpc.client")
+
+type LogFormat = Literal["text", "structured"]
+
+
+class HttpClientProfile(NamedTuple):
+    limits: httpx.Limits
+    timeout: httpx.Timeout
+    http2: bool = False
+
+    def apply(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Use the settings of the profile as defaults for the keyword arguments of an HTTP client"""
+        return {"limits": self.limits, "timeout": self.timeout, "http2": self.http2} | kwargs
+
+
+HTTP_CLIENT_PROFILES: dict[str, HttpClientProfile] = {
+    # Few calls made one after another on behalf of a user: fail fast and do not hold on to idle connections for long
+    "interactive": HttpClientProfile(
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=15.0),
+        timeout=httpx.Timeout(5.0, connect=2.0),
+    ),
+    # Many small calls made in parallel (e.g. from a thread pool) for a long time: keep a connection per worker
+    # alive between calls, and allow for slow responses from a busy server
+    "bulk-sync": HttpClientProfile(
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=120.0),
+        timeout=httpx.Timeout(120.0, connect=10.0, pool=None),
+    ),
+    # Same as "bulk-sync", but with calls multiplexed over HTTP/2 connections (requires `trac-rpc[http2]`)
+    "bulk-sync-http2": HttpClientProfile(
+        limits=httpx.Limits(max_connections=4, max_keepalive_connections=4, keepalive_expiry=120.0),
+        timeout=httpx.Timeout(120.0, connect=10.0, pool=None),
+        http2=True,
+    ),
+}
+
+
+def _get_profile(profile: str | HttpClientProfile | None) -> HttpClientProfile | None:
+    return HTTP_CLIENT_PROFILES[profile] if isinstance(profile, str) else profile
+
+
+class _TracRpcLoggingMixin:
+    """
+    Logging hooks shared by the synchronous and asynchronous HTTP clients.
+
+    Nothing is done unless the logger is enabled for DEBUG, so that request and response bodies are not decoded
+    needlessly. In the "text" format, bodies are logged in full or up to `log_body_limit` bytes; in the "structured"
+    format, only the RPC method name, the payload sizes and the elapsed time are logged (and passed as `trac_rpc` extra
+    attribute of the log record).
+    """
+
+    _log_body_limit: int | None = None
+    _log_format: LogFormat = "text"
+
+    def _truncate_body(self, content: bytes, encoding: str = "utf-8") -> str:
+        if self._log_body_limit is not None and len(content) > self._log_body_limit:
+            text = content[: self._log_body_limit].decode(encoding, errors="replace")
+            return f"{text}... ({len(content)} bytes)"
+        return content.decode(encoding, errors="replace")
+
+    def _should_read_response_body(self, response: httpx.Response) -> bool:
+        return (
+            self._log_format == "text"
+            and logger.isEnabledFor(logging.DEBUG)
+            and not response.request.extensions.get(EXTENSION_STREAM, False)
+        )
+
+    def _log_request(self, request: httpx.Request):
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+
+        if self._log_format == "structured":
+            request.extensions[EXTENSION_STARTED] = time.perf_counter()
+            rpc_method = request.extensions.get(EXTENSION_RPC_METHOD)
+            request_size = len(request.content)
+            logger.debug(
+                "Trac API Request: %s %s %s (%d bytes)",
+                request.method,
+                request.url,
+                rpc_method,
+                request_size,
+                extra={"trac_rpc": {"method": rpc_method, "request_size": request_size}},
+            )
+        else:
+            logger.debug(
+                "Trac API Request: %s %s %s", request.method, request.url, self._truncate_body(request.content)
+            )
+
+    def _log_response(self, response: httpx.Response):
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+
+        request = response.request
+        if self._log_format == "structured":
+            started = request.extensions.get(EXTENSION_STARTED)
+            elapsed = time.perf_counter() - started if started is not None else None
+            rpc_method = request.extensions.get(EXTENSION_RPC_METHOD)
+            response_size = response.headers.get("Content-Length")
+            logger.debug(
+                "Trac API Response: %s %s %s %s (%s bytes, %s s)",
+                request.method,
+                request.url,
+                rpc_method,
+                response.status_code,
+                response_size,
+                f"{elapsed:.6f}" if elapsed is not None else None,
+                extra={
+                    "trac_rpc": {
+                        "method": rpc_method,
+                        "status_code": response.status_code,
+                        "response_size": int(response_size) if response_size is not None else None,
+                        "elapsed": elapsed,
+                    }
+                },
+            )
+        else:
+            logger.debug(
+                "Trac API Response: %s %s %s %s",
+                request.method,
+                request.url,
+                response.status_code,
+                (
+                    self._truncate_body(response.content, response.encoding or "utf-8")
+                    if response.is_stream_consumed
+                    else "<streamed>"
+                ),
+            )
+
+
+# Logging with the default settings, for the static hooks
+_DEFAULT_LOGGING = _TracRpcLoggingMixin()
+
+
+class HttpClient(_TracRpcLoggingMixin, httpx.Client):
+    """
+    HTTP client with logging of Trac RPC calls. Connection pool limits, timeouts and HTTP/2 can be tuned for a given
+    workload by passing a `profile`, either by name (see `HTTP_CLIENT_PROFILES`) or as `HttpClientProfile`. Keyword
+    arguments passed explicitly take precedence over the settings of the profile.
+    """
+
+    @staticmethod
+    def log_trac_rpc_request(request: httpx.Request):
+        """Log a request with the default settings, e.g. from custom `event_hooks`"""
+        _DEFAULT_LOGGING._log_request(request)
+
+    @staticmethod
+    def log_trac_rpc_response(response: httpx.Response):
+        """Log a response with the default settings, e.g. from custom `event_hooks`"""
+        if _DEFAULT_LOGGING._should_read_response_body(response):
+            response.read()
+        _DEFAULT_LOGGING._log_response(response)
+
+    def log_request(self, request: httpx.Request):
+        """Log a request with the `log_body_limit` and `log_format` of this client (default request hook)"""
+        self._log_request(request)
+
+    def log_response(self, response: httpx.Response):
+        """Log a response with the `log_body_limit` and `log_format` of this client (default response hook)"""
+        if self._should_read_response_body(response):
+            response.read()
+        self._log_response(response)
+
+    def __init__(
+        self,
+        *,
+        event_hooks=None,
+        log_body_limit: int | None = None,
+        log_format: LogFormat = "text",
+        profile: str | HttpClientProfile | None = None,
+        **kwargs,
+    ):
+        self._log_body_limit = log_body_limit
+        self._log_format = log_format
+
+        if (profile := _get_profile(profile)) is not None:
+            kwargs = profile.apply(kwargs)
+
+        super().__init__(
+            event_hooks=(
+                event_hooks
+                if event_hooks is not None
+                else {
+                    "request": [self.log_request],
+                    "response": [self.log_response, httpx.Response.raise_for_status],
+                }
+            ),
+            **kwargs,
+        )
+
+
+class AsyncHttpClient(_TracRpcLoggingMixin, httpx.AsyncClient):
+    @staticmethod
+    async def log_trac_rpc_request(request: httpx.Request):
+        """See `HttpClient.log_trac_rpc_request`"""
+        _DEFAULT_LOGGING._log_request(request)
+
+    @staticmethod
+    async def log_trac_rpc_response(response: httpx.Response):
+        """See `HttpClient.log_trac_rpc_response`"""
+        if _DEFAULT_LOGGING._should_read_response_body(response):
+            await response.aread()
+        _DEFAULT_LOGGING._log_response(response)
+
+    async def log_request(self, request: httpx.Request):
+        """See `HttpClient.log_request`"""
+        self._log_request(request)
+
+    async def log_response(self, response: httpx.Response):
+        """See `HttpClient.log_response`"""
+        if self._should_read_response_body(response):
+            await response.aread()
+        self._log_response(response)
+
+    @staticmethod
+    async def raise_for_status(response: httpx.Response):
+        response.raise_for_status()
+
+    def __init__(
+        self,
+        *,
+        event_hooks=None,
+        log_body_limit: int | None = None,
+        log_format: LogFormat = "text",
+        profile: str | HttpClientProfile | None = None,
+        **kwargs,
+    ):
+        self._log_body_limit = log_body_limit
+        self._log_format = log_format
+
+        if (profile := _get_profile(profile)) is not None:
+            kwargs = profile.apply(kwargs)
+
+        super().__init__(
+            event_hooks=(
+                event_hooks
+                if event_hooks is not None
+                else {
+                    "request": [self.log_request],
+                    "response": [self.log_response, AsyncHttpClient.raise_for_status],
+                }
+            ),
+            **kwargs,
+        )
@@ -1,8 +1,61 @@
+import contextlib
 import re
+from collections.abc import Iterator
+from contextvars import ContextVar
+from datetime import UTC, datetime
 from typing import Annotated, Any
 
 from pydantic import AfterValidator, AwareDatetime, BeforeValidator
 
+DEFAULT_MAX_INTERNED_LENGTH = 64
+
+
+class InternPool:
+    """
+    Pool of strings, so that equal values decoded while the pool is active (see `interning`) share a single object
+    instead of each decoded instance holding its own copy.
+
+    Only plain strings of up to `max_length` characters are interned: values that repeat, such as statuses, components
+    or user names, are short, whereas longer ones, such as comments or descriptions in changelogs, are mostly unique
+    and would only grow the pool. The pool is never pruned otherwise; `clear` it to release the strings it holds.
+    Instances of `str` subclasses, such as enums, are not interned, so that they keep their type.
+    """
+
+    def __init__(self, max_length: int = DEFAULT_MAX_INTERNED_LENGTH):
+        self.max_length = max_length
+        self._strings: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def intern(self, value: str) -> str:
+        # Subclasses such as enums are left alone, as pooling them with equal plain strings would change their type
+        if type(value) is not str or len(value) > self.max_length:
+            return value
+        return self._strings.setdefault(value, value)
+
+    def clear(self):
+        self._strings.clear()
+
+
+_intern_pool: ContextVar[InternPool | None] = ContextVar("trac_rpc_intern_pool", default=None)
+
+
+@contextlib.contextmanager
+def interning(pool: InternPool) -> Iterator[InternPool]:
+    """Intern the strings decoded by the validators below into `pool` in the current context"""
+    token = _intern_pool.set(pool)
+    try:
+        yield pool
+    finally:
+        _intern_pool.reset(token)
+
+
+def intern_string(value: Any) -> Any:
+    if isinstance(value, str) and (pool := _intern_pool.get()) is not None:
+        return pool.intern(value)
+    return value
+
 
 def validate_datetime(value: Any) -> Any:
     if isinstance(value, dict):
@@ -12,6 +65,11 @@ def validate_datetime(value: Any) -> Any:
     return value
 
 
+def serialize_datetime(value: datetime) -> dict[str, Any]:
+    # Trac only parses naive UTC timestamps with a resolution of seconds
+    return {"__jsonclass__": ["datetime", value.astimezone(UTC).replace(tzinfo=None).isoformat(timespec="seconds")]}
+
+
 def validate_optional_datetime(value: Any) -> Any:
     if value == 0:
         return None
@@ -26,12 +84,14 @@ def split_by_separator(separator: str, value: Any) -> Any:
 
 def validate_space_separated(value: Any) -> Any:
     if isinstance(value, str):
-        return split_by_separator(" ", re.sub(r" +", " ", value.strip()))
+        return [intern_string(item) for item in split_by_separator(" ", re.sub(r" +", " ", value.strip()))]
     return value
 
 
 def validate_comma_separated(value: Any) -> Any:
-    return split_by_separator(",", value)
+    if isinstance(value, str):
+        return [intern_string(item) for item in split_by_separator(",", value)]
+    return value
 
 
 def validate_space_or_comma_separated(value: Any) -> Any:
@@ -43,11 +103,11 @@ def validate_space_or_comma_separated(value: Any) -> Any:
 def validator_string_empty_to_none(v: Any) -> Any | None:
     if isinstance(v, str) and v.strip() == "":
         return None
-    return v
+    return intern_string(v)
 
 
 def validator_string_strip(v: str) -> str:
-    return v.strip()
+    return intern_string(v.strip())
 
 
 def validate_in_set[T](value: T | None, allowed: set[T], optional: bool = False) -> T | None:
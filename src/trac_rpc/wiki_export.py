@@ -0,0 +1,200 @@
+import argparse
+import functools
+import itertools
+import json
+import logging
+import urllib.parse
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from trac_rpc import concurrency
+from trac_rpc.client import DEFAULT_MULTICALL_CHUNK_SIZE, ApiClient
+from trac_rpc.exceptions import is_not_found
+from trac_rpc.files import atomic_write
+from trac_rpc.models import TracWikiPageInfo
+from trac_rpc.sync import WikiPage, add_connection_arguments, connect, fetch_wiki_pages
+
+logger = logging.getLogger(__name__)
+
+TEXT_SUFFIX = ".txt"
+INFO_SUFFIX = ".json"
+STATE_FILE_NAME = ".trac-wiki-export-state"
+
+
+class ExportStats(NamedTuple):
+    full: bool
+    pages: int
+    deleted: int
+    failed: int = 0
+
+
+def _get_file_stem(page_name: str) -> str:
+    # Page names are hierarchical ("TracGuide/Install"), so they are quoted into flat file names that cannot escape
+    # the export directory
+    return urllib.parse.quote(page_name, safe="")
+
+
+def _write_atomically(path: Path, data: bytes):
+    with atomic_write(path) as file:
+        file.write(data)
+
+
+class WikiExporter:
+    """
+    Export of wiki pages into a directory, with the text of each page in a `.txt` file and its metadata (as returned by
+    `wiki.getPageInfo`) in a `.json` file, named after the page.
+
+    The first `export` fetches all pages, and later ones only pages changed on the server since the previous export,
+    as reported by `wiki.getRecentChanges`; files of pages deleted on the server are removed. Pages are fetched in
+    batches of `chunk_size` pages per `system.multicall` round-trip, with up to `prefetch` batches in flight, and each
+    page is written to disk as soon as its batch is received. The export state is stored in the directory along with
+    the pages to fetch, so that an interrupted export resumes where it stopped. Pages that cannot be fetched (other
+    than deleted ones) are logged and recorded in the state instead of stopping the export, and are fetched again by
+    the next export.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str,
+        *,
+        chunk_size: int = DEFAULT_MULTICALL_CHUNK_SIZE,
+        prefetch: int = concurrency.DEFAULT_PREFETCH,
+        clock_skew: timedelta = timedelta(minutes=5),
+    ):
+        self.directory = Path(directory)
+        self._chunk_size = chunk_size
+        self._prefetch = prefetch
+        self._clock_skew = clock_skew
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def last_export(self) -> datetime | None:
+        value = self._read_state().get("last_export")
+        return datetime.fromisoformat(value) if value is not None else None
+
+    def get_page_names(self) -> list[str]:
+        """Return the names of the exported pages"""
+        return sorted(
+            urllib.parse.unquote(path.name.removesuffix(INFO_SUFFIX)) for path in self.directory.glob(f"*{INFO_SUFFIX}")
+        )
+
+    def get_page(self, page_name: str) -> tuple[TracWikiPageInfo, str] | None:
+        """Read the metadata and text of an exported page, if any"""
+        stem = _get_file_stem(page_name)
+        try:
+            page_info = TracWikiPageInfo.model_validate_json((self.directory / f"{stem}{INFO_SUFFIX}").read_bytes())
+            text = (self.directory / f"{stem}{TEXT_SUFFIX}").read_text(encoding="utf-8", newline="")
+        except FileNotFoundError:
+            return None
+        return page_info, text
+
+    def get_failures(self) -> dict[str, str]:
+        """Return the error messages of the pages that could not be fetched, by page name"""
+        return self._read_state().get("failed", {})
+
+    def export(self, api_client: ApiClient, *, full: bool = False) -> ExportStats:
+        """
+        Bring the export up to date and return the number of pages written and deleted. All pages are fetched again if
+        `full` is set or if the directory has never been exported to.
+        """
+        state = self._read_state()
+        full = full or state.get("last_export") is None
+        failed = state.setdefault("failed", {})
+        deleted = 0
+        if (started := state.get("started")) is not None:
+            logger.info("Resuming export started at %s", started)
+        else:
+            started = datetime.now(UTC).isoformat()
+            all_page_names = set(api_client.get_all_wiki_pages())
+            if full:
+                page_names = set(all_page_names)
+            else:
+                since = datetime.fromisoformat(state["last_export"]) - self._clock_skew
+                page_names = {page_info.name for page_info in api_client.get_recent_wiki_changes(since)}
+
+            # `wiki.getRecentChanges` does not report deleted pages, so they are found by listing all pages instead
+            for page_name in set(self.get_page_names()) - all_page_names:
+                self._delete_page(page_name)
+                deleted += 1
+            # Pages that failed in previous exports are fetched again
+            state |= {"started": started, "pending": sorted(page_names | failed.keys())}
+            self._write_state(state)
+
+        pages = 0
+        for results in concurrency.prefetch(
+            (
+                functools.partial(fetch_wiki_pages, api_client, chunk, chunk_size=len(chunk) * 2)
+                for chunk in itertools.batched(list(state["pending"]), self._chunk_size)
+            ),
+            self._prefetch,
+        ):
+            for page_name, page in results:
+                if isinstance(page, WikiPage):
+                    self._write_page(page)
+                    pages += 1
+                elif is_not_found(page):
+                    self._delete_page(page_name)
+                    deleted += 1
+                else:
+                    # The previously exported copy, if any, is kept until the next export fetches it successfully
+                    logger.warning("Failed to export wiki page %s: %s", page_name, page)
+                    failed[page_name] = str(page)
+                    continue
+                failed.pop(page_name, None)
+
+            # Batches are received in order, so the pages left are the last ones
+            state["pending"] = state["pending"][len(results) :]
+            self._write_state(state)
+            logger.info("Exported %d wiki pages, %d left", pages, len(state["pending"]))
+
+        self._write_state({"last_export": started, "failed": failed})
+        return ExportStats(full=full, pages=pages, deleted=deleted, failed=len(failed))
+
+    def _write_page(self, page: WikiPage):
+        stem = _get_file_stem(page.info.name)
+        # The text is written before the metadata, which marks the page as exported
+        _write_atomically(self.directory / f"{stem}{TEXT_SUFFIX}", page.text.encode())
+        _write_atomically(self.directory / f"{stem}{INFO_SUFFIX}", page.info.model_dump_json(by_alias=True).encode())
+
+    def _delete_page(self, page_name: str):
+        stem = _get_file_stem(page_name)
+        for suffix in (INFO_SUFFIX, TEXT_SUFFIX):
+            (self.directory / f"{stem}{suffix}").unlink(missing_ok=True)
+
+    def _read_state(self) -> dict[str, Any]:
+        try:
+            return json.loads((self.directory / STATE_FILE_NAME).read_bytes())
+        except FileNotFoundError:
+            return {}
+
+    def _write_state(self, state: dict[str, Any]):
+        _write_atomically(self.directory / STATE_FILE_NAME, json.dumps(state).encode())
+
+
+def export(api_client: ApiClient, directory: Path | str, *, full: bool = False) -> ExportStats:
+    """Bring the export of the wiki of the Trac instance behind `api_client` into `directory` up to date"""
+    return WikiExporter(directory).export(api_client, full=full)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Export the wiki pages of a Trac instance into a local directory")
+    add_connection_arguments(parser)
+    parser.add_argument("directory", type=Path, help="path to the export directory, created if it does not exist")
+    parser.add_argument("--full", action="store_true", help="fetch all pages again instead of recent changes only")
+    args = parser.parse_args(argv)
+
+    with connect(args) as api_client:
+        stats = export(api_client, args.directory, full=args.full)
+
+    logger.info(
+        "%s export done: %d wiki pages, %d deleted, %d failed",
+        "Full" if stats.full else "Incremental",
+        stats.pages,
+        stats.deleted,
+        stats.failed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import logging
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+import respx
+from _pytest.monkeypatch import MonkeyPatch
+
+from trac_rpc.client import ApiClient, AsyncApiClient, AsyncHttpClient
+from trac_rpc.exceptions import TracRpcError
+from trac_rpc.models import TracApiVersion, TracRequest
+
+from .utils import RESPONSE_API_VERSION, TRAC_RPC_URL, get_fixture
+
+PAGE_INFO = {
+    "name": "WikiStart",
+    "author": "admin",
+    "version": 2,
+    "lastModified": {"__jsonclass__": ["datetime", "2025-02-27T13:36:35"]},
+    "comment": "",
+}
+
+
+def get_response(result: object) -> str:
+    return json.dumps({"result": result, "error": None, "id": None})
+
+
+@pytest.mark.parametrize(
+    ("method", "args", "response", "rpc_method"),
+    [
+        ("get_all_components", (), get_fixture("trac-get-all-components-response.json"), "ticket.component.getAll"),
+        ("get_all_milestones", (), get_fixture("trac-get-all-milestones-response.json"), "ticket.milestone.getAll"),
+        ("get_all_priorities", (), get_fixture("trac-get-all-priorities-response.json"), "ticket.priority.getAll"),
+        ("get_all_resolutions", (), get_fixture("trac-get-all-resolutions-response.json"), "ticket.resolution.getAll"),
+        ("get_all_severities", (), get_fixture("trac-get-all-severities-response.json"), "ticket.severity.getAll"),
+        ("get_all_statuses", (), get_fixture("trac-get-all-statuses-response.json"), "ticket.status.getAll"),
+        ("get_all_types", (), get_fixture("trac-get-all-types-response.json"), "ticket.type.getAll"),
+        ("get_all_versions", (), get_fixture("trac-get-all-versions-response.json"), "ticket.version.getAll"),
+        (
+            "get_component",
+            ("component1",),
+            get_response({"name": "component1", "owner": "somebody", "description": ""}),
+            "ticket.component.get",
+        ),
+        ("get_milestone", ("milestone2",), get_fixture("trac-get-milestone-response.json"), "ticket.milestone.get"),
+        (
+            "get_version",
+            ("2.0",),
+            get_response({"name": "2.0", "released": 0, "description": ""}),
+            "ticket.version.get",
+        ),
+        ("query_tickets", ("status!=closed",), get_response([3, 2, 1]), "ticket.query"),
+        (
+            "get_ticket_attachments",
+            (1,),
+            get_fixture("trac-get-ticket-attachments-response.json"),
+            "ticket.listAttachments",
+        ),
+        ("get_ticket_changelog", (1,), get_fixture("trac-get-ticket-changelog-response.json"), "ticket.changeLog"),
+        ("get_ticket", (1,), get_fixture("trac-get-ticket-response.json"), "ticket.get"),
+        (
+            "get_recent_ticket_changes",
+            (datetime(2025, 1, 1, tzinfo=UTC),),
+            get_response([1]),
+            "ticket.getRecentChanges",
+        ),
+        ("get_all_wiki_pages", (), get_fixture("trac-get-all-wiki-pages-response.json"), "wiki.getAllPages"),
+        (
+            "get_recent_wiki_changes",
+            (datetime(2025, 1, 1, tzinfo=UTC),),
+            get_response([PAGE_INFO]),
+            "wiki.getRecentChanges",
+        ),
+        ("get_wiki_page", ("WikiStart",), get_response("= Welcome ="), "wiki.getPage"),
+        ("get_wiki_page", ("WikiStart", 2), get_response("= Welcome ="), "wiki.getPage"),
+        ("get_wiki_page_info", ("WikiStart",), get_response(PAGE_INFO), "wiki.getPageInfo"),
+        ("wiki_to_html", ("''italic''",), get_response("<p><em>italic</em></p>"), "wiki.wikiToHtml"),
+    ],
+)
+def test_methods(method: str, args: tuple, response: str, rpc_method: str, respx_mock: respx.mock):
+    respx_mock.post(TRAC_RPC_URL).respond(text=response)
+
+    result = asyncio.run(getattr(AsyncApiClient(rpc_url=TRAC_RPC_URL), method)(*args))
+    assert json.loads(respx_mock.calls.last.request.content)["method"] == rpc_method
+
+    # The results are the same as those of the synchronous client
+    assert result == getattr(ApiClient(rpc_url=TRAC_RPC_URL), method)(*args)
+
+
+def test_multicall(respx_mock: respx.mock):
+    in_flight, max_in_flight = 0, 0
+
+    async def respond(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        (call,) = json.loads(request.content)["params"]
+        (ticket_id,) = call["params"]
+        result = (
+            {"result": None, "error": {"message": "Internal error", "code": -32603, "name": "Error"}, "id": None}
+            if ticket_id == 3
+            else {"result": [ticket_id], "error": None, "id": None}
+        )
+        return httpx.Response(status_code=httpx.codes.OK, text=get_response([result]))
+
+    respx_mock.post(TRAC_RPC_URL).mock(side_effect=respond)
+
+    api_client = AsyncApiClient(rpc_url=TRAC_RPC_URL)
+    results = asyncio.run(
+        api_client.multicall(
+            [(TracRequest(method="ticket.query", params=[ticket_id]), list[int]) for ticket_id in range(10)],
+            chunk_size=1,
+        )
+    )
+
+    assert [result for result in results if not isinstance(result, TracRpcError)] == [[i] for i in range(10) if i != 3]
+    assert isinstance(results[3], TracRpcError)
+    # Chunks are sent concurrently, but no more than `prefetch` at a time by default
+    assert max_in_flight == 2
+
+
+def test_get_api_version(respx_mock: respx.mock):
+    respx_mock.post(
+        url=TRAC_RPC_URL,
+        headers={"Content-Type": "application/json"},
+    ).mock(return_value=RESPONSE_API_VERSION)
+
+    response = asyncio.run(AsyncApiClient(rpc_url=TRAC_RPC_URL).get_api_version())
+
+    assert response == TracApiVersion(epoch=1, major=1, minor=0)
+
+
+def test_event_hooks_default(monkeypatch: MonkeyPatch, respx_mock: respx.mock):
+    respx_mock.post(TRAC_RPC_URL).mock(return_value=RESPONSE_API_VERSION)
+
+    mock_log_request, mock_log_response = AsyncMock(), AsyncMock()
+    monkeypatch.setattr(AsyncHttpClient, "log_request", mock_log_request)
+    monkeypatch.setattr(AsyncHttpClient, "log_response", mock_log_response)
+
+    asyncio.run(AsyncApiClient(rpc_url=TRAC_RPC_URL).get_api_version())
+
+    mock_log_request.assert_awaited_once()
+    mock_log_response.assert_awaited_once()
+
+
+def test_event_hooks_static(caplog: pytest.LogCaptureFixture, respx_mock: respx.mock):
+    caplog.set_level(logging.DEBUG, logger="trac_rpc.client")
+    respx_mock.post(TRAC_RPC_URL).mock(return_value=RESPONSE_API_VERSION)
+
+    http_client = AsyncHttpClient(
+        event_hooks={
+            "request": [AsyncHttpClient.log_trac_rpc_request],
+            "response": [AsyncHttpClient.log_trac_rpc_response],
+        }
+    )
+    asyncio.run(AsyncApiClient(rpc_url=TRAC_RPC_URL, http_client=http_client).get_api_version())
+
+    assert [record.getMessage().split(":")[0] for record in caplog.records if record.name == "trac_rpc.client"] == [
+        "Trac API Request",
+        "Trac API Response",
+    ]
+
+
+def test_raise_for_status(respx_mock: respx.mock):
+    respx_mock.post(url=TRAC_RPC_URL) % httpx.codes.BAD_GATEWAY
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(AsyncApiClient(rpc_url=TRAC_RPC_URL).get_api_version())
+
+
+def test_raise_on_error(respx_mock: respx.mock):
+    respx_mock.post(TRAC_RPC_URL).respond(text=get_fixture("trac-response-rpc-error.json"))
+
+    with pytest.raises(TracRpcError, match=r'RPC method "ticket\.wiki_to_html" not found'):
+        asyncio.run(AsyncApiClient(rpc_url=TRAC_RPC_URL).get_api_version())
+
+
+def test_get_ticket_last_field_change(respx_mock: respx.mock):
+    respx_mock.post().respond(text=get_fixture("trac-get-ticket-changelog-response.json"))
+
+    api_client = AsyncApiClient(rpc_url=TRAC_RPC_URL)
+    last_owner_change = asyncio.run(api_client.get_ticket_last_field_change(1, "owner", "admin"))
+
+    assert (last_owner_change.old_value, last_owner_change.new_value) == ("somebody", "admin")
+
+
+def test_max_concurrency(respx_mock: respx.mock):
+    in_flight, max_in_flight = 0, 0
+
+    async def respond(_request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(status_code=httpx.codes.OK, text=get_fixture("trac-get-ticket-response.json"))
+
+    respx_mock.post(TRAC_RPC_URL).mock(side_effect=respond)
+
+    async def fetch_tickets():
+        api_client = AsyncApiClient(rpc_url=TRAC_RPC_URL, max_concurrency=3)
+        return await asyncio.gather(*(api_client.get_ticket(ticket_id) for ticket_id in range(10)))
+
+    tickets = asyncio.run(fetch_tickets())
+
+    assert [ticket.id for ticket in tickets] == [1] * 10
+    assert max_in_flight == 3
+
+
+def test_coalesce(respx_mock: respx.mock):
+    async def respond(_request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        return httpx.Response(status_code=httpx.codes.OK, text=get_fixture("trac-get-ticket-response.json"))
+
+    respx_mock.post(TRAC_RPC_URL).mock(side_effect=respond)
+
+    async def fetch_tickets():
+        api_client = AsyncApiClient(rpc_url=TRAC_RPC_URL, coalesce=True)
+        return await asyncio.gather(*(api_client.get_ticket(1) for _ in range(5)), api_client.get_ticket(2))
+
+    tickets = asyncio.run(fetch_tickets())
+
+    assert len(tickets) == 6
+    assert len(respx_mock.calls) == 2
@@ -0,0 +1,141 @@
+import json
+from datetime import UTC, datetime
+from pathlib import Path
+
+import httpx
+import respx
+
+from trac_rpc.cache import LookupCache, SqliteCache, TicketCache, WikiHtmlCache
+from trac_rpc.client import ApiClient
+from trac_rpc.exceptions import TracRpcError
+
+from .utils import TRAC_RPC_URL, get_fixture
+
+
+def test_sqlite_cache(tmp_path: Path):
+    with SqliteCache(tmp_path / "cache.sqlite3", max_size=10) as cache:
+        cache.put("namespace", "a", b"12345")
+        cache.put("namespace", "b", b"12345", version=1.0)
+        assert cache.get("namespace", "a") == b"12345"
+        assert cache.get("namespace", "b", version=2.0) is None
+
+        cache.put("namespace", "c", b"123")
+        assert cache.get("namespace", "b") is None
+        assert cache.get("namespace", "a") == b"12345"
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.evictions, stats.entries, stats.size) == (2, 2, 1, 2, 8)
+        assert stats.hit_rate == 0.5
+
+
+def test_sqlite_cache_persistent(tmp_path: Path):
+    with SqliteCache(tmp_path / "cache.sqlite3") as cache:
+        cache.put("namespace", "a", b"12345")
+
+    with SqliteCache(tmp_path / "cache.sqlite3") as cache:
+        assert cache.get("namespace", "a") == b"12345"
+        assert cache.stats().size == 5
+
+
+def test_sqlite_cache_many(tmp_path: Path):
+    with SqliteCache(tmp_path / "cache.sqlite3", max_size=10) as cache:
+        cache.put_many("namespace", {"a": b"123", "b": b"456", "c": b"789"})
+        assert cache.get_many("namespace", ["a", "c", "d"]) == {"a": b"123", "c": b"789"}
+
+        cache.put_many("namespace", {"d": b"12"})
+        assert cache.get("namespace", "b") is None
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.evictions, stats.size) == (2, 2, 1, 8)
+
+
+def test_ticket_cache(tmp_path: Path, respx_mock: respx.mock):
+    responses = {
+        "ticket.get": get_fixture("trac-get-ticket-response.json"),
+        "ticket.changeLog": get_fixture("trac-get-ticket-changelog-response.json"),
+        "ticket.getRecentChanges": """{"error": null, "result": [1], "id": null}""",
+    }
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_code=httpx.codes.OK, text=responses[json.loads(request.content)["method"]])
+
+    respx_mock.post(TRAC_RPC_URL).mock(side_effect=respond)
+
+    with TicketCache(tmp_path / "cache.sqlite3") as ticket_cache:
+        api_client = ApiClient(rpc_url=TRAC_RPC_URL, ticket_cache=ticket_cache)
+
+        ticket, changelog = api_client.get_ticket(1), api_client.get_ticket_changelog(1)
+        assert api_client.get_ticket(1) == ticket
+        assert api_client.get_ticket_changelog(1) == changelog
+        assert len(respx_mock.calls) == 2
+
+        assert ticket_cache.refresh(api_client) == [1]
+        (since,) = json.loads(respx_mock.calls.last.request.content)["params"]
+        assert since["__jsonclass__"][0] == "datetime"
+        assert ticket_cache.last_refresh > datetime.fromisoformat(since["__jsonclass__"][1]).replace(tzinfo=UTC)
+
+        assert api_client.get_ticket(1) == ticket
+        assert len(respx_mock.calls) == 4
+
+        stats = ticket_cache.stats()
+        assert (stats.hits, stats.misses) == (2, 3)
+
+
+def test_lookup_cache(respx_mock: respx.mock):
+    respx_mock.post(TRAC_RPC_URL).respond(text=get_fixture("trac-get-all-components-response.json"))
+
+    now = 0.0
+    lookup_cache = LookupCache(ttl=10, ttls={"ticket.milestone.getAll": 1}, max_entries=2, clock=lambda: now)
+    api_client = ApiClient(rpc_url=TRAC_RPC_URL, lookup_cache=lookup_cache)
+
+    components = api_client.get_all_components()
+    components.append("mutated")
+    assert api_client.get_all_components() == components[:-1]
+    assert len(respx_mock.calls) == 1
+
+    api_client.get_all_milestones()
+    now = 5.0
+    api_client.get_all_components()
+    api_client.get_all_milestones()
+    assert len(respx_mock.calls) == 3
+
+    lookup_cache.invalidate("ticket.component.getAll")
+    api_client.get_all_components()
+    assert len(respx_mock.calls) == 4
+
+    api_client.get_all_versions()
+    api_client.get_all_components()
+    assert len(respx_mock.calls) == 5
+    api_client.get_all_milestones()
+    assert len(respx_mock.calls) == 6
+
+
+def test_wiki_html_cache(tmp_path: Path, respx_mock: respx.mock):
+    def respond(request: httpx.Request) -> httpx.Response:
+        calls = json.loads(request.content)["params"]
+        results = [
+            {"result": None, "error": {"message": "Boom", "code": -32603, "name": "Error"}, "id": None}
+            if call["params"] == ["error"]
+            else {"result": f"<p>{call['params'][0]}</p>", "error": None, "id": None}
+            for call in calls
+        ]
+        return httpx.Response(status_code=httpx.codes.OK, json={"result": results, "error": None, "id": None})
+
+    respx_mock.post(TRAC_RPC_URL).mock(side_effect=respond)
+
+    with WikiHtmlCache(tmp_path / "cache.sqlite3") as wiki_html_cache:
+        api_client = ApiClient(rpc_url=TRAC_RPC_URL, wiki_html_cache=wiki_html_cache)
+        html = api_client.wiki_to_html_many(["a", "b", "a", "error", "c"], chunk_size=2)
+    assert html[:3] == ["<p>a</p>", "<p>b</p>", "<p>a</p>"]
+    assert isinstance(html[3], TracRpcError)
+    assert html[4] == "<p>c</p>"
+    assert [len(json.loads(call.request.content)["params"]) for call in respx_mock.calls] == [2, 2]
+
+    with WikiHtmlCache(tmp_path / "cache.sqlite3") as wiki_html_cache:
+        api_client = ApiClient(rpc_url=TRAC_RPC_URL, wiki_html_cache=wiki_html_cache)
+        assert api_client.wiki_to_html("b") == "<p>b</p>"
+        assert api_client.wiki_to_html_many(["c", "error", "a"])[::2] == ["<p>c</p>", "<p>a</p>"]
+    assert len(respx_mock.calls) == 3
+    assert json.loads(respx_mock.calls.last.request.content)["params"] == [
+        {"id": None, "method": "wiki.wikiToHtml", "params": ["error"]}
+    ]
@@ -0,0 +1,58 @@
+from datetime import UTC, datetime, timedelta
+
+from trac_rpc.changelog import ChangelogIndex
+from trac_rpc.client import find_last_field_change
+from trac_rpc.models import TracTicketChangelogEntry
+
+
+def change(day: int, field: str, old_value: str, new_value: str) -> TracTicketChangelogEntry:
+    return TracTicketChangelogEntry(datetime(2025, 1, day, tzinfo=UTC), "admin", field, old_value, new_value, True)
+
+
+CHANGELOG = [
+    change(2, "status", "new", "assigned"),
+    change(2, "owner", "", "admin"),
+    change(4, "status", "assigned", "closed"),
+    change(5, "status", "closed", "reopened"),
+    change(8, "status", "reopened", "closed"),
+]
+
+
+def test_changelog_index():
+    index = ChangelogIndex({1: CHANGELOG})
+
+    assert len(index) == 5
+    assert index.get_changes(1, "owner") == [CHANGELOG[1]]
+    assert index.last_change(1, "status") == CHANGELOG[4]
+    assert index.last_change(1, "status", "closed") == find_last_field_change(CHANGELOG, "status", "closed")
+    assert index.first_change(1, "status", "closed") == CHANGELOG[2]
+    assert index.first_change(1, "status", "accepted") is None
+    assert index.last_change(2, "status") is None
+
+
+def test_changelog_index_value_at():
+    index = ChangelogIndex({1: CHANGELOG})
+
+    assert index.value_at(1, "status", datetime(2025, 1, 1, tzinfo=UTC)) == "new"
+    assert index.value_at(1, "status", datetime(2025, 1, 4, tzinfo=UTC)) == "closed"
+    assert index.value_at(1, "status", datetime(2025, 1, 6, tzinfo=UTC)) == "reopened"
+    assert index.value_at(1, "resolution", datetime(2025, 1, 6, tzinfo=UTC)) is None
+
+
+def test_changelog_index_time_in_state():
+    index = ChangelogIndex({1: CHANGELOG})
+    start, end = datetime(2025, 1, 1, tzinfo=UTC), datetime(2025, 1, 10, tzinfo=UTC)
+
+    assert index.time_in_state(1, "status", "new", start, end) == timedelta(days=1)
+    assert index.time_in_state(1, "status", "closed", start, end) == timedelta(days=3)
+    assert index.time_in_state(1, "status", "closed", datetime(2025, 1, 4, 12, tzinfo=UTC), end) == timedelta(days=2.5)
+    assert index.time_in_state(1, "status", "accepted", start, end) == timedelta()
+
+
+def test_changelog_index_incremental():
+    index = ChangelogIndex()
+    index.add(1, CHANGELOG[3:])
+    index.add(1, CHANGELOG)
+
+    assert len(index) == 5
+    assert index.get_changes(1, "status") == [CHANGELOG[0], *CHANGELOG[2:]]
@@ -1,4 +1,7 @@
 import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock
 
 import httpx
@@ -8,8 +11,10 @@ from _pytest.monkeypatch import MonkeyPatch
 from pydantic import ValidationError
 
 from trac_rpc.client import ApiClient, HttpClient
+from trac_rpc.concurrency import AdaptiveLimiter
 from trac_rpc.exceptions import TracRpcError
 from trac_rpc.models import TracApiVersion, TracRpcErrorResponse
+from trac_rpc.validators import InternPool
 
 from .utils import (
     RESPONSE_API_VERSION,
@@ -66,8 +71,8 @@ def test_event_hooks_default(monkeypatch: MonkeyPatch, respx_mock: respx.mock):
     ).mock(return_value=RESPONSE_API_VERSION)
 
     mock_log_request, mock_log_response = MagicMock(), MagicMock()
-    monkeypatch.setattr(HttpClient, "log_trac_rpc_request", mock_log_request)
-    monkeypatch.setattr(HttpClient, "log_trac_rpc_response", mock_log_response)
+    monkeypatch.setattr(HttpClient, "log_request", mock_log_request)
+    monkeypatch.setattr(HttpClient, "log_response", mock_log_response)
 
     api_client = ApiClient(rpc_url=TRAC_RPC_URL)
     api_client.get_api_version()
@@ -76,6 +81,20 @@ def test_event_hooks_default(monkeypatch: MonkeyPatch, respx_mock: respx.mock):
     mock_log_response.assert_called_once()
 
 
+def test_event_hooks_static(caplog: pytest.LogCaptureFixture, respx_mock: respx.mock):
+    caplog.set_level(logging.DEBUG, logger="trac_rpc.client")
+    respx_mock.post(TRAC_RPC_URL).mock(return_value=RESPONSE_API_VERSION)
+
+    http_client = HttpClient(
+        event_hooks={"request": [HttpClient.log_trac_rpc_request], "response": [HttpClient.log_trac_rpc_response]}
+    )
+    ApiClient(rpc_url=TRAC_RPC_URL, http_client=http_client).get_api_version()
+
+    request_record, response_record = (record for record in caplog.records if record.name == "trac_rpc.client")
+    assert request_record.getMessage().startswith(f'Trac API Request: POST {TRAC_RPC_URL} {{"id":null')
+    assert response_record.getMessage().startswith(f"Trac API Response: POST {TRAC_RPC_URL} 200 {{")
+
+
 def test_raise_for_status(api_client: ApiClient, respx_mock: respx.mock):
     respx_mock.post(url=TRAC_RPC_URL) % httpx.codes.BAD_GATEWAY
 
@@ -87,8 +106,8 @@ def test_event_hooks_override(monkeypatch: MonkeyPatch, respx_mock: respx.mock):
     respx_mock.post(TRAC_RPC_URL).mock(return_value=RESPONSE_API_VERSION)
 
     mock_log_request, mock_log_response = MagicMock(), MagicMock()
-    monkeypatch.setattr(HttpClient, "log_trac_rpc_request", mock_log_request)
-    monkeypatch.setattr(HttpClient, "log_trac_rpc_response", mock_log_response)
+    monkeypatch.setattr(HttpClient, "log_request", mock_log_request)
+    monkeypatch.setattr(HttpClient, "log_response", mock_log_response)
 
     api_client = ApiClient(rpc_url=TRAC_RPC_URL, http_client=HttpClient(event_hooks={}))
     api_client.get_api_version()
@@ -137,3 +156,102 @@ def test_get_api_version(monkeypatch: MonkeyPatch, api_client, respx_mock: respx
 
     assert isinstance(response, TracApiVersion)
     assert (response.epoch, response.major, response.minor) == (1, 1, 0)
+
+
+def test_logging_disabled(caplog: pytest.LogCaptureFixture):
+    caplog.set_level(logging.INFO, logger="trac_rpc.client")
+
+    request, response = MagicMock(), MagicMock()
+    http_client = HttpClient()
+    http_client.log_request(request)
+    http_client.log_response(response)
+
+    request.content.decode.assert_not_called()
+    response.read.assert_not_called()
+    assert caplog.records == []
+
+
+def test_logging_body_limit(caplog: pytest.LogCaptureFixture, respx_mock: respx.mock):
+    caplog.set_level(logging.DEBUG, logger="trac_rpc.client")
+    respx_mock.post(TRAC_RPC_URL).mock(return_value=RESPONSE_API_VERSION)
+
+    api_client = ApiClient(rpc_url=TRAC_RPC_URL, http_client=HttpClient(log_body_limit=10))
+    api_client.get_api_version()
+
+    request_record, response_record = (record for record in caplog.records if record.name == "trac_rpc.client")
+    assert request_record.getMessage() == f'Trac API Request: POST {TRAC_RPC_URL} {{"id":null... (57 bytes)'
+    assert response_record.getMessage().startswith(f"Trac API Response: POST {TRAC_RPC_URL} 200 {{\n  ")
+    assert response_record.getMessage().endswith(
+        f"... ({len(get_fixture('trac-get-api-version-response.json'))} bytes)"
+    )
+
+
+def test_logging_structured(caplog: pytest.LogCaptureFixture, respx_mock: respx.mock):
+    caplog.set_level(logging.DEBUG, logger="trac_rpc.client")
+    respx_mock.post(TRAC_RPC_URL).mock(return_value=RESPONSE_API_VERSION)
+
+    api_client = ApiClient(rpc_url=TRAC_RPC_URL, http_client=HttpClient(log_format="structured"))
+    api_client.get_api_version()
+
+    request_record, response_record = (record for record in caplog.records if record.name == "trac_rpc.client")
+    assert request_record.trac_rpc == {"method": "system.getAPIVersion", "request_size": 57}
+    assert response_record.trac_rpc["method"] == "system.getAPIVersion"
+    assert response_record.trac_rpc["status_code"] == httpx.codes.OK
+    assert response_record.trac_rpc["response_size"] == len(get_fixture("trac-get-api-version-response.json"))
+    assert response_record.trac_rpc["elapsed"] >= 0
+    assert not response_record.getMessage().endswith("}")
+
+
+def test_coalesce(respx_mock: respx.mock):
+    def respond(_request: httpx.Request) -> httpx.Response:
+        time.sleep(0.05)
+        return httpx.Response(status_code=httpx.codes.OK, text=get_fixture("trac-get-ticket-changelog-response.json"))
+
+    respx_mock.post(TRAC_RPC_URL).mock(side_effect=respond)
+
+    api_client = ApiClient(rpc_url=TRAC_RPC_URL, coalesce=True)
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        changelogs = list(executor.map(lambda _: api_client.get_ticket_changelog(1), range(5)))
+
+    assert len(respx_mock.calls) == 1
+    assert all(changelog == changelogs[0] for changelog in changelogs)
+    assert len({id(changelog) for changelog in changelogs}) == 5
+
+
+def test_limiter(respx_mock: respx.mock):
+    respx_mock.post(TRAC_RPC_URL).mock(
+        side_effect=[
+            httpx.Response(status_code=httpx.codes.BAD_GATEWAY),
+            httpx.TimeoutException("timeout"),
+            RESPONSE_API_VERSION,
+        ]
+    )
+
+    limiter = AdaptiveLimiter(initial=4, sleep=lambda _: None)
+    api_client = ApiClient(rpc_url=TRAC_RPC_URL, limiter=limiter)
+
+    assert isinstance(api_client.get_api_version(), TracApiVersion)
+    assert len(respx_mock.calls) == 3
+    assert limiter.stats()[1:5] == (0, 1, 2, 2)
+    assert limiter.limit == 2
+
+
+def test_intern_pool(respx_mock: respx.mock):
+    respx_mock.post(TRAC_RPC_URL).respond(text=get_fixture("trac-get-ticket-response.json"))
+
+    intern_pool = InternPool()
+    api_client = ApiClient(rpc_url=TRAC_RPC_URL, intern_pool=intern_pool)
+    first, second = api_client.get_ticket(1), api_client.get_ticket(1)
+
+    assert first.attributes.status is second.attributes.status
+    assert first.attributes.keywords[0] is second.attributes.keywords[0]
+    assert len(intern_pool) > 0
+
+
+def test_profile():
+    assert HttpClient(profile="bulk-sync").timeout == httpx.Timeout(120.0, connect=10.0, pool=None)
+    assert HttpClient(profile="interactive", timeout=1.0).timeout == httpx.Timeout(1.0)
+    assert HttpClient(profile="interactive").timeout == httpx.Timeout(5.0, connect=2.0)
+
+    with pytest.raises(KeyError):
+        HttpClient(profile="unknown")
@@ -0,0 +1,43 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from trac_rpc.codecs import CODECS, RequestEncoder, StdlibCodec, get_codec
+from trac_rpc.models import TracRequest
+from trac_rpc.validators import serialize_datetime
+
+
+@pytest.fixture(params=list(CODECS))
+def codec_name(request: pytest.FixtureRequest) -> str:
+    if request.param != "stdlib":
+        pytest.importorskip(request.param)
+    return request.param
+
+
+def test_codec(codec_name: str):
+    codec = get_codec(codec_name)
+    value = {"id": None, "method": "ticket.query", "params": ["summary~=Ünïcode", 1.5, True]}
+
+    assert codec.name == codec_name
+    assert codec.encode(value) == StdlibCodec().encode(value)
+    assert codec.decode(codec.encode(value)) == value
+
+
+def test_get_codec():
+    codec = StdlibCodec()
+
+    assert get_codec(codec) is codec
+    assert get_codec("auto").name in CODECS
+
+
+def test_request_encoder(codec_name: str):
+    encoder = RequestEncoder(get_codec(codec_name))
+
+    body = encoder.encode(TracRequest(method="ticket.component.getAll"))
+    assert body == b'{"id":null,"method":"ticket.component.getAll","params":null}'
+    assert encoder.encode(TracRequest(method="ticket.component.getAll")) is body
+
+    request = TracRequest(
+        method="ticket.getRecentChanges", params=[serialize_datetime(datetime(2025, 1, 1, tzinfo=UTC))]
+    )
+    assert encoder.encode(request) == StdlibCodec().encode(request.model_dump())
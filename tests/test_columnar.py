@@ -0,0 +1,66 @@
+import json
+
+import httpx
+import respx
+
+from trac_rpc.client import ApiClient
+from trac_rpc.columnar import ChangelogColumns, StringDictionary, TicketColumns
+
+from .utils import get_fixture
+
+
+def test_string_dictionary():
+    strings = StringDictionary()
+
+    assert strings.encode("closed") == strings.encode("closed") == 1
+    assert strings.encode(None) == 0
+    assert strings.decode(1) == "closed"
+    assert len(strings) == 2
+
+
+def test_changelog_columns(api_client: ApiClient, respx_mock: respx.mock):
+    respx_mock.post().respond(text=get_fixture("trac-get-ticket-changelog-response.json"))
+    changelog = api_client.get_ticket_changelog(1)
+
+    columns = ChangelogColumns()
+    columns.append(1, json.loads(get_fixture("trac-get-ticket-changelog-response.json"))["result"])
+    columns.append(2, [])
+
+    assert len(columns) == len(changelog)
+    assert list(columns) == changelog
+    assert columns.get_changelog(1) == changelog
+    assert columns.get_changelog(2) == []
+    assert len(columns.strings) < 4 * len(changelog)
+
+
+def test_ticket_columns(api_client: ApiClient, respx_mock: respx.mock):
+    respx_mock.post().respond(text=get_fixture("trac-get-ticket-response.json"))
+    ticket = api_client.get_ticket(1)
+
+    columns = TicketColumns()
+    columns.append(json.loads(get_fixture("trac-get-ticket-response.json"))["result"])
+
+    assert list(columns) == [ticket]
+    assert columns.get_ticket(1) == ticket
+    assert columns.get_ticket(2) is None
+
+
+def test_get_columns(api_client: ApiClient, respx_mock: respx.mock):
+    responses = {
+        "ticket.get": json.loads(get_fixture("trac-get-ticket-response.json")),
+        "ticket.changeLog": json.loads(get_fixture("trac-get-ticket-changelog-response.json")),
+    }
+
+    def multicall(request: httpx.Request) -> httpx.Response:
+        signatures = json.loads(request.content)["params"]
+        return httpx.Response(
+            status_code=httpx.codes.OK,
+            json={"result": [responses[signature["method"]] for signature in signatures], "error": None, "id": None},
+        )
+
+    respx_mock.post().mock(side_effect=multicall)
+
+    assert len(api_client.get_ticket_columns(range(5), chunk_size=2)) == 5
+    changelogs = api_client.get_changelog_columns(range(5), chunk_size=2)
+    assert len(changelogs) == 25
+    assert changelogs.get_changelog(4) == list(changelogs)[:5]
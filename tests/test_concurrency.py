@@ -0,0 +1,229 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from trac_rpc.concurrency import (
+    AdaptiveLimiter,
+    AsyncSingleFlight,
+    ByteBudget,
+    LimiterStats,
+    MapResult,
+    SingleFlight,
+    parallel_map,
+    prefetch,
+)
+
+
+def test_prefetch_order():
+    def task(value: int) -> int:
+        time.sleep(0.001 * (10 - value))
+        return value
+
+    assert list(prefetch((lambda value=value: task(value) for value in range(10)), 3)) == list(range(10))
+
+
+def test_prefetch_window():
+    started = []
+    lock = threading.Lock()
+
+    def task(value: int) -> int:
+        with lock:
+            started.append(value)
+        return value
+
+    results = prefetch((lambda value=value: task(value) for value in range(100)), 3)
+    assert next(results) == 0
+    time.sleep(0.01)
+
+    assert len(started) <= 4
+    results.close()
+
+
+def test_parallel_map():
+    def task(value: int) -> int:
+        time.sleep(0.001 * (10 - value))
+        if value == 5:
+            raise ValueError(value)
+        return value
+
+    results = list(parallel_map(task, range(10), 3))
+    assert [result.item for result in results] == list(range(10))
+    assert [result.result for result in results] == [0, 1, 2, 3, 4, None, 6, 7, 8, 9]
+    assert isinstance(results[5].error, ValueError)
+    with pytest.raises(ValueError, match="5"):
+        results[5].get()
+
+    results = list(parallel_map(task, range(10), 10, ordered=False))
+    assert [result.item for result in results] != list(range(10))
+    assert sorted(result.item for result in results) == list(range(10))
+
+
+def test_parallel_map_cancel():
+    cancel = threading.Event()
+    started = []
+
+    def task(value: int) -> int:
+        started.append(value)
+        time.sleep(0.001)
+        return value
+
+    results = parallel_map(task, range(100), 2, cancel=cancel)
+    assert next(results) == MapResult(0, 0)
+    cancel.set()
+
+    assert len(list(results)) <= 1
+    assert len(started) <= 6
+
+
+def test_byte_budget():
+    budget = ByteBudget(10)
+    peak = 0
+    lock = threading.Lock()
+
+    def task(size: int) -> int:
+        nonlocal peak
+        with budget.reserve(size):
+            with lock:
+                peak = max(peak, budget.in_flight)
+            time.sleep(0.001)
+        return size
+
+    results = list(parallel_map(task, [4, 4, 4, 15, 6, 3], 6))
+    assert [result.get() for result in results] == [4, 4, 4, 15, 6, 3]
+    assert peak == 15
+    assert budget.in_flight == 0
+
+    peak = 0
+    list(parallel_map(task, [4, 4, 4, 6, 3], 5))
+    assert peak <= 10
+
+
+def test_single_flight():
+    calls = 0
+    barrier = threading.Barrier(5)
+    release = threading.Event()
+
+    def fetch() -> int:
+        nonlocal calls
+        calls += 1
+        release.wait(1)
+        return 42
+
+    def worker(results: list[int]):
+        barrier.wait()
+        results.append(single_flight.do("key", fetch))
+
+    single_flight, results = SingleFlight(), []
+    threads = [threading.Thread(target=worker, args=(results,)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == [42] * 5
+    assert calls == 1
+
+
+def test_single_flight_exception():
+    def fetch():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError, match="failed"):
+        SingleFlight().do("key", fetch)
+
+
+def test_async_single_flight_exception():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    async def main():
+        single_flight = AsyncSingleFlight()
+        return await asyncio.gather(*(single_flight.do("key", fetch) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_async_single_flight_cancel():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def main():
+        single_flight = AsyncSingleFlight()
+        leader = asyncio.create_task(asyncio.wait_for(single_flight.do("key", fetch), timeout=0.005))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(single_flight.do("key", fetch))
+        return await asyncio.gather(leader, follower, return_exceptions=True)
+
+    leader, follower = asyncio.run(main())
+
+    assert calls == 1
+    assert isinstance(leader, TimeoutError)
+    assert follower == "result"
+
+
+def test_adaptive_limiter():
+    now = 0.0
+
+    def call(latency: float, status_code: int = 200):
+        def function():
+            nonlocal now
+            now += latency
+            httpx.Response(status_code, request=httpx.Request("POST", "http://localhost")).raise_for_status()
+
+        return limiter.call(function)
+
+    limiter = AdaptiveLimiter(initial=1, maximum=3, retries=1, clock=lambda: now, sleep=lambda _: None)
+    for _ in range(3):
+        call(0.1)
+    assert limiter.limit == 2
+
+    call(1.0)  # slow calls do not increase the limit
+    assert limiter.limit == 2
+
+    with pytest.raises(httpx.HTTPStatusError):
+        call(0.1, 502)
+    assert limiter.limit == 1
+
+    with pytest.raises(httpx.HTTPStatusError):
+        call(0.1, 404)  # client errors are neither retried nor decrease the limit
+    assert limiter.stats() == LimiterStats(
+        limit=1, in_flight=0, completed=4, overloaded=2, retried=1, throughput=pytest.approx(0.4)
+    )
+
+
+def test_adaptive_limiter_concurrency():
+    in_flight = max_in_flight = 0
+    lock = threading.Lock()
+
+    def task(value: int) -> int:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.001)
+        with lock:
+            in_flight -= 1
+        return value
+
+    limiter = AdaptiveLimiter(initial=2, maximum=4)
+    results = parallel_map(lambda value: limiter.call(lambda: task(value)), range(50), 8)
+    assert [result.get() for result in results] == list(range(50))
+    assert max_in_flight <= 4
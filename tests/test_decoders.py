@@ -0,0 +1,67 @@
+import json
+
+import pytest
+import respx
+
+from trac_rpc.client import ApiClient
+from trac_rpc.decoders import decode_result, get_response_model, get_ticket_properties_type
+from trac_rpc.exceptions import TracRpcError
+from trac_rpc.models import (
+    TracResponse,
+    TracTicket,
+    TracTicketAttachments,
+    TracTicketChangelog,
+    TracTicketProperties,
+)
+
+from .utils import TRAC_RPC_URL, get_fixture
+
+
+def test_get_response_model():
+    assert get_response_model(list[int]) is get_response_model(list[int])
+    assert get_response_model(list[int]) is TracResponse[list[int]]
+
+
+def test_get_ticket_properties_type():
+    class CustomTracTicket(TracTicket):
+        pass
+
+    assert get_ticket_properties_type(CustomTracTicket) is get_ticket_properties_type(CustomTracTicket)
+    assert get_ticket_properties_type(CustomTracTicket) == TracTicketProperties[CustomTracTicket]
+
+
+@pytest.mark.parametrize(
+    ("fixture", "klass"),
+    [
+        ("trac-get-ticket-response.json", TracTicketProperties[TracTicket]),
+        ("trac-get-ticket-changelog-response.json", TracTicketChangelog),
+        ("trac-get-ticket-attachments-response.json", TracTicketAttachments),
+    ],
+)
+def test_decode_result_trusted(fixture: str, klass: type):
+    data = json.loads(get_fixture(fixture))
+
+    assert decode_result(data, klass, trusted=True) == decode_result(data, klass)
+
+
+@pytest.mark.parametrize("value", ["", " ", "\t", "a", " a  b ", "\ta \t b\n", "a,b c"])
+def test_decode_result_trusted_strings(value: str):
+    data = json.loads(get_fixture("trac-get-ticket-response.json"))
+    data["result"][3] |= {"owner": value, "keywords": value, "cc": value}
+
+    assert decode_result(data, TracTicketProperties[TracTicket], trusted=True) == decode_result(
+        data, TracTicketProperties[TracTicket]
+    )
+
+
+def test_decode_result_trusted_error():
+    with pytest.raises(TracRpcError, match=r"RPC method .+ not found"):
+        decode_result(json.loads(get_fixture("trac-response-rpc-error.json")), TracTicketChangelog, trusted=True)
+
+
+def test_decode_mode_trusted(respx_mock: respx.mock):
+    respx_mock.post(TRAC_RPC_URL).respond(text=get_fixture("trac-get-ticket-response.json"))
+
+    assert ApiClient(rpc_url=TRAC_RPC_URL, decode_mode="trusted").get_ticket(1) == ApiClient(
+        rpc_url=TRAC_RPC_URL
+    ).get_ticket(1)
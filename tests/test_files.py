@@ -0,0 +1,37 @@
+from pathlib import Path
+
+import pytest
+
+from trac_rpc import files
+from trac_rpc.files import atomic_write
+
+from .utils import get_default_mode
+
+
+def test_atomic_write(tmp_path: Path):
+    path = tmp_path / "page.txt"
+    path.write_bytes(b"old")
+
+    with atomic_write(path) as file:
+        file.write(b"new")
+        assert path.read_bytes() == b"old"
+    assert path.read_bytes() == b"new"
+    assert path.stat().st_mode & 0o777 == get_default_mode()
+
+    def write_partially():
+        with atomic_write(path) as file:
+            file.write(b"partial")
+            raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        write_partially()
+    assert path.read_bytes() == b"new"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_atomic_write_no_name(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(files.secrets, "token_hex", lambda _: "0")
+    (tmp_path / ".page.txt.0").touch()
+
+    with pytest.raises(FileExistsError, match="no temporary file name"), atomic_write(tmp_path / "page.txt"):
+        pass
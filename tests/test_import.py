@@ -0,0 +1,58 @@
+import json
+import subprocess
+import sys
+
+# Generous budgets to catch regressions (e.g. httpx imported eagerly again, or schemas built at import time) without
+# failing on slow machines
+IMPORT_TIME_BUDGET = 1.0
+FIRST_CALL_TIME_BUDGET = 2.0
+
+FIRST_CALL_SCRIPT = """
+import json
+import time
+
+started = time.perf_counter()
+
+import httpx
+
+from trac_rpc.client import ApiClient, HttpClient
+
+api_client = ApiClient(
+    rpc_url="https://trac.example.com/rpc",
+    http_client=HttpClient(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"result": [1, 2, 0], "error": None, "id": None})
+        )
+    ),
+)
+api_client.get_api_version()
+print(json.dumps(time.perf_counter() - started))
+"""
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True)
+
+
+def test_import():
+    process = run_python(
+        "-X",
+        "importtime",
+        "-c",
+        "import json, sys, trac_rpc.client, trac_rpc.models as models; print(json.dumps(["
+        "sorted(name for name in ('asyncio', 'httpx') if name in sys.modules), models.TracTicket.__pydantic_complete__"
+        "]))",
+    )
+    assert json.loads(process.stdout) == [[], False]
+
+    # Each line of the report reads "import time: self [us] | cumulative | imported package"
+    cumulative = {
+        line.rpartition("|")[2].strip(): int(line.split("|")[1])
+        for line in process.stderr.splitlines()
+        if line.startswith("import time:") and "cumulative" not in line
+    }
+    assert cumulative["trac_rpc.client"] / 1_000_000 < IMPORT_TIME_BUDGET
+
+
+def test_first_call():
+    assert json.loads(run_python("-c", FIRST_CALL_SCRIPT).stdout) < FIRST_CALL_TIME_BUDGET
@@ -1,9 +1,20 @@
 import json
+from datetime import UTC, datetime, timedelta
 
 import pytest
 
 from trac_rpc.client import ApiClient, HttpClient
-from trac_rpc.models import TracApiVersion, TracComponent, TracMilestone, TracVersion
+from trac_rpc.decoders import get_ticket_properties_type
+from trac_rpc.exceptions import TracRpcError
+from trac_rpc.models import (
+    TracApiVersion,
+    TracComponent,
+    TracMilestone,
+    TracRequest,
+    TracTicket,
+    TracVersion,
+    TracWikiPageInfo,
+)
 
 from .utils import get_fixture
 
@@ -96,3 +107,33 @@ def test_wiki_to_html(api_client: ApiClient):
 </p>
 """
     )
+
+
+def test_multicall(api_client: ApiClient):
+    api_version, page_names, ticket, page_info, text = api_client.multicall(
+        [
+            (TracRequest(method="system.getAPIVersion"), TracApiVersion),
+            (TracRequest(method="wiki.getAllPages"), list[str]),
+            (TracRequest(method="ticket.get", params=[1]), get_ticket_properties_type(TracTicket)),
+            (TracRequest(method="wiki.getPageInfo", params=["NoSuchPage"]), TracWikiPageInfo),
+            (TracRequest(method="wiki.getPage", params=["NoSuchPage"]), str),
+        ]
+    )
+    assert api_version == TracApiVersion(epoch=1, major=2, minor=0)
+    assert sorted(page_names) == sorted(get_list_str_result("trac-get-all-wiki-pages-response"))
+    # The mirror and the wiki export rely on this error code to tell deleted tickets and pages from failures
+    assert isinstance(ticket, TracRpcError)
+    assert ticket.error.code == 404
+    assert isinstance(page_info, TracRpcError)
+    assert isinstance(text, TracRpcError)
+    assert text.error.code == 404
+
+
+def test_get_recent_ticket_changes(api_client: ApiClient):
+    assert api_client.get_recent_ticket_changes(datetime.now(UTC) - timedelta(days=1)) == []
+
+
+def test_get_wiki_page_info(api_client: ApiClient):
+    page_info = api_client.get_wiki_page_info("WikiStart")
+    assert (page_info.name, page_info.version) == ("WikiStart", 1)
+    assert page_info.last_modified <= datetime.now(UTC)
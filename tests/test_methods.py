@@ -1,13 +1,25 @@
+import base64
+import io
 import json
-from datetime import datetime
+from datetime import UTC, datetime
+from pathlib import Path
 
+import httpx
 import pytest
 import respx
 
 from trac_rpc.client import ApiClient
-from trac_rpc.models import TracAttachment, TracTicket, TracTicketChangelogEntry, TracTicketProperties
+from trac_rpc.exceptions import TracRpcError
+from trac_rpc.models import (
+    TracAttachment,
+    TracRequest,
+    TracTicket,
+    TracTicketAttachments,
+    TracTicketChangelogEntry,
+    TracTicketProperties,
+)
 
-from .utils import get_fixture
+from .utils import get_default_mode, get_fixture
 
 
 @pytest.mark.parametrize(
@@ -148,3 +160,212 @@ def test_get_ticket_last_field_change(api_client: ApiClient, respx_mock: respx.m
         new_value="admin",
         permanent=True,
     )
+
+
+def test_multicall(api_client: ApiClient, respx_mock: respx.mock):
+    ticket_response = json.loads(get_fixture("trac-get-ticket-response.json"))
+    error_response = json.loads(get_fixture("trac-response-rpc-error.json"))
+    attachments_response = json.loads(get_fixture("trac-get-ticket-attachments-response.json"))
+
+    respx_mock.post().mock(
+        side_effect=[
+            httpx.Response(
+                status_code=httpx.codes.OK,
+                json={"result": [ticket_response, error_response], "error": None, "id": None},
+            ),
+            httpx.Response(
+                status_code=httpx.codes.OK,
+                json={"result": [attachments_response], "error": None, "id": None},
+            ),
+        ]
+    )
+
+    ticket, error, attachments = api_client.multicall(
+        [
+            (TracRequest(method="ticket.get", params=[1]), TracTicketProperties[TracTicket]),
+            (TracRequest(method="ticket.wiki_to_html"), str),
+            (TracRequest(method="ticket.listAttachments", params=[1]), TracTicketAttachments),
+        ],
+        chunk_size=2,
+    )
+
+    assert [json.loads(call.request.content)["params"] for call in respx_mock.calls] == [
+        [
+            {"id": None, "method": "ticket.get", "params": [1]},
+            {"id": None, "method": "ticket.wiki_to_html", "params": []},
+        ],
+        [{"id": None, "method": "ticket.listAttachments", "params": [1]}],
+    ]
+
+    assert ticket.id == 1
+    assert isinstance(error, TracRpcError)
+    assert str(error) == 'RPC method "ticket.wiki_to_html" not found'
+    assert [attachment.filename for attachment in attachments] == ["TracXMLRPC-1.2.0.dev0-py3.13.egg"]
+
+
+def test_iter_tickets(api_client: ApiClient, respx_mock: respx.mock):
+    responses = {
+        "ticket.get": json.loads(get_fixture("trac-get-ticket-response.json")),
+        "ticket.changeLog": json.loads(get_fixture("trac-get-ticket-changelog-response.json")),
+    }
+
+    def multicall(request: httpx.Request) -> httpx.Response:
+        signatures = json.loads(request.content)["params"]
+        return httpx.Response(
+            status_code=httpx.codes.OK,
+            json={"result": [responses[signature["method"]] for signature in signatures], "error": None, "id": None},
+        )
+
+    respx_mock.post().mock(side_effect=multicall)
+
+    tickets = list(api_client.iter_tickets(range(5), with_changelog=True, chunk_size=2))
+
+    assert len(respx_mock.calls) == 3
+    assert len(tickets) == 5
+    assert all(ticket.properties.id == 1 and len(ticket.changelog) == 5 for ticket in tickets)
+    assert all(ticket.attachments is None for ticket in tickets)
+
+
+def test_iter_tickets_missing(api_client: ApiClient, respx_mock: respx.mock):
+    ticket = json.loads(get_fixture("trac-get-ticket-response.json"))
+    not_found = {
+        "result": None,
+        "error": {"message": "Ticket 3 does not exist.", "code": 404, "name": "Error"},
+        "id": None,
+    }
+
+    def multicall(request: httpx.Request) -> httpx.Response:
+        signatures = json.loads(request.content)["params"]
+        return httpx.Response(
+            status_code=httpx.codes.OK,
+            json={
+                "result": [not_found if signature["params"] == [3] else ticket for signature in signatures],
+                "error": None,
+                "id": None,
+            },
+        )
+
+    respx_mock.post().mock(side_effect=multicall)
+
+    with pytest.raises(TracRpcError, match="Ticket 3 does not exist"):
+        list(api_client.iter_tickets(range(1, 8), chunk_size=5))
+
+    assert len(list(api_client.iter_tickets(range(1, 8), chunk_size=5, skip_missing=True))) == 6
+    assert len(api_client.get_ticket_columns(range(1, 8), chunk_size=5, skip_missing=True)) == 6
+
+
+def test_stream_ticket_changelog(api_client: ApiClient, respx_mock: respx.mock):
+    respx_mock.post().respond(text=get_fixture("trac-get-ticket-changelog-response.json"))
+
+    changelog = api_client.get_ticket_changelog(1)
+    assert list(api_client.stream_ticket_changelog(1)) == changelog
+
+
+def test_stream_query_tickets_error(api_client: ApiClient, respx_mock: respx.mock):
+    respx_mock.post().respond(text=get_fixture("trac-response-rpc-error.json"))
+
+    with pytest.raises(TracRpcError, match=r"RPC method .+ not found"):
+        list(api_client.stream_query_tickets())
+
+
+@pytest.mark.parametrize(
+    ("total", "page_size", "expected_pages"),
+    [
+        (0, 3, 1),
+        (7, 3, 3),
+        (9, 3, 4),
+    ],
+)
+def test_iter_query_tickets(
+    total: int, page_size: int, expected_pages: int, api_client: ApiClient, respx_mock: respx.mock
+):
+    ticket_ids = list(range(1, total + 1))
+
+    def query(request: httpx.Request) -> httpx.Response:
+        (param,) = json.loads(request.content)["params"]
+        page_number = int(param.split("&")[0].removeprefix("page="))
+        if page_number > 1 and (page_number - 1) * page_size >= total:
+            return httpx.Response(
+                status_code=httpx.codes.OK,
+                json={
+                    "error": {
+                        # Localized servers report the error in their own language
+                        "message": f"Seite {page_number} liegt jenseits der Anzahl der Seiten der Abfrage",
+                        "code": -32603,
+                        "name": "InternalError",
+                    },
+                    "result": None,
+                    "id": None,
+                },
+            )
+        page = ticket_ids[(page_number - 1) * page_size : page_number * page_size]
+        return httpx.Response(status_code=httpx.codes.OK, json={"error": None, "result": page, "id": None})
+
+    respx_mock.post().mock(side_effect=query)
+
+    assert list(api_client.iter_query_tickets(page_size=page_size)) == ticket_ids
+    assert len(respx_mock.calls) == expected_pages
+
+
+def test_iter_query_tickets_error(api_client: ApiClient, respx_mock: respx.mock):
+    respx_mock.post().respond(
+        json={"error": {"message": "Internal error", "code": -32603, "name": "Error"}, "result": None, "id": None}
+    )
+
+    with pytest.raises(TracRpcError, match="Internal error"):
+        list(api_client.iter_query_tickets(page_size=3))
+
+
+def test_map(api_client: ApiClient, respx_mock: respx.mock):
+    def respond(request: httpx.Request) -> httpx.Response:
+        (text,) = json.loads(request.content)["params"]
+        if text == "error":
+            return httpx.Response(200, text=get_fixture("trac-response-rpc-error.json"))
+        return httpx.Response(200, json={"error": None, "result": f"<p>{text}</p>", "id": None})
+
+    respx_mock.post().mock(side_effect=respond)
+
+    results = list(api_client.map("wiki_to_html", ["a", "error", "b"], max_workers=2))
+    assert [result.item for result in results] == ["a", "error", "b"]
+    assert [result.result for result in results] == ["<p>a</p>", None, "<p>b</p>"]
+    assert isinstance(results[1].error, TracRpcError)
+
+    results = api_client.map(api_client.wiki_to_html, ["a", "b", "c"], ordered=False)
+    assert sorted(result.get() for result in results) == ["<p>a</p>", "<p>b</p>", "<p>c</p>"]
+
+
+def test_download_ticket_attachments(tmp_path: Path, api_client: ApiClient, respx_mock: respx.mock):
+    contents = {"a.txt": b"A" * 1000, "b.bin": bytes(range(256)), "missing.txt": None}
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        _, filename = json.loads(request.content)["params"]
+        if (content := contents[filename]) is None:
+            return httpx.Response(200, text=get_fixture("trac-response-rpc-error.json"))
+        result = {"__jsonclass__": ["binary", base64.encodebytes(content).decode()]}
+        return httpx.Response(200, json={"result": result, "error": None, "id": None})
+
+    respx_mock.post().mock(side_effect=respond)
+
+    def attachment(filename: str, size: int) -> TracAttachment:
+        return TracAttachment(filename, "", size, datetime(2025, 1, 1, tzinfo=UTC), "admin")
+
+    file = io.BytesIO()
+    assert api_client.download_ticket_attachment(1, "b.bin", file) == 256
+    assert file.getvalue() == contents["b.bin"]
+
+    with pytest.raises(ValueError, match="expected 999"):
+        api_client.download_ticket_attachment(1, attachment("a.txt", 999), tmp_path / "a.txt")
+    assert list(tmp_path.iterdir()) == []
+
+    results = list(
+        api_client.download_ticket_attachments(
+            [(1, attachment("a.txt", 1000)), (2, attachment("b.bin", 256)), (2, attachment("missing.txt", 10))],
+            tmp_path,
+            max_bytes_in_flight=512,
+        )
+    )
+    assert [result.result for result in results] == [1000, 256, None]
+    assert isinstance(results[2].error, TracRpcError)
+    assert (tmp_path / "1" / "a.txt").read_bytes() == contents["a.txt"]
+    assert (tmp_path / "1" / "a.txt").stat().st_mode & 0o777 == get_default_mode()
+    assert sorted(path.name for path in (tmp_path / "2").iterdir()) == ["b.bin"]
@@ -0,0 +1,48 @@
+import pytest
+import respx
+
+from trac_rpc.client import ApiClient
+from trac_rpc.exceptions import TracRpcError
+from trac_rpc.metrics import Histogram, HistogramSink
+
+from .utils import TRAC_RPC_URL, get_fixture
+
+
+def test_histogram():
+    histogram = Histogram(minimum=1e-3)
+    for value in range(1, 1001):
+        histogram.add(value / 1000)
+
+    assert histogram.count == 1000
+    assert histogram.mean == pytest.approx(0.5005)
+    assert (histogram.min, histogram.max) == (0.001, 1.0)
+    assert histogram.quantile(0.5) == pytest.approx(0.5, rel=0.1)
+    assert histogram.quantile(0.99) == pytest.approx(0.99, rel=0.1)
+    assert histogram.quantile(1.0) == 1.0
+
+
+def test_histogram_sink(respx_mock: respx.mock):
+    respx_mock.post(TRAC_RPC_URL).respond(text=get_fixture("trac-get-ticket-response.json"))
+
+    metrics_sink = HistogramSink()
+    api_client = ApiClient(rpc_url=TRAC_RPC_URL, metrics_sink=metrics_sink)
+
+    assert api_client.get_ticket(1) == ApiClient(rpc_url=TRAC_RPC_URL).get_ticket(1)
+    api_client.get_ticket(2)
+
+    (summary,) = metrics_sink.summary().values()
+    assert summary["round_trip"]["count"] == 2
+    assert summary["response_size"]["max"] == len(get_fixture("trac-get-ticket-response.json"))
+    assert all(summary[phase]["max"] >= 0 for phase in ("encode", "round_trip", "read", "parse", "validate"))
+
+
+def test_histogram_sink_error(respx_mock: respx.mock):
+    respx_mock.post(TRAC_RPC_URL).respond(text=get_fixture("trac-response-rpc-error.json"))
+
+    metrics_sink = HistogramSink()
+    api_client = ApiClient(rpc_url=TRAC_RPC_URL, metrics_sink=metrics_sink)
+
+    with pytest.raises(TracRpcError):
+        api_client.get_api_version()
+
+    assert metrics_sink.summary()["system.getAPIVersion"]["validate"]["count"] == 1
@@ -0,0 +1,146 @@
+import contextlib
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+import respx
+
+from trac_rpc.client import ApiClient
+from trac_rpc.exceptions import TracRpcError
+from trac_rpc.mirror import SyncStats, TracMirror, main
+
+from .utils import INTERNAL_ERROR, NOT_FOUND, TRAC_PASSWORD, TRAC_RPC_URL, TRAC_USERNAME, FakeTrac, get_fixture
+
+PAGE_INFO = {
+    "name": "WikiStart",
+    "author": "admin",
+    "version": 3,
+    "lastModified": {"__jsonclass__": ["datetime", "2025-02-27T13:36:35"]},
+    "comment": "",
+}
+ENUMERATIONS = {
+    "components": "ticket.component.getAll",
+    "milestones": "ticket.milestone.getAll",
+    "priorities": "ticket.priority.getAll",
+    "resolutions": "ticket.resolution.getAll",
+    "severities": "ticket.severity.getAll",
+    "statuses": "ticket.status.getAll",
+    "types": "ticket.type.getAll",
+    "versions": "ticket.version.getAll",
+}
+
+
+class FakeServer(FakeTrac):
+    def __init__(self):
+        super().__init__()
+        self.results = {
+            "ticket.query": [1, 2],
+            "ticket.getRecentChanges": [1],
+            "ticket.get": json.loads(get_fixture("trac-get-ticket-response.json"))["result"],
+            "ticket.changeLog": json.loads(get_fixture("trac-get-ticket-changelog-response.json"))["result"],
+            "ticket.listAttachments": json.loads(get_fixture("trac-get-ticket-attachments-response.json"))["result"],
+            "wiki.getAllPages": ["WikiStart"],
+            "wiki.getRecentChanges": [PAGE_INFO],
+            "wiki.getPageInfo": PAGE_INFO,
+            "wiki.getPage": "= Welcome =",
+        }
+        for kind, method in ENUMERATIONS.items():
+            self.results[method] = json.loads(get_fixture(f"trac-get-all-{kind}-response.json"))["result"]
+        self.errors = {("ticket.get", 2): NOT_FOUND}
+
+    def call(self, method: str, params: list) -> dict:
+        if params and isinstance(params[0], int | str) and (error := self.errors.get((method, params[0]))) is not None:
+            return self.error(error)
+        return self.result(self.results[method])
+
+
+@pytest.fixture
+def server(respx_mock: respx.mock) -> FakeServer:
+    server = FakeServer()
+    respx_mock.post(TRAC_RPC_URL).mock(side_effect=server.respond)
+    return server
+
+
+def test_sync(tmp_path: Path, server: FakeServer):
+    api_client = ApiClient(rpc_url=TRAC_RPC_URL)
+
+    with (
+        TracMirror(tmp_path / "mirror.sqlite3") as mirror,
+        contextlib.closing(sqlite3.connect(tmp_path / "mirror.sqlite3")) as connection,
+    ):
+        assert mirror.sync(api_client) == SyncStats(full=True, tickets=1, wiki_pages=1, deleted=1)
+        assert mirror.last_sync is not None
+
+        assert connection.execute("SELECT id, json_extract(attributes, '$.status') FROM tickets").fetchall() == [
+            (1, "accepted")
+        ]
+        assert connection.execute("SELECT COUNT(*) FROM changelog WHERE ticket_id = 1").fetchone() == (5,)
+        assert connection.execute("SELECT COUNT(*) FROM attachments WHERE ticket_id = 1").fetchone() == (1,)
+        assert connection.execute("SELECT name, version, text FROM wiki_pages").fetchall() == [
+            ("WikiStart", 3, "= Welcome =")
+        ]
+        assert connection.execute("SELECT name FROM enumerations WHERE kind = 'priority' AND position = 0").fetchone()
+
+        server.methods.clear()
+        assert mirror.sync(api_client) == SyncStats(full=False, tickets=1, wiki_pages=1, deleted=0)
+        assert "ticket.getRecentChanges" in server.methods
+        assert "ticket.query" not in server.methods
+        assert connection.execute("SELECT COUNT(*) FROM changelog").fetchone() == (5,)
+
+        # `wiki.getPageInfo` returns null for a deleted page, and `wiki.getPage` fails with a not-found error
+        server.results["wiki.getPageInfo"] = None
+        server.errors[("wiki.getPage", "WikiStart")] = NOT_FOUND
+        assert mirror.sync(api_client) == SyncStats(full=False, tickets=1, wiki_pages=0, deleted=1)
+        assert connection.execute("SELECT COUNT(*) FROM wiki_pages").fetchone() == (0,)
+
+
+def test_sync_resume(tmp_path: Path, server: FakeServer):
+    api_client = ApiClient(rpc_url=TRAC_RPC_URL)
+
+    with TracMirror(tmp_path / "mirror.sqlite3", batch_size=1) as mirror:
+        server.unavailable.add("wiki.getPage")
+        with pytest.raises(TracRpcError, match="Internal error"):
+            mirror.sync(api_client)
+        assert mirror.last_sync is None
+
+        server.unavailable.clear()
+        server.methods.clear()
+        assert mirror.sync(api_client) == SyncStats(full=True, tickets=0, wiki_pages=1, deleted=0)
+        assert "ticket.get" not in server.methods
+        assert "ticket.query" not in server.methods
+        assert mirror.last_sync is not None
+
+
+def test_sync_failures(tmp_path: Path, server: FakeServer):
+    api_client = ApiClient(rpc_url=TRAC_RPC_URL)
+
+    with TracMirror(tmp_path / "mirror.sqlite3") as mirror:
+        server.errors[("ticket.changeLog", 1)] = INTERNAL_ERROR
+        server.results["wiki.getPageInfo"] = {"name": "WikiStart"}
+        assert mirror.sync(api_client) == SyncStats(full=True, tickets=0, wiki_pages=0, deleted=1, failed=2)
+        assert mirror.last_sync is not None
+        assert mirror.get_failures(TracMirror.TICKET) == {"1": "Internal error"}
+        assert mirror.get_failures(TracMirror.WIKI_PAGE)["WikiStart"].startswith("Invalid result of wiki.getPageInfo")
+
+        # Failed tickets and pages are fetched again by the next sync, even if they have not changed since
+        del server.errors[("ticket.changeLog", 1)]
+        server.results |= {"wiki.getPageInfo": PAGE_INFO, "ticket.getRecentChanges": [], "wiki.getRecentChanges": []}
+        assert mirror.sync(api_client) == SyncStats(full=False, tickets=1, wiki_pages=1, deleted=0, failed=0)
+        assert mirror.get_failures(TracMirror.TICKET) == {}
+        assert mirror.get_failures(TracMirror.WIKI_PAGE) == {}
+
+
+def test_main(tmp_path: Path, server: FakeServer, respx_mock: respx.mock, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("TRAC_RPC_PASSWORD", TRAC_PASSWORD)
+    main([TRAC_RPC_URL, str(tmp_path / "mirror.sqlite3"), "--user", TRAC_USERNAME])
+
+    assert {call.request.headers["Authorization"] for call in respx_mock.calls} == {
+        "Basic dHJhY19sb2dpbjp0cmFjX3Bhc3N3b3Jk"
+    }
+    with TracMirror(tmp_path / "mirror.sqlite3") as mirror:
+        assert mirror.last_sync is not None
+
+    server.methods.clear()
+    main([TRAC_RPC_URL, str(tmp_path / "mirror.sqlite3"), "--full"])
+    assert "ticket.query" in server.methods
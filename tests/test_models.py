@@ -1,8 +1,12 @@
+import json
+from enum import StrEnum
+
 import respx
 
 from trac_rpc.client import ApiClient
-from trac_rpc.models import TracMilestone
-from trac_rpc.validators import TracStrippedStr
+from trac_rpc.decoders import decode_result, get_ticket_properties_type
+from trac_rpc.models import TracMilestone, TracTicket, TracTicketChangelog
+from trac_rpc.validators import InternPool, TracStrippedStr, interning
 
 from .utils import get_fixture
 
@@ -12,3 +16,27 @@ def test_custom_string_type(api_client: ApiClient, respx_mock: respx.mock):
 
     milestone = api_client.get_milestone(" milestone2  ", TracMilestone[TracStrippedStr])
     assert milestone.name == "milestone2"
+
+
+class Status(StrEnum):
+    NEW = "new"
+    ACCEPTED = "accepted"
+
+
+class StatusTicket(TracTicket):
+    status: Status
+
+
+def test_interning_str_subclass():
+    ticket_data = json.loads(get_fixture("trac-get-ticket-response.json"))
+    changelog_data = json.loads(get_fixture("trac-get-ticket-changelog-response.json"))
+
+    with interning(InternPool()):
+        # "accepted" is pooled as a plain string first, and must not replace the enum member
+        changelog = decode_result(changelog_data, TracTicketChangelog)
+        ticket = decode_result(ticket_data, get_ticket_properties_type(StatusTicket))
+        # The enum member must not leak into plain string fields either
+        changelog_again = decode_result(changelog_data, TracTicketChangelog)
+
+    assert type(ticket.attributes.status) is Status
+    assert {type(entry.new_value) for entry in changelog + changelog_again} == {str}
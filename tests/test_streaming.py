@@ -0,0 +1,89 @@
+import base64
+import json
+
+import pytest
+
+from trac_rpc.streaming import BinaryResultStream, JsonResultStream
+
+RESPONSE = {
+    "result": [{"a": 'x"y]}', "b": [1, 2, {"c": None}]}, 12345, "str\\", [], {}, True, None, 1.5e3, "ü€𝄞"],
+    "error": None,
+    "id": 17,
+}
+
+
+def parse(data: bytes, chunk_size: int) -> tuple[list, dict]:
+    stream = JsonResultStream()
+    items = [
+        json.loads(item)
+        for offset in range(0, len(data), chunk_size)
+        for item in stream.feed(data[offset : offset + chunk_size])
+    ]
+    return items, stream.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1024])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_json_result_stream(chunk_size: int, indent: int | None):
+    data = json.dumps(RESPONSE, ensure_ascii=False, indent=indent).encode()
+
+    assert parse(data, chunk_size) == (RESPONSE["result"], {"error": None, "id": 17})
+
+
+def test_json_result_stream_error():
+    error = {"message": "error", "code": 1, "name": "JSONRPCError"}
+    data = json.dumps({"error": error, "result": None, "id": None}).encode()
+
+    assert parse(data, 5) == ([], {"error": error, "result": None, "id": None})
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b'{"result": [1, 2',
+        b'{"result": [1, 2]} {}',
+        b'["result"]',
+    ],
+)
+def test_json_result_stream_invalid(data: bytes):
+    with pytest.raises(ValueError, match=r"(incomplete|unexpected) .+"):
+        parse(data, 3)
+
+
+DATA = bytes(range(256)) * 20
+
+
+def decode_binary(data: bytes, chunk_size: int) -> tuple[bytes, dict]:
+    stream = BinaryResultStream()
+    decoded = b"".join(stream.feed(data[offset : offset + chunk_size]) for offset in range(0, len(data), chunk_size))
+    return decoded, stream.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1024])
+@pytest.mark.parametrize("escape_slashes", [False, True])
+def test_binary_result_stream(chunk_size: int, escape_slashes: bool):
+    # Same as Trac, which encodes binary data with line breaks every 76 characters
+    text = json.dumps({"id": 17, "result": {"__jsonclass__": ["binary", base64.encodebytes(DATA).decode()]}})
+    data = (text.replace("/", "\\/") if escape_slashes else text).encode()
+
+    assert decode_binary(data, chunk_size) == (DATA, {"id": 17})
+
+
+def test_binary_result_stream_error():
+    error = {"message": "error", "code": 1, "name": "ResourceNotFound"}
+    data = json.dumps({"result": None, "error": error, "id": None}).encode()
+
+    assert decode_binary(data, 5) == (b"", {"result": None, "error": error, "id": None})
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b'{"result": {"__jsonclass__": ["binary", "AAAA',
+        b'{"result": {"__jsonclass__": ["binary", "AA\\u0041A"]}}',
+        b'{"result": {"__jsonclass__": ["binary", "AA!A"]}}',
+    ],
+)
+def test_binary_result_stream_invalid(data: bytes):
+    with pytest.raises(ValueError, match=r"incomplete|unexpected|base64"):
+        decode_binary(data, 3)
@@ -1,8 +1,12 @@
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import pytest
 
 from trac_rpc.validators import (
+    InternPool,
+    interning,
+    serialize_datetime,
     validate_comma_separated,
     validate_in_set,
     validate_space_or_comma_separated,
@@ -79,3 +83,39 @@ def test_validate_comma_separated(value: Any, expected: Any):
 )
 def test_validate_space_or_comma_separated(value: Any, expected: Any):
     assert validate_space_or_comma_separated(value) == expected
+
+
+def test_serialize_datetime():
+    value = datetime(2025, 2, 27, 14, 37, 11, 171873, tzinfo=timezone(timedelta(hours=1)))
+    assert serialize_datetime(value) == {"__jsonclass__": ["datetime", "2025-02-27T13:37:11"]}
+
+
+def test_interning():
+    # Build equal strings at runtime, since constants would already be the same object
+    values = ["".join(["a", "b c"]) for _ in range(2)]
+    assert values[0] is not values[1]
+
+    assert validate_space_separated(values[0]) is not validate_space_separated(values[1])
+
+    with interning(InternPool()) as pool:
+        first, second = validate_space_separated(values[0]), validate_space_separated(values[1])
+        assert first == second == ["ab", "c"]
+        assert all(a is b for a, b in zip(first, second, strict=True))
+        assert len(pool) == 2
+
+        # Comma-separated values are interned too
+        assert validate_space_or_comma_separated("".join(["ab", ", d"])) == ["ab", "d"]
+        assert len(pool) == 3
+
+
+def test_intern_pool():
+    pool = InternPool(max_length=3)
+    short, long = "".join(["a", "b"]), "".join(["a", "bcd"])
+
+    assert pool.intern(short) is short
+    assert pool.intern("".join(["a", "b"])) is short
+    assert pool.intern(long) is long
+    assert len(pool) == 1
+
+    pool.clear()
+    assert len(pool) == 0
@@ -0,0 +1,117 @@
+from pathlib import Path
+
+import pytest
+import respx
+
+from trac_rpc.client import ApiClient
+from trac_rpc.exceptions import TracRpcError
+from trac_rpc.wiki_export import ExportStats, WikiExporter, main
+
+from .utils import INTERNAL_ERROR, NOT_FOUND, TRAC_PASSWORD, TRAC_RPC_URL, TRAC_USERNAME, FakeTrac
+
+
+class FakeWiki(FakeTrac):
+    def __init__(self):
+        super().__init__()
+        self.pages = {"WikiStart": "= Welcome =\r\n", "TracGuide/Install": "= Installing =", "Sandbox": "Scratch"}
+        self.changed = ["WikiStart"]
+        self.failing = set()
+
+    def get_page_info(self, page_name: str) -> dict:
+        return {
+            "name": page_name,
+            "author": "admin",
+            "version": 1,
+            "lastModified": {"__jsonclass__": ["datetime", "2025-02-27T13:36:35"]},
+            "comment": "",
+        }
+
+    def call(self, method: str, params: list) -> dict:
+        if method == "wiki.getAllPages":
+            return self.result(list(self.pages))
+        if method == "wiki.getRecentChanges":
+            return self.result([self.get_page_info(page_name) for page_name in self.changed])
+        if params[0] in self.failing:
+            return self.error(INTERNAL_ERROR)
+        if params[0] not in self.pages:
+            return self.error(NOT_FOUND)
+        if method == "wiki.getPage":
+            return self.result(self.pages[params[0]])
+        return self.result(self.get_page_info(params[0]))
+
+
+@pytest.fixture
+def wiki(respx_mock: respx.mock) -> FakeWiki:
+    wiki = FakeWiki()
+    respx_mock.post(TRAC_RPC_URL).mock(side_effect=wiki.respond)
+    return wiki
+
+
+def test_export(tmp_path: Path, wiki: FakeWiki):
+    api_client = ApiClient(rpc_url=TRAC_RPC_URL)
+    exporter = WikiExporter(tmp_path, chunk_size=2)
+
+    assert exporter.export(api_client) == ExportStats(full=True, pages=3, deleted=0)
+    assert exporter.last_export is not None
+    assert exporter.get_page_names() == ["Sandbox", "TracGuide/Install", "WikiStart"]
+    assert (tmp_path / "TracGuide%2FInstall.txt").read_text() == "= Installing ="
+    page_info, text = exporter.get_page("WikiStart")
+    assert (page_info.name, page_info.version, text) == ("WikiStart", 1, "= Welcome =\r\n")
+
+    del wiki.pages["Sandbox"]
+    wiki.pages["WikiStart"] = "= Welcome back ="
+    wiki.methods.clear()
+    assert exporter.export(api_client) == ExportStats(full=False, pages=1, deleted=1)
+    assert wiki.methods.count("wiki.getPage") == 1
+    assert exporter.get_page_names() == ["TracGuide/Install", "WikiStart"]
+    assert exporter.get_page("WikiStart")[1] == "= Welcome back ="
+    assert exporter.get_page("Sandbox") is None
+
+
+def test_export_resume(tmp_path: Path, wiki: FakeWiki):
+    api_client = ApiClient(rpc_url=TRAC_RPC_URL)
+    exporter = WikiExporter(tmp_path, chunk_size=1, prefetch=1)
+
+    wiki.unavailable.add("WikiStart")
+    with pytest.raises(TracRpcError, match="Internal error"):
+        exporter.export(api_client)
+    assert exporter.last_export is None
+    assert exporter.get_page_names() == ["Sandbox", "TracGuide/Install"]
+
+    wiki.unavailable.clear()
+    wiki.methods.clear()
+    assert exporter.export(api_client) == ExportStats(full=True, pages=1, deleted=0)
+    assert "wiki.getAllPages" not in wiki.methods
+    assert exporter.last_export is not None
+
+
+def test_export_failures(tmp_path: Path, wiki: FakeWiki):
+    api_client = ApiClient(rpc_url=TRAC_RPC_URL)
+    exporter = WikiExporter(tmp_path)
+
+    wiki.failing.add("Sandbox")
+    assert exporter.export(api_client) == ExportStats(full=True, pages=2, deleted=0, failed=1)
+    assert exporter.last_export is not None
+    assert exporter.get_failures() == {"Sandbox": "Internal error"}
+    assert exporter.get_page_names() == ["TracGuide/Install", "WikiStart"]
+
+    # Failed pages are fetched again by the next export, even if they have not changed since
+    wiki.failing.clear()
+    wiki.changed.clear()
+    assert exporter.export(api_client) == ExportStats(full=False, pages=1, deleted=0, failed=0)
+    assert exporter.get_failures() == {}
+    assert exporter.get_page("Sandbox")[1] == "Scratch"
+
+
+def test_main(tmp_path: Path, wiki: FakeWiki, respx_mock: respx.mock, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("TRAC_RPC_PASSWORD", TRAC_PASSWORD)
+    main([TRAC_RPC_URL, str(tmp_path), "--user", TRAC_USERNAME])
+
+    assert {call.request.headers["Authorization"] for call in respx_mock.calls} == {
+        "Basic dHJhY19sb2dpbjp0cmFjX3Bhc3N3b3Jk"
+    }
+    assert WikiExporter(tmp_path).get_page_names() == ["Sandbox", "TracGuide/Install", "WikiStart"]
+
+    wiki.methods.clear()
+    main([TRAC_RPC_URL, str(tmp_path), "--full"])
+    assert wiki.methods.count("wiki.getPage") == 3
@@ -1,4 +1,7 @@
+import json
+import os
 from pathlib import Path
+from typing import Any
 
 import httpx
 
@@ -11,7 +14,54 @@ def get_fixture(fixture: Path | str) -> str:
     return (Path(__file__).parent / "fixtures" / fixture).read_text()
 
 
+def get_default_mode() -> int:
+    """Return the permissions of new files, as set by the umask"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
 RESPONSE_API_VERSION = httpx.Response(
     status_code=httpx.codes.OK,
     text=get_fixture("trac-get-api-version-response.json"),
 )
+
+NOT_FOUND = {"message": "Resource does not exist", "code": 404, "name": "ResourceNotFound"}
+INTERNAL_ERROR = {"message": "Internal error", "code": -32603, "name": "Error"}
+
+
+class FakeTrac:
+    """
+    Fake Trac RPC endpoint for respx, which answers single calls and `system.multicall` batches of them with the
+    responses returned by `call`, and records the methods called. A batch with a call to a method, or about a resource
+    (given by the first parameter), in `unavailable` fails as a whole, like when the server is down.
+    """
+
+    def __init__(self):
+        self.unavailable = set()
+        self.methods = []
+
+    def call(self, method: str, params: list) -> dict[str, Any]:
+        raise NotImplementedError
+
+    @staticmethod
+    def result(value: Any) -> dict[str, Any]:
+        return {"result": value, "error": None, "id": None}
+
+    @staticmethod
+    def error(error: dict[str, Any]) -> dict[str, Any]:
+        return {"result": None, "error": error, "id": None}
+
+    def _call(self, method: str, params: list) -> dict[str, Any]:
+        self.methods.append(method)
+        return self.call(method, params)
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        data = json.loads(request.content)
+        if data["method"] != "system.multicall":
+            response = self._call(data["method"], data["params"] or [])
+        elif any({call["method"], *call["params"][:1]} & self.unavailable for call in data["params"]):
+            response = self.error(INTERNAL_ERROR)
+        else:
+            response = self.result([self._call(call["method"], call["params"]) for call in data["params"]])
+        return httpx.Response(status_code=httpx.codes.OK, json=response)